@@ -10,6 +10,7 @@ from flask_cors import CORS
 from datetime import datetime
 from route import *
 import argparse
+from lib.utils.secrets import secrets
 from prettyprint import STYLE, prettyprint as print
 
 #================================================================
@@ -20,6 +21,9 @@ parser.add_argument("--host",       default='0.0.0.0')
 parser.add_argument("--port",       default=8011)
 parser.add_argument("--cert-file",  default=None)
 parser.add_argument("--key-file",   default=None)
+parser.add_argument("--server",     default=secrets.SERVER, choices=["dev", "waitress"])
+parser.add_argument("--threads",    default=secrets.SERVER_THREADS, type=int)
+parser.add_argument("--connection-limit", default=200, type=int)
 args = parser.parse_args()
 
 #================================================================
@@ -73,8 +77,30 @@ app.register_blueprint(base)
 context = (args.cert_file,  args.key_file) if args.key_file and args.cert_file else None
 # context = ("/home/nosnhoj/.cert/cert.pem","/home/nosnhoj/.cert/key.pem")
 
+# worker threads kept free of SSE streams for API calls (waitress)
+API_THREADS = 8
+
+def serve_waitress():
+    # one process only: the gpio, meters and SSE queues are process-wide singletons
+    from waitress import serve
+    from lib.sse import SSEQM
+    if context:
+        raise SystemExit("waitress does not do TLS; put it behind a proxy or use --server dev")
+    # every open stream holds one of the threads until the client goes away
+    SSEQM.max_clients = max(1, args.threads - API_THREADS)
+    try:
+        serve(
+            app,
+            host=args.host,
+            port=int(args.port),
+            threads=args.threads,
+            connection_limit=args.connection_limit,
+            ident="burningstation",
+        )
+    finally:
+        SSEQM.close_all()
+
 if __name__ == "__main__": 
-    from lib.utils.secrets import secrets
     if secrets.MOCK: import tools.mock # for testing with mock meters
     import lib.system.tasks as tasks
     from lib.robot.robot_power import pulse_robot_remote_on
@@ -82,11 +108,14 @@ if __name__ == "__main__":
     pulse_robot_remote_on()
 
     print("=========================================================================", fg="#888888", style=STYLE.DIM)
-    print(f">> Server running at {args.host}:{args.port}", fg="#888888", style=STYLE.DIM)
+    print(f">> Server running at {args.host}:{args.port} ({args.server})", fg="#888888", style=STYLE.DIM)
     print("=========================================================================", fg="#888888", style=STYLE.DIM)
-    import click
-    click.echo = lambda *args, **kwargs: None
-    app.run(host=args.host, port=args.port, ssl_context=context, use_reloader=False)
+    if args.server == "waitress":
+        serve_waitress()
+    else:
+        import click
+        click.echo = lambda *args, **kwargs: None
+        app.run(host=args.host, port=args.port, ssl_context=context, use_reloader=False, threaded=True)
         
     
     
\ No newline at end of file
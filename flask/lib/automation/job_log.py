@@ -0,0 +1,143 @@
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from lib.automation.log_writer import LOG_WRITER, LogRecord
+
+
+SPOOL_ROOT = os.path.join("./logs", ".spool")
+
+
+class JobLog:
+    """
+    A job's log as SharedState keeps it: the newest RING_LINES records in memory
+    (for the UI tail and console), and with a `spool_dir` every record also
+    spilled by LOG_WRITER into numbered on-disk segments of SEGMENT_LINES lines.
+    The database copy is built from the segments at job end, so a night-long
+    burn-in never has to fit in RAM.
+
+    Every record gets a sequence number (1, 2, ... since clear()) so a tail
+    reader can ask for "everything after N".
+
+    The segments are the only complete copy, so spilling waits up to SPOOL_WAIT_S
+    for a full writer queue (only the first record of a gap waits). Records it
+    still cannot queue are counted, and a
+    marker line saying how many are missing goes into the segment before the
+    next record that makes it (or at flush()).
+    """
+    RING_LINES = 2000
+    SEGMENT_LINES = 20000
+    SPOOL_WAIT_S = 2.0
+
+    def __init__(self, spool_dir: Optional[str] = None, ring_lines: Optional[int] = None):
+        self.spool_dir = spool_dir
+        self.ring: Deque[Tuple[int, LogRecord]] = deque(maxlen=ring_lines or self.RING_LINES)
+        self.seq = 0
+        self.segments: List[str] = []
+        self._segment_lines = 0
+        self._lock = threading.Lock()
+        # records that never reached the segments: in total, and since the last gap marker
+        self.spool_dropped = 0
+        self._gap = 0
+
+    def append(self, record: LogRecord) -> None:
+        path = None
+        with self._lock:
+            self.seq += 1
+            self.ring.append((self.seq, record))
+            if self.spool_dir:
+                if not self.segments or self._segment_lines >= self.SEGMENT_LINES:
+                    self._next_segment()
+                self._segment_lines += 1
+                path = self.segments[-1]
+        if path is not None:
+            self._spill(path, record)
+
+    def _spill(self, path: str, record: LogRecord) -> None:
+        # once in a gap, don't stall every later line on a writer that is still stuck
+        wait = 0.0 if self._gap else self.SPOOL_WAIT_S
+        if self._gap and not self._write_gap(path, record.ts, wait):
+            self._count_dropped()
+            return
+        if not LOG_WRITER.write(path, record, wait=wait):
+            self._count_dropped()
+
+    def _count_dropped(self) -> None:
+        with self._lock:
+            self._gap += 1
+            self.spool_dropped += 1
+
+    def _write_gap(self, path: str, ts: float, wait: float) -> bool:
+        with self._lock:
+            missing = self._gap
+        marker = LogRecord(ts, "job_log", "warn",
+                           f"[... {missing} line(s) missing here: log writer backlog ...]")
+        if not LOG_WRITER.write(path, marker, wait=wait):
+            return False
+        with self._lock:
+            self._gap -= missing
+        return True
+
+    def _next_segment(self) -> None:
+        if self.segments:
+            LOG_WRITER.close(self.segments[-1])
+        self.segments.append(os.path.join(self.spool_dir, f"seg-{len(self.segments) + 1:05d}.log"))
+        self._segment_lines = 0
+
+    def clear(self) -> None:
+        """Start over for a new job: empty ring, previous job's segments deleted."""
+        with self._lock:
+            if self.segments:
+                LOG_WRITER.close(self.segments[-1])
+            self.ring.clear()
+            self.seq = 0
+            self.segments = []
+            self._segment_lines = 0
+            self.spool_dropped = 0
+            self._gap = 0
+        if self.spool_dir:
+            # the writer may still hold the old segments; it reopens in append mode, so wait for it
+            LOG_WRITER.flush()
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every spilled record is in its segment file."""
+        with self._lock:
+            current = self.segments[-1] if self.segments else None
+        if current is not None and self._gap:
+            self._write_gap(current, time.time(), self.SPOOL_WAIT_S)
+        return current is None or LOG_WRITER.flush(current, timeout=timeout)
+
+    def tail(self, limit: int = 200, after: int = 0) -> Tuple[List[str], int]:
+        """Formatted lines newer than sequence `after` (at most the last `limit`), and the newest sequence."""
+        with self._lock:
+            entries = [(seq, record) for seq, record in self.ring if seq > after]
+            newest = self.seq
+        return [record.format() for _, record in entries[-limit:]], newest
+
+    def text(self) -> str:
+        """The ring as text, one formatted line per record."""
+        with self._lock:
+            records = [record for _, record in self.ring]
+        return "\n".join(record.format() for record in records)
+
+    def __len__(self) -> int:
+        return self.seq
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        with self._lock:
+            records = [record for _, record in self.ring]
+        return iter(records)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "lines": self.seq,
+                "ring": len(self.ring),
+                "segments": len(self.segments),
+                "spool_dropped": self.spool_dropped,
+                "spool_dir": self.spool_dir,
+            }
@@ -7,6 +7,7 @@ from typing import Dict, Optional
 from datetime import datetime
 from lib.automation.tests import get_monitors
 from lib.automation.shared_state import SharedState
+from lib.automation.job_log import JobLog, SPOOL_ROOT
 from lib.automation.runner import run_test_job
 # from lib.database import insertJobs
 # from lib.meter.meter_manager import METERMANAGER as mm
@@ -110,6 +111,7 @@ class JobState(SharedState):
         self.result:ResultType              = None          # pass|fail|None
         self.last_error: Optional[str]      = None
         self.current_program: Optional[str] = None
+        self.logs = JobLog(spool_dir=os.path.join(SPOOL_ROOT, meter_ip))
 
     def reset(self):
         self.status = "idle"
@@ -186,6 +188,7 @@ def start_job(meter_ip, program_name, kwargs, log=True, verbose=False):
                 shared=st,
                 log=log,
                 verbose=verbose,
+                journal=mm.get_journal(meter_ip),
             )
             st.result  = "pass" if not st.stop_event.is_set() else "fail"
             st.status  = "finished"
@@ -262,6 +265,16 @@ def job_status(meter_ip):
             "current_program": st.current_program,
         }
 
+def job_log_tail(meter_ip, after: int = 0, limit: int = 200):
+    """Newest job log lines from the in-memory ring; poll again with after=<returned seq>. None if no job ever ran on meter_ip."""
+    # looked up, not created: this is reachable with any ip string from the API
+    with _registry_lock:
+        st = _states.get(meter_ip)
+    if st is None:
+        return None
+    lines, seq = st.logs.tail(limit=limit, after=after)
+    return {"meter_ip": meter_ip, "seq": seq, "lines": lines}
+
 
 def start_passive_job(meter_ip):
     meter = mm.get_meter(meter_ip)
@@ -452,7 +465,7 @@ def job_done(meter_ip):
     st.flush_logs()
 
     meter.update_display_results(st)
-    insert_meter_jobs(meter.db_id,[job_data],'\n'.join(line.rstrip('\n') for line in st.logs))
+    insert_meter_jobs(meter.db_id,[job_data],st.log_text(),jctl_segments=st.logs.segments)
     # if st.logs successfully inserted to db, rm log file maybe?
 
     if current_program == "cycle_all" and store.settings.other.auto_print_fw:
@@ -0,0 +1,806 @@
+import glob
+import json
+import os
+import re
+import shlex
+import socket
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+from lib.automation.monitors.models import Fault, LogEvent
+
+
+RE_FALLBACK = re.compile(r'^(\w+\s+\d+\s+\d+:\d+:\d+)\s+\S+\s+MS3\[\d+\]:\s*(.*)')
+RE_LOGS_BEGIN = re.compile(r'^-- Logs begin at (?P<begin>.+?), end at ')
+
+# Fields asked for by the "compact" wire format. journalctl -o json always adds
+# __CURSOR, __REALTIME_TIMESTAMP, __MONOTONIC_TIMESTAMP and _BOOT_ID on its own;
+# the unit routes events to subscribers, identifier and pid feed format_short().
+COMPACT_FIELDS: Tuple[str, ...] = ("MESSAGE", "_HOSTNAME", "_SYSTEMD_UNIT", "SYSLOG_IDENTIFIER", "_PID")
+WIRE_FORMATS: Tuple[str, ...] = ("compact", "json")
+
+
+def output_args(wire: str) -> str:
+    """journalctl output options for a wire format."""
+    if wire == "compact":
+        return f"-o json --output-fields={','.join(COMPACT_FIELDS)}"
+    return "-o json"
+
+
+def _event_from_json(j: dict, line: str) -> LogEvent:
+    ts_raw = j.get("__REALTIME_TIMESTAMP", "")
+    if ts_raw:
+        epoch = int(ts_raw) / 1_000_000
+        ts = datetime.fromtimestamp(epoch)
+    else:
+        epoch = time.time()
+        ts = datetime.now()
+    return LogEvent(ts=ts, msg=j.get("MESSAGE", ""), raw=line, hostname=j.get("_HOSTNAME", ""),
+                    unit=j.get("_SYSTEMD_UNIT", ""), epoch=epoch, cursor=j.get("__CURSOR", ""))
+
+
+def split_chunk(buf: bytes) -> Tuple[List[str], bytes]:
+    """
+    Split a stream buffer into complete, decoded, non-empty lines and the
+    unterminated tail. The buffer is decoded once, not line by line; the tail
+    stays bytes so a UTF-8 sequence cut by the read is completed by the next one.
+    """
+    head, sep, tail = buf.rpartition(b"\n")
+    if not sep:
+        return [], buf
+    return [line for line in head.decode("utf-8", errors="replace").split("\n") if line.strip()], tail
+
+
+def parse_journal_lines(lines: List[str]) -> List[LogEvent]:
+    """
+    Batch parse_journal_line: a batch of JSON lines is decoded with a single
+    json.loads over a JSON array. If any line is not JSON (a syslog-style
+    fallback line, a journalctl notice) the batch goes line by line instead.
+    """
+    if not lines:
+        return []
+    try:
+        objs = json.loads("[" + ",".join(lines) + "]")
+    except ValueError:
+        objs = None
+    if objs is None or len(objs) != len(lines) or not all(type(j) is dict for j in objs):
+        return [ev for ev in map(parse_journal_line, lines) if ev is not None]
+    try:
+        return [_event_from_json(j, line.rstrip("\r")) for j, line in zip(objs, lines)]
+    except Exception:
+        return [ev for ev in map(parse_journal_line, lines) if ev is not None]
+
+
+def parse_journal_line(line: str) -> Optional[LogEvent]:
+    """`journalctl -o json` line -> LogEvent. Plain syslog-style lines are accepted as a fallback."""
+    try:
+        return _event_from_json(json.loads(line), line.rstrip("\n"))
+    except Exception:
+        # fallback try
+        m = RE_FALLBACK.match(line)
+        if not m:
+            return None
+        dt_str, msg = m.groups()
+        try:
+            ts = datetime.strptime(dt_str, "%b %d %H:%M:%S")
+        except Exception:
+            ts = datetime.now()
+        return LogEvent(ts=ts, msg=msg, raw=line.rstrip("\n"), hostname="", epoch=time.time())
+
+
+def format_short(ev: LogEvent, local_ts: datetime) -> str:
+    """Render an event like `journalctl -o short`; `local_ts` is the event time in the meter's timezone."""
+    ident, pid = "", ""
+    if ev.raw.startswith("{"):
+        try:
+            j = json.loads(ev.raw)
+            ident, pid = j.get("SYSLOG_IDENTIFIER", ""), j.get("_PID", "")
+        except Exception:
+            pass
+    elif not ev.unit:
+        # fallback-parsed lines already are short format
+        return ev.raw
+    ident = ident or ev.unit.rsplit(".", 1)[0]
+    tag = f"{ident}[{pid}]" if pid else ident
+    return f"{local_ts:%b %d %H:%M:%S} {ev.hostname} {tag}: {ev.msg}"
+
+
+class JournalRing:
+    """
+    Recent LogEvents of one meter, oldest first, capped by line count and by an
+    approximate byte size (raw JSON + message). Events are indexed by meter
+    timestamp (bisect), by unit, and by any keyword that has been queried with
+    `contains` (the posting list is built on first use and kept up to date).
+    """
+    TRIM_SLACK = 0.05       # let the ring overshoot its caps by 5% and trim in one go
+
+    def __init__(self, max_lines: int = 20000, max_bytes: int = 16 * 1024 * 1024):
+        self.max_lines = max(1, int(max_lines))
+        self.max_bytes = max(1, int(max_bytes))
+        self.bytes = 0
+        self.dropped = 0
+        self._events: List[LogEvent] = []
+        self._epochs: List[float] = []          # non-decreasing copy of ev.epoch for bisect
+        self._sizes: List[int] = []
+        self._first = 0                         # sequence number of _events[0]
+        self._units: Dict[str, List[int]] = {}
+        self._keywords: Dict[str, List[int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def oldest_epoch(self) -> Optional[float]:
+        with self._lock:
+            return self._epochs[0] if self._epochs else None
+
+    @property
+    def newest_epoch(self) -> Optional[float]:
+        with self._lock:
+            return self._epochs[-1] if self._epochs else None
+
+    def extend(self, events: Iterable[LogEvent]) -> None:
+        with self._lock:
+            for ev in events:
+                seq = self._first + len(self._events)
+                last = self._epochs[-1] if self._epochs else ev.epoch
+                size = len(ev.raw) + len(ev.msg)
+                self._events.append(ev)
+                self._epochs.append(max(ev.epoch, last))
+                self._sizes.append(size)
+                self.bytes += size
+                self._units.setdefault(ev.unit, []).append(seq)
+                if self._keywords:
+                    low = ev.msg.lower()
+                    for kw, seqs in self._keywords.items():
+                        if kw in low:
+                            seqs.append(seq)
+            if (len(self._events) > self.max_lines * (1 + self.TRIM_SLACK)
+                    or self.bytes > self.max_bytes * (1 + self.TRIM_SLACK)):
+                self._trim()
+
+    def count(self, unit: Optional[str] = None) -> int:
+        with self._lock:
+            return len(self._events) if unit is None else len(self._units.get(unit, ()))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._first += len(self._events)
+            self._events.clear()
+            self._epochs.clear()
+            self._sizes.clear()
+            self._units.clear()
+            self._keywords.clear()
+            self.bytes = 0
+
+    def _trim(self) -> None:
+        n = max(0, len(self._events) - self.max_lines)
+        excess = self.bytes - self.max_bytes
+        while excess > 0 and n < len(self._events):
+            excess -= self._sizes[n]
+            n += 1
+        if n <= 0:
+            return
+        for i in range(n):
+            self.bytes -= self._sizes[i]
+        del self._events[:n], self._epochs[:n], self._sizes[:n]
+        self._first += n
+        self.dropped += n
+        for postings in (*self._units.values(), *self._keywords.values()):
+            del postings[:bisect_left(postings, self._first)]
+
+    def _postings(self, keyword: str) -> List[int]:
+        kw = keyword.lower()
+        seqs = self._keywords.get(kw)
+        if seqs is None:
+            seqs = self._keywords[kw] = [
+                self._first + i for i, ev in enumerate(self._events) if kw in ev.msg.lower()
+            ]
+        return seqs
+
+    def query(self,
+              since: Optional[float] = None,
+              until: Optional[float] = None,
+              regex: Union[str, Pattern[str], None] = None,
+              unit: Optional[str] = None,
+              contains: Optional[str] = None,
+              limit: Optional[int] = None,
+              tail: Optional[int] = None) -> List[LogEvent]:
+        """
+        Events with since <= epoch <= until, oldest first. `tail` keeps only the
+        last N events of the window (of `unit`, if given) before matching, like
+        `journalctl -n N`; `limit` then keeps the newest N matches.
+        """
+        rx = re.compile(regex) if isinstance(regex, str) else regex
+        with self._lock:
+            lo = bisect_left(self._epochs, since) if since is not None else 0
+            hi = bisect_right(self._epochs, until) if until is not None else len(self._events)
+            if unit is not None:
+                postings = self._units.get(unit, [])
+                candidates = postings[bisect_left(postings, self._first + lo):bisect_left(postings, self._first + hi)]
+            else:
+                candidates = range(self._first + lo, self._first + hi)
+            if tail is not None:
+                candidates = candidates[max(0, len(candidates) - tail):]
+            if contains is not None:
+                keyed = set(self._postings(contains))
+                candidates = [seq for seq in candidates if seq in keyed]
+
+            out: List[LogEvent] = []
+            for seq in reversed(candidates):
+                ev = self._events[seq - self._first]
+                if rx is not None and not rx.search(ev.msg):
+                    continue
+                out.append(ev)
+                if limit is not None and len(out) >= limit:
+                    break
+        out.reverse()
+        return out
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "lines": len(self._events),
+                "bytes": self.bytes,
+                "dropped": self.dropped,
+                "oldest_epoch": self._epochs[0] if self._epochs else None,
+                "newest_epoch": self._epochs[-1] if self._epochs else None,
+                "keywords": sorted(self._keywords),
+            }
+
+
+class JournalSubscription:
+    """
+    One consumer's view of a JournalFollower: a bounded queue of LogEvents.
+    When the consumer falls behind the oldest events are dropped (and counted)
+    so a stalled subscriber never holds up the follower or its siblings.
+    The object is selectable (fileno()) and becomes readable while events are queued.
+    """
+
+    def __init__(self, follower: "JournalFollower", *, maxsize: int = 2000,
+                 units: Optional[Iterable[str]] = None, name: str = ""):
+        self.follower = follower
+        self.name = name
+        self.units = frozenset(units) if units else None
+        self.maxsize = max(1, int(maxsize))
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self._events: Deque[LogEvent] = deque()
+        self._cond = threading.Condition()
+        self._rsock, self._wsock = socket.socketpair()
+        self._rsock.setblocking(False)
+        self._wsock.setblocking(False)
+        self._signalled = False
+
+    def fileno(self) -> int:
+        return self._rsock.fileno()
+
+    def _signal(self) -> None:
+        if not self._signalled:
+            self._signalled = True
+            try:
+                self._wsock.send(b"\0")
+            except OSError:
+                pass
+
+    def _unsignal(self) -> None:
+        if self._signalled:
+            self._signalled = False
+            try:
+                self._rsock.recv(64)
+            except OSError:
+                pass
+
+    def push(self, events: List[LogEvent]) -> None:
+        """Called by the follower thread."""
+        if self.units is not None:
+            events = [ev for ev in events if ev.unit in self.units]
+        if not events:
+            return
+        with self._cond:
+            if self.closed:
+                return
+            for ev in events:
+                if len(self._events) >= self.maxsize:
+                    self._events.popleft()
+                    self.dropped += 1
+                self._events.append(ev)
+            self._signal()
+            self._cond.notify_all()
+
+    def drain(self) -> Optional[List[LogEvent]]:
+        """Take everything queued without blocking. None once closed and empty."""
+        with self._cond:
+            events = list(self._events)
+            self._events.clear()
+            self.delivered += len(events)
+            if not self.closed:
+                self._unsignal()
+            return events if events or not self.closed else None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[LogEvent]:
+        """Blocking single-event read for simple collectors. None on timeout or close."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._events or self.closed, timeout=timeout):
+                return None
+            if not self._events:
+                return None
+            self.delivered += 1
+            if len(self._events) == 1 and not self.closed:
+                self._unsignal()
+            return self._events.popleft()
+
+    def close(self) -> None:
+        self.follower.unsubscribe(self)
+        self._mark_closed()
+        for sock in (self._rsock, self._wsock):
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _mark_closed(self) -> None:
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            # leave the socket readable so a select() loop wakes up and sees the close
+            self._signal()
+            self._cond.notify_all()
+
+    def down_for(self) -> float:
+        """Seconds the follower's stream has been down (0.0 while streaming)."""
+        return self.follower.down_for()
+
+    def __enter__(self) -> "JournalSubscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            return {
+                "name": self.name,
+                "queued": len(self._events),
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+            }
+
+
+class JournalFollower:
+    """
+    One long-lived `journalctl -f` per meter, run on its own channel of the
+    meter's SSH transport. Every parsed LogEvent is fanned out to the current
+    subscribers, so a meter's journal crosses the network once no matter how
+    many jobs, evidence collectors or log tails are reading it.
+
+    Everything seen is also kept in a JournalRing, backfilled on attach with the
+    last BACKFILL_LINES entries and then followed from that read's cursor, so
+    historical windows can be answered locally (query/text) instead of running
+    `journalctl --since ... | grep` over SSH.
+
+    The stream is resumable: the follower remembers the __CURSOR of the last
+    entry it saw, and after a drop it first replays everything logged since then
+    (flagged `replayed`, in journal order) and only then follows again from the
+    new cursor, so subscribers and the ring see no gap. Reconnects back off
+    exponentially from RETRY_DELAY to MAX_RETRY_DELAY.
+    """
+    UNITS: Tuple[str, ...] = ("MS3_Platform.service", "MS3_Modem.service")
+    RETRY_DELAY = 1.0
+    MAX_RETRY_DELAY = 30.0
+    STABLE_AFTER = 30.0         # a stream that stayed up this long resets the backoff
+    READ_SIZE = 65536
+    BACKFILL_LINES = 2000
+
+    WIRE = "compact"
+
+    def __init__(self, meter, units: Optional[Iterable[str]] = None, backfill_lines: Optional[int] = None,
+                 wire: Optional[str] = None):
+        self.meter = meter
+        self.host = meter.host
+        self.units = tuple(units or self.UNITS)
+        self.wire = wire or self.WIRE
+        if self.wire not in WIRE_FORMATS:
+            raise ValueError(f"unknown journal wire format {self.wire!r}, expected one of {WIRE_FORMATS}")
+        self._wire_checked = self.wire == "json"
+        self.backfill_lines = self.BACKFILL_LINES if backfill_lines is None else max(0, int(backfill_lines))
+        self.lines = 0
+        self.bytes = 0                      # received on the follow stream
+        self.stream_lines = 0               # of which parsed off the follow stream
+        self.reconnects = 0
+        self.started_at: Optional[float] = None
+
+        self.cursor: Optional[str] = None   # __CURSOR of the newest entry seen
+        self.recovered = 0                  # lines replayed after drops, all time
+        self.gaps = 0                       # drops whose cursor could not be resumed
+        self.recoveries: Deque[Tuple[float, int]] = deque(maxlen=20)   # (time.time(), lines) per resume
+        self._down_since: Optional[float] = None
+        self._subs: List[JournalSubscription] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._channel = None
+
+        self.ring = JournalRing()
+        self.ready = threading.Event()      # set once the backfill is in the ring
+        self.truncated = False              # backfill hit BACKFILL_LINES, older lines exist on the meter
+        self.journal_begin: Optional[str] = None
+
+    @property
+    def _unit_args(self) -> str:
+        return " ".join(f"-u {u}" for u in self.units)
+
+    @property
+    def _output_args(self) -> str:
+        return output_args(self.wire)
+
+    def follow_command(self, cursor: Optional[str] = None) -> str:
+        if cursor:
+            return f"journalctl {self._unit_args} -f {self._output_args} --after-cursor={shlex.quote(cursor)}"
+        return f"journalctl {self._unit_args} -f -n0 {self._output_args}"
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stop.is_set())
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self.started_at = self._down_since = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name=f"journal-{self.host}", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        channel = self._channel
+        if channel is not None:
+            try:
+                channel.close()
+            except Exception:
+                pass
+        with self._lock:
+            subs, self._subs = self._subs, []
+        for sub in subs:
+            sub._mark_closed()
+
+    def subscribe(self, *, maxsize: int = 2000, units: Optional[Iterable[str]] = None,
+                  name: str = "") -> JournalSubscription:
+        """New subscriber that sees every event from now on. Starts the follower if needed."""
+        sub = JournalSubscription(self, maxsize=maxsize, units=units, name=name)
+        with self._lock:
+            self._subs.append(sub)
+        self.start()
+        return sub
+
+    def unsubscribe(self, sub: JournalSubscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    def _publish(self, events: List[LogEvent]) -> None:
+        with self._lock:
+            subs = list(self._subs)
+        for sub in subs:
+            sub.push(events)
+
+    def down_for(self) -> float:
+        """Seconds since the stream was last up (or since start()); 0.0 while streaming."""
+        down_since = self._down_since
+        return 0.0 if down_since is None else time.monotonic() - down_since
+
+    @staticmethod
+    def _parse_lines(lines: Iterable[str]) -> List[LogEvent]:
+        return parse_journal_lines([line for line in lines if line.startswith("{")])
+
+    def _check_wire(self) -> None:
+        """--output-fields needs systemd 236; older meters get the full JSON instead."""
+        if self._wire_checked:
+            return
+        code, _, err = self.meter.exec_parse(f"journalctl -n 0 {self._output_args}", priority="interactive")
+        if code != 0:
+            print(f"[JournalFollower] {self.host}: {self.wire} output not supported ({err or code}), using json")
+            self.wire = "json"
+        self._wire_checked = True
+
+    def _advance(self, events: List[LogEvent]) -> None:
+        for ev in reversed(events):
+            if ev.cursor:
+                self.cursor = ev.cursor
+                return
+
+    def _backfill(self) -> None:
+        """Load the newest backfill_lines entries into the ring; the stream then follows from their cursor."""
+        self.ring.clear()
+        self.cursor = None
+        if not self.backfill_lines:
+            # nothing is read back, so the ring can never vouch for history
+            self.truncated = True
+            self.ready.set()
+            return
+
+        cmd = (
+            f"journalctl {self._unit_args} -n 1 --no-pager 2>/dev/null | head -n 1; "
+            f"journalctl {self._unit_args} -n {self.backfill_lines} {self._output_args} --no-pager"
+        )
+        try:
+            out = self.meter.cli(cmd, priority="bulk") or ""
+        except Exception as e:
+            print(f"[JournalFollower] {self.host}: backfill failed: {e}")
+            return
+
+        lines = out.splitlines()
+        if lines and (m := RE_LOGS_BEGIN.match(lines[0])):
+            self.journal_begin = m.group("begin")
+        events = self._parse_lines(lines)
+        self.ring.extend(events)
+        self._advance(events)
+        self.truncated = len(events) >= self.backfill_lines
+        self.ready.set()
+
+    def _catch_up(self) -> bool:
+        """
+        Replay everything logged after self.cursor while the stream was down:
+        into the ring, then to subscribers flagged `replayed`. False if the meter
+        no longer knows the cursor (journal rotated or wiped); any other failure raises.
+        """
+        cmd = f"journalctl {self._unit_args} {self._output_args} --no-pager --after-cursor={shlex.quote(self.cursor)}"
+        code, out, _ = self.meter.exec_parse(cmd, priority="bulk")
+        if code != 0:
+            return False
+
+        events = self._parse_lines(out.splitlines())
+        for ev in events:
+            ev.replayed = True
+        self.recoveries.append((time.time(), len(events)))
+        if events:
+            self.lines += len(events)
+            self.recovered += len(events)
+            self.ring.extend(events)
+            self._advance(events)
+            self._publish(events)
+        print(f"[JournalFollower] {self.host}: resumed, {len(events)} line(s) recovered")
+        return True
+
+    def _resume(self) -> None:
+        self._check_wire()
+        if self.cursor is None or not self.ready.is_set():
+            self._backfill()
+            return
+        if not self._catch_up():
+            print(f"[JournalFollower] {self.host}: cursor lost, lines logged during the drop were not replayed")
+            self.gaps += 1
+            self.ready.clear()
+            self._backfill()
+
+    def _run(self) -> None:
+        delay = self.RETRY_DELAY
+        while not self._stop.is_set():
+            try:
+                self._resume()
+                channel = self.meter.open_stream(self.follow_command(self.cursor))
+            except Exception as e:
+                print(f"[JournalFollower] {self.host}: unable to resume journalctl, retry in {delay:.0f}s: {e}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+                continue
+
+            self._channel = channel
+            opened_at = time.monotonic()
+            self._down_since = None
+            try:
+                self._pump(channel)
+            except Exception as e:
+                print(f"[JournalFollower] {self.host}: stream error: {e}")
+            finally:
+                self._down_since = time.monotonic()
+                self._channel = None
+                self.meter.close_stream(channel)
+
+            if not self._stop.is_set():
+                self.reconnects += 1
+                if time.monotonic() - opened_at >= self.STABLE_AFTER:
+                    delay = self.RETRY_DELAY
+                self._stop.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    def _pump(self, channel) -> None:
+        buf = b""
+        while not self._stop.is_set():
+            chunk = channel.recv(self.READ_SIZE)
+            if not chunk:
+                return
+            self.bytes += len(chunk)
+            lines, buf = split_chunk(buf + chunk)
+            events = parse_journal_lines(lines)
+            if events:
+                self.lines += len(events)
+                self.stream_lines += len(events)
+                self.ring.extend(events)
+                self._advance(events)
+                self._publish(events)
+
+    # ---- historical queries ----
+    def _to_epoch(self, value: Union[str, float, None]) -> Optional[float]:
+        if value is None or isinstance(value, (int, float)):
+            return value
+        return self.meter.meter_epoch(value)
+
+    def _complete(self) -> bool:
+        """True while the ring still holds everything the meter's journal has for our units."""
+        return not self.truncated and not self.ring.dropped
+
+    def query(self, *,
+              since: Union[str, float, None] = None,
+              until: Union[str, float, None] = None,
+              regex: Union[str, Pattern[str], None] = None,
+              unit: Optional[str] = None,
+              contains: Optional[str] = None,
+              limit: Optional[int] = None,
+              tail: Optional[int] = None) -> Optional[List[LogEvent]]:
+        """
+        JournalRing.query with `since`/`until` given either as epoch seconds or as
+        meter-local "%Y-%m-%d %H:%M:%S" text, the same string a --since would get.
+        Returns None when the ring cannot answer for sure so callers can fall back
+        to journalctl over SSH: no backfill yet, the stream is down (which covers a
+        catch-up still being replayed), the window reaches back past the oldest line
+        still held, or `until` lies past the newest line received, whose successors
+        may still be on the wire.
+        """
+        if not self.ready.is_set() or self.down_for() > 0:
+            return None
+        try:
+            since_epoch, until_epoch = self._to_epoch(since), self._to_epoch(until)
+        except Exception:
+            return None
+
+        if until_epoch is not None:
+            newest = self.ring.newest_epoch
+            if newest is None or newest < until_epoch:
+                return None
+
+        if not self._complete():
+            oldest = self.ring.oldest_epoch
+            if since_epoch is not None:
+                if oldest is None or since_epoch < oldest:
+                    return None
+            elif tail is None or self.ring.count(unit) < tail:
+                return None
+
+        return self.ring.query(since=since_epoch, until=until_epoch, regex=regex, unit=unit,
+                               contains=contains, limit=limit, tail=tail)
+
+    def text(self, *, output: str = "short", header: bool = False, **query) -> Optional[str]:
+        """
+        query() rendered like journalctl output: "short" lines (optionally behind the
+        "-- Logs begin at ..." header) or "cat" (messages only). None if unanswerable.
+        """
+        events = self.query(**query)
+        if events is None:
+            return None
+        if output == "cat":
+            return "\n".join(ev.msg for ev in events)
+        try:
+            localtime = self.meter.meter_localtime
+            lines = [format_short(ev, localtime(ev.epoch)) for ev in events]
+            if header and self.journal_begin and events:
+                end = localtime(events[-1].epoch)
+                lines.insert(0, f"-- Logs begin at {self.journal_begin}, end at {end:%a %Y-%m-%d %H:%M:%S}. --")
+        except Exception:
+            return None
+        return "\n".join(lines)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            subs = [sub.stats() for sub in self._subs]
+        return {
+            "host": self.host,
+            "alive": self.alive,
+            "wire": self.wire,
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "bytes_per_line": round(self.bytes / self.stream_lines) if self.stream_lines else 0,
+            "reconnects": self.reconnects,
+            "down_for": round(self.down_for(), 1),
+            "recovered": self.recovered,
+            "recovered_last": self.recoveries[-1][1] if self.recoveries else 0,
+            "recoveries": list(self.recoveries),
+            "gaps": self.gaps,
+            "ready": self.ready.is_set(),
+            "truncated": self.truncated,
+            "ring": self.ring.stats(),
+            "subscribers": subs,
+        }
+
+
+class JournalRecorder:
+    """
+    Tees every journal line a Listener handles into `<base>.journal.jsonl`, raw
+    as it came off the wire, and when the Listener closes writes what came of
+    them (faults, device results, the monitors that ran) to `<base>.result.json`.
+    lib.automation.replay runs the monitors over such a pair offline and checks
+    they reach the same verdict.
+
+    What steers the monitors from outside the journal goes in between the lines
+    as CONTROL records (see control()): the allowed set and current device when
+    they change, and actions queued from other threads. Each carries the
+    Listener clock `at` and `epoch`, that moment on the journal's clock.
+
+    A recording stops growing at MAX_BYTES (the result says `truncated`), and
+    only the newest KEEP recordings in the directory are kept.
+    """
+    MAX_BYTES = 200 * 1024 * 1024
+    KEEP = 20
+    CONTROL = '{"_replay":'     # prefix of a control record; journal lines never start with it
+
+    def __init__(self, base: str, max_bytes: Optional[int] = None, keep: Optional[int] = None):
+        self.journal_path = base + ".journal.jsonl"
+        self.result_path = base + ".result.json"
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self.meta: Dict[str, object] = {}
+        self.faults: List[Dict[str, object]] = []
+        self.lines = 0
+        self.bytes = 0
+        self.truncated = False
+        self._offset: Optional[float] = None    # journal epoch - Listener clock, from the last live line
+        self._prune(os.path.dirname(self.journal_path) or ".", (keep or self.KEEP) - 1)
+        self._f = open(self.journal_path, "w", encoding="utf-8")
+
+    @staticmethod
+    def _prune(directory: str, keep: int) -> None:
+        """Delete all but the newest `keep` recordings (and their result files) in `directory`."""
+        recordings = sorted(glob.glob(os.path.join(glob.escape(directory), "*.journal.jsonl")),
+                            key=lambda p: os.path.getmtime(p), reverse=True)
+        for path in recordings[max(0, keep):]:
+            base = path[:-len(".journal.jsonl")]
+            for old in (path, base + ".result.json"):
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def _append(self, line: str) -> bool:
+        if self._f.closed or self.truncated:
+            return False
+        if self.bytes + len(line) > self.max_bytes:
+            self.truncated = True
+            return False
+        self._f.write(line)
+        self.bytes += len(line)
+        return True
+
+    def write(self, ev: LogEvent, at: Optional[float] = None) -> None:
+        """Record a journal line; `at` is when the Listener handled it."""
+        # lines replayed after a drop arrive late and would skew the offset
+        if at is not None and ev.epoch and not ev.replayed:
+            self._offset = ev.epoch - at
+        if self._append(ev.raw + "\n"):
+            self.lines += 1
+
+    def control(self, kind: str, at: float, **data) -> None:
+        """Record a non-journal input ("allowed" or "action") at Listener time `at`."""
+        epoch = at + self._offset if self._offset is not None else None
+        self._append(json.dumps({"_replay": kind, "at": at, "epoch": epoch, **data}, default=str) + "\n")
+
+    def fault(self, f: Fault, at: float) -> None:
+        self.faults.append({"device": f.device, "severity": f.severity, "message": f.message, "at": at})
+
+    def close(self, result: Optional[Dict[str, object]] = None) -> None:
+        if self._f.closed:
+            return
+        self._f.close()
+        data = {**self.meta, **(result or {}), "lines": self.lines, "truncated": self.truncated,
+                "faults": self.faults}
+        try:
+            with open(self.result_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, default=str)
+        except Exception as e:
+            print(f"[JournalRecorder] unable to save {self.result_path}: {e}")
@@ -1,8 +1,9 @@
 from __future__ import annotations
-import os, re, time, json, threading
+import os, re, time, select, threading
 import paramiko
+from dataclasses import asdict, is_dataclass
 from datetime import datetime
-from typing import Optional, List, Dict, Tuple, Iterable, Any
+from typing import Optional, List, Dict, Tuple, Iterable, Any, Callable
 
 from lib.automation.actions import ClearWatches
 from lib.automation.monitors.models import (
@@ -11,9 +12,10 @@ from lib.automation.monitors.models import (
 )
 from lib.automation.shared_state import SharedState
 from lib.automation.monitors import create_monitor
+from lib.automation.rules import RuleSet
+from lib.automation.journal import JournalFollower, JournalRecorder, parse_journal_line
 
 
-RE_FALLBACK = re.compile(r'^(\w+\s+\d+\s+\d+:\d+:\d+)\s+\S+\s+MS3\[\d+\]:\s*(.*)')
 USELESS_RES = [
     re.compile(r'^WebKitLib:WebKitSetURL:\d+: URL=http://127\.0\.0\.1:8005/UIPage\.php'),
     re.compile(r'^WebKitLib:WebKitRefresh:\d+: Refresh'),
@@ -32,7 +34,82 @@ USELESS_RES = [
     re.compile(r'^MS3:sSigThreadMain:\d+: Caught and ignore SIGCHLD'),
 ]
 
+class _ParamikoHost:
+    """
+    Bare paramiko connection offering the calls a JournalFollower makes on a
+    meter, so a Listener without a METERMANAGER meter still gets a private,
+    resumable journal stream.
+    """
+    def __init__(self, host: str, user: str, pswd: str):
+        self.host, self.user, self.pswd = host, user, pswd
+        self._client: Optional[paramiko.SSHClient] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> paramiko.SSHClient:
+        with self._lock:
+            transport = self._client.get_transport() if self._client else None
+            if transport is None or not transport.is_active():
+                if self._client is not None:
+                    self._client.close()
+                client = paramiko.SSHClient()
+                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+                client.connect(self.host, username=self.user, password=self.pswd)
+                self._client = client
+            return self._client
+
+    def open_stream(self, command: str):
+        channel = self._connect().get_transport().open_session()
+        channel.exec_command(command)
+        return channel
+
+    def close_stream(self, channel) -> None:
+        try:
+            channel.close()
+        except Exception:
+            pass
+
+    def exec_parse(self, command: str, priority: str = "normal") -> Tuple[int, str, str]:
+        _, stdout, stderr = self._connect().exec_command(command)
+        out = stdout.read().decode(errors="replace").strip()
+        err = stderr.read().decode(errors="replace").strip()
+        return stdout.channel.recv_exit_status(), out, err
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class _PrivateJournal:
+    """A Listener-owned follower + subscription pair, torn down together on close()."""
+    def __init__(self, follower: JournalFollower, sub, host: _ParamikoHost):
+        self.follower, self.sub, self.ssh = follower, sub, host
+
+    def fileno(self) -> int:
+        return self.sub.fileno()
+
+    def drain(self) -> Optional[List[LogEvent]]:
+        return self.sub.drain()
+
+    def down_for(self) -> float:
+        return self.sub.down_for()
+
+    def close(self) -> None:
+        self.sub.close()
+        self.follower.stop()
+        self.ssh.close()
+
+
 class Listener:
+    UNIT = "MS3_Platform.service"
+    # upper bound on how long the loop sleeps with no log traffic and no armed watch,
+    # so stop/end_listener and queued actions from other threads are noticed promptly
+    IDLE_WAKEUP_S = 0.1
+    # while the journal stream is down, hold watchdog deadlines this long so the lines
+    # replayed on resume get to cancel their watches before anything is declared a fault
+    RESUME_GRACE_S = 15.0
+
     def __init__(self,
                  shared: SharedState,
                  host: str = "192.168.5.61",
@@ -41,9 +118,14 @@ class Listener:
                  save_logs: bool = True,
                  verbose: bool = False,
                  trace_lines: bool = False,
+                 journal: Optional[JournalFollower] = None,
+                 clock: Optional[Callable[[], float]] = None,
+                 record: bool = False,
                  **kwargs
                  ):
         self.shared = shared
+        # shared per-meter follower (METERMANAGER.get_journal); None opens a private SSH stream
+        self.journal = journal
         self.host, self.user, self.pswd = host, user, pswd
         self.save_logs, self.verbose, self.trace_lines = save_logs, verbose, trace_lines
         
@@ -53,50 +135,50 @@ class Listener:
         # self.logfile_path = os.path.join(log_dir, f"{self.host}_{ts}.txt")
         self.logfile_path = os.path.join(log_dir,kwargs.pop("logfile_name", f"{self.host}_{ts}")+'.log')
 
+        # raw journal + outcome next to the log, for offline replay (lib.automation.replay)
+        self.recorder = JournalRecorder(os.path.splitext(self.logfile_path)[0]) if record else None
+
         self.devs: Dict[str, Any] = {}
-        self.wd = WatchdogManager()
+        # wall clock for watchdog deadlines; a replay passes its virtual clock
+        self.clock = clock or time.time
+        self.wd = WatchdogManager(clock=self.clock)
+        self._rules: Optional[RuleSet] = None
+        self.source = None
+        self._next_poll: Dict[str, float] = {}
+        self._recorded_scope: Optional[Tuple[List[str], Optional[str]]] = None
 
     # ---- Device registration ----
     def register(self, dev) -> None:
         self.devs[getattr(dev, "id")] = dev
-
-    # ---- SSH + journalctl stream ----
-    def _open_ssh(self):
-        cmd = f'journalctl -u MS3_Platform.service -f -n0 -o json'
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        # self.shared.log(f"connecting {self.user}@{self.host}", color=DIM)
-
-        client.connect(self.host, username=self.user, password=self.pswd)
-        self.shared.log(f"connected; running: {cmd}", color=DIM)
-
-        stdin, stdout, stderr = client.exec_command(cmd)
-        return client, stdout
+        self._rules = None
+
+    @property
+    def rules(self) -> RuleSet:
+        """Useless-line filters + declared monitor patterns, recompiled after each register()."""
+        if self._rules is None:
+            keywords = {dev_id: dev.patterns for dev_id, dev in self.devs.items() if getattr(dev, "patterns", None)}
+            self._rules = RuleSet(USELESS_RES, keywords)
+        return self._rules
+
+    # ---- journalctl stream ----
+    def _open_source(self):
+        """
+        Selectable event source with drain() -> Optional[List[LogEvent]] (None = closed),
+        down_for() and close(). Both kinds resume after a dropped stream on their own.
+        """
+        name = os.path.basename(self.logfile_path)
+        if self.journal is not None:
+            self.shared.log(f"subscribed to shared journal of {self.host}", color=DIM)
+            return self.journal.subscribe(maxsize=10000, units=(self.UNIT,), name=name)
+
+        ssh = _ParamikoHost(self.host, self.user, self.pswd)
+        follower = JournalFollower(ssh, units=(self.UNIT,), backfill_lines=0)
+        self.shared.log(f"following {self.UNIT} on {self.host}", color=DIM)
+        return _PrivateJournal(follower, follower.subscribe(maxsize=10000, name=name), ssh)
 
     # ---- JSON line -> LogEvent ----
     def _parse_line(self, line: str) -> Optional[LogEvent]:
-        try:
-            j = json.loads(line)
-            ts_raw = j.get("__REALTIME_TIMESTAMP", "")
-            hostname = j.get("_HOSTNAME", "")
-            msg = j.get("MESSAGE", "")
-
-            if ts_raw:
-                ts = datetime.fromtimestamp(int(ts_raw) / 1_000_000)
-            else:
-                ts = datetime.now()
-            return LogEvent(ts=ts, msg=msg, raw=line.rstrip("\n"), hostname=hostname)
-        except Exception:
-            # fallback try
-            m = RE_FALLBACK.match(line)
-            if not m:
-                return None
-            dt_str, msg = m.groups()
-            try:
-                ts = datetime.strptime(dt_str, "%b %d %H:%M:%S")
-            except Exception:
-                ts = datetime.now()
-            return LogEvent(ts=ts, msg=msg, raw=line.rstrip("\n"), hostname="")
+        return parse_journal_line(line)
 
     # ---- Human readable log line ----
     @staticmethod
@@ -111,11 +193,7 @@ class Listener:
         self.shared.log(text)
 
     def _is_useless(self, ev) -> bool:
-        msg = (ev.msg or '').strip()
-        for rx in USELESS_RES:
-            if rx.search(msg):
-                return True
-        return False
+        return self.rules.scan(ev.msg or '')[0]
 
     def _emit_faults(self, faults: List[Fault]) -> None:
         if not faults:
@@ -123,6 +201,8 @@ class Listener:
         for f in faults:
             color = RED if f.severity == "critical" else YELLOW
             s = f"[FAULT] {f.device}: {f.message}"
+            if self.recorder is not None:
+                self.recorder.fault(f, self.clock())
             self.shared.log(s, console=self.verbose, color=color)
             self.shared.last_error = s
             dev_name = getattr(self.shared, "current_device", None) or f.device
@@ -179,69 +259,165 @@ class Listener:
             else:
                 self.shared.log(f"[SUPPRESS][{dev_id}] progress: {a.current_cycle}/{a.total_cycles}", console=self.verbose, color=YELLOW)
 
-    # ---- Main loop ----
-    def run(self) -> None:
-        client, stdout = self._open_ssh()
-        try:
-            for line in iter(stdout.readline, ""):
-                if not line:
-                    time.sleep(0.05)
+    # ---- Line handling ----
+    def _record_scope(self) -> None:
+        """Record the allowed set and current device when they changed since the last record."""
+        scope = (sorted(self.shared.allowed_monitors or ()), getattr(self.shared, "current_device", None))
+        if scope != self._recorded_scope:
+            self._recorded_scope = scope
+            self.recorder.control("allowed", self.clock(), allowed=scope[0], current_device=scope[1])
+
+    def _drain_pending(self) -> None:
+        """Apply actions queued from other threads via SharedState.queue_action()."""
+        pending_actions = []
+        with self.shared.lock:
+            pending_actions = self.shared.__dict__.pop("_pending_actions", [])
+        # runs after every line, so a recording sees scope changes where the monitors did
+        if self.recorder is not None:
+            self._record_scope()
+        for a in pending_actions:
+            dev_id = getattr(a, "device", None) or "unknown"
+            if self.recorder is not None and is_dataclass(a):
+                self.recorder.control("action", self.clock(), device=dev_id, type=type(a).__name__, data=asdict(a))
+            self._process_action(a, dev_id)
+
+    def _handle_event(self, ev: LogEvent) -> None:
+        if self.recorder is not None:
+            self.recorder.write(ev, self.clock())
+
+        # one scan decides both the log filter and the monitor routing
+        useless, hits = self.rules.scan(ev.msg or '')
+        if self.save_logs and not useless:
+            self._log_to_file(self._format_human(ev))
+
+        # if self.trace_lines and self.verbose:
+        #     print(f"{GRAY}[line] {ev.msg}{RESET}")
+
+        # fan-out to registered monitors
+        for dev in list(self.devs.values()):
+            if getattr(dev, "patterns", None):
+                # declared patterns were already matched by the combined scan
+                if dev.id not in hits:
                     continue
+            else:
+                interested_fn = getattr(dev, "interested", None)
 
-                # Check and process any _pending_actions
-                pending_actions = []
-                with self.shared.lock:
-                    pending_actions = self.shared.__dict__.pop("_pending_actions", [])
-                for a in pending_actions:
-                    dev_id = getattr(a, "device", None) or "unknown"
-                    self._process_action(a, dev_id)
-
-                if self.shared.stop_event.is_set() or self.shared.end_listener.is_set():
-                    break
-
-                ev = self._parse_line(line)
-                if not ev:
+                # Check if monitor is interested in this event
+                try:
+                    is_interested = True if interested_fn is None else bool(interested_fn(ev.msg))
+                except Exception as e:
+                    self.shared.log(f"[{dev.id}] interested() error: {e}", console=True, color=YELLOW)
                     continue
 
-                if self.save_logs and not self._is_useless(ev):
-                    self._log_to_file(self._format_human(ev))
-
-                # if self.trace_lines and self.verbose:
-                #     print(f"{GRAY}[line] {ev.msg}{RESET}")
-
-                # fan-out to registered monitors
-                for dev in list(self.devs.values()):
-                    interested_fn = getattr(dev, "interested", None)
-
-                    # Check if monitor is interested in this event
-                    try:
-                        is_interested = True if interested_fn is None else bool(interested_fn(ev.msg))
-                    except Exception as e:
-                        self.shared.log(f"[{dev.id}] interested() error: {e}", console=True, color=YELLOW)
-                        continue
-
-                    if not is_interested:
-                        continue
-
-                    # Run the monitor and collect its actions
-                    try:
-                        actions = list((getattr(dev, "handle", lambda _ : [])(ev)) or [])
-                    except Exception as e:
-                        self.shared.log(f"[{dev.id}] handle() error: {e}", console=True, color=YELLOW)
-                        continue
+                if not is_interested:
+                    continue
 
-                    # Apply or suppress actions depending on allow-list
-                    for a in actions:
-                        self._process_action(a, dev.id)
+            # Apply or suppress actions depending on allow-list
+            for a in self._run_monitor(dev, ev):
+                self._process_action(a, dev.id)
 
-                # poll watchdogs
-                faults = self.wd.poll_timeouts()
-                self._emit_faults(faults)
+    def _run_monitor(self, dev, ev: LogEvent) -> List[Action]:
+        """Run the monitor and collect its actions."""
+        try:
+            return list((getattr(dev, "handle", lambda _ : [])(ev)) or [])
+        except Exception as e:
+            self.shared.log(f"[{dev.id}] handle() error: {e}", console=True, color=YELLOW)
+            return []
+
+    def _poll_monitors(self) -> None:
+        """Call poll() on monitors that declare a `poll_interval` and are due."""
+        now = time.monotonic()
+        for dev in list(self.devs.values()):
+            interval = getattr(dev, "poll_interval", None)
+            if not interval or now < self._next_poll.get(dev.id, 0.0):
+                continue
+            self._next_poll[dev.id] = now + interval
+            try:
+                actions = list(dev.poll() or [])
+            except Exception as e:
+                self.shared.log(f"[{dev.id}] poll() error: {e}", console=True, color=YELLOW)
+                continue
+            for a in actions:
+                self._process_action(a, dev.id)
+
+    def _stopped(self) -> bool:
+        return self.shared.stop_event.is_set() or self.shared.end_listener.is_set()
+
+    def _watchdogs_held(self, source) -> bool:
+        return 0.0 < source.down_for() < self.RESUME_GRACE_S
+
+    def _wakeup_in(self, held: bool = False) -> float:
+        """Seconds until the loop has to run again: the earliest watchdog deadline, capped at IDLE_WAKEUP_S."""
+        deadline = self.wd.next_deadline()
+        if deadline is None or held:
+            return self.IDLE_WAKEUP_S
+        return min(self.IDLE_WAKEUP_S, max(0.0, deadline - self.clock()))
+
+    # ---- Loop steps (driven by run() or by a ListenerHub) ----
+    def open(self):
+        if self.recorder is not None:
+            self.recorder.meta.update(
+                host=self.host,
+                program=getattr(self.shared, "current_program", None),
+                current_device=getattr(self.shared, "current_device", None),
+                allowed=sorted(getattr(self.shared, "allowed_monitors", ()) or ()),
+            )
+        self.source = self._open_source()
+        return self.source
+
+    def wakeup_in(self) -> float:
+        return self._wakeup_in(self._watchdogs_held(self.source))
+
+    def step(self, readable: bool) -> bool:
+        """One pass after a wakeup: actions, monitor polls, new lines, watchdogs. False once done."""
+        # Check and process any _pending_actions
+        self._drain_pending()
+
+        if self._stopped():
+            return False
+
+        self._poll_monitors()
+
+        if readable:
+            events = self.source.drain()
+            if events is None:
+                return False
+            for ev in events:
+                if self._stopped():
+                    return False
+                self._handle_event(ev)
+                self._drain_pending()
+                # replayed lines arrive late: their deadlines are only judged once the whole batch is in
+                if not ev.replayed:
+                    self._emit_faults(self.wd.poll_timeouts())
+
+        # poll watchdogs
+        if not self._watchdogs_held(self.source):
+            faults = self.wd.poll_timeouts()
+            self._emit_faults(faults)
+        return True
+
+    def close(self) -> None:
+        if self.source is not None:
+            self.source.close()
+        if self.recorder is not None:
+            self.recorder.close({
+                "device_results": dict(self.shared.device_results),
+                "last_error": getattr(self.shared, "last_error", None),
+            })
+        self.shared.log(f"End of listener main loop", color=DIM)
 
+    # ---- Main loop ----
+    def run(self) -> None:
+        source = self.open()
+        try:
+            while True:
+                # wakes on log traffic, on the earliest watchdog deadline, or after IDLE_WAKEUP_S
+                readable, _, _ = select.select([source], [], [], self.wakeup_in())
+                if not self.step(bool(readable)):
+                    break
         finally:
-            stdout.channel.close()
-            client.close()
-            self.shared.log(f"End of listener.run() main loop", color=DIM)
+            self.close()
 
 
 # --- Helper to start a listener thread for a job ---
@@ -253,13 +429,24 @@ def start_listener_thread(shared,
                           save_logs: bool = True,
                           verbose: bool = False,
                           trace_lines: bool = False,
+                          journal: Optional[JournalFollower] = None,
+                          hub=None,
                           **kkwargs
-                          ) -> threading.Thread:
+                          ):
+    """
+    Build the job's Listener and start it: on `hub` (a ListenerHub) when given,
+    otherwise on its own thread. Either way the result has join()/is_alive().
+    """
     lst = Listener(shared=shared, host=host, user=user, pswd=pswd, save_logs=save_logs,
-                   verbose=verbose, trace_lines=trace_lines, **kkwargs)
+                   verbose=verbose, trace_lines=trace_lines, journal=journal, **kkwargs)
     for dev_id, kwargs in devices:
         dev = create_monitor(dev_id, shared=shared, verbose=verbose, **kwargs)
         lst.register(dev)
+    if lst.recorder is not None:
+        lst.recorder.meta["devices"] = devices
+
+    if hub is not None:
+        return hub.add(lst)
 
     t = threading.Thread(target=lst.run, name=f"listener-{host}", daemon=True)
     t.start()
@@ -0,0 +1,150 @@
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from lib.automation.listener import Listener
+
+
+class ListenerHandle:
+    """What start_listener_thread() returns for a hub-run Listener; quacks like its Thread."""
+
+    def __init__(self, listener: Listener):
+        self.listener = listener
+        self.name = f"listener-{listener.host}"
+        self._done = threading.Event()
+
+    def is_alive(self) -> bool:
+        return not self._done.is_set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._done.wait(timeout)
+
+
+class ListenerHub:
+    """
+    Runs every job's Listener on one thread. Their journal sources (shared
+    follower subscriptions, which are selectable) sit in a single selectors
+    loop that sleeps until a source has lines, the earliest watchdog deadline
+    of any meter, or IDLE_WAKEUP_S. Each Listener keeps its own monitors and
+    watchdogs; the hub only steps it. Monitors with a `poll_interval` are
+    polled from the loop instead of from threads of their own.
+    """
+    IDLE_WAKEUP_S = Listener.IDLE_WAKEUP_S
+
+    def __init__(self, name: str = "listener-hub"):
+        self.name = name
+        self._sel = selectors.DefaultSelector()
+        self._listeners: Dict[Listener, ListenerHandle] = {}
+        self._incoming: Deque[ListenerHandle] = deque()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self._rsock, self._wsock = socket.socketpair()
+        self._rsock.setblocking(False)
+        self._wsock.setblocking(False)
+        self._sel.register(self._rsock, selectors.EVENT_READ, None)
+
+        self.wakeups = 0
+        self.steps = 0
+        self.busy_s = 0.0
+        self.peak_listeners = 0
+
+    def add(self, listener: Listener) -> ListenerHandle:
+        """Hand a registered Listener to the hub; it is opened and stepped on the hub thread."""
+        handle = ListenerHandle(listener)
+        with self._lock:
+            self._incoming.append(handle)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self.wakeup()
+        return handle
+
+    def wakeup(self) -> None:
+        try:
+            self._wsock.send(b"\0")
+        except OSError:
+            pass  # buffer full: a wakeup is already pending
+
+    def _admit(self) -> None:
+        while True:
+            with self._lock:
+                if not self._incoming:
+                    return
+                handle = self._incoming.popleft()
+            lst = handle.listener
+            try:
+                source = lst.open()
+                self._sel.register(source, selectors.EVENT_READ, lst)
+            except Exception as e:
+                print(f"[ListenerHub] {lst.host}: unable to start listener: {e}")
+                try:
+                    lst.close()
+                except Exception:
+                    pass
+                handle._done.set()
+                continue
+            self._listeners[lst] = handle
+            self.peak_listeners = max(self.peak_listeners, len(self._listeners))
+
+    def _retire(self, lst: Listener) -> None:
+        handle = self._listeners.pop(lst)
+        try:
+            self._sel.unregister(lst.source)
+        except Exception:
+            pass
+        try:
+            lst.close()
+        except Exception as e:
+            print(f"[ListenerHub] {lst.host}: close failed: {e}")
+        handle._done.set()
+
+    def _timeout(self) -> Optional[float]:
+        # no listeners: block until add() wakes us
+        if not self._listeners:
+            return None
+        return min(lst.wakeup_in() for lst in self._listeners)
+
+    def _run(self) -> None:
+        while True:
+            self._admit()
+            ready = self._sel.select(self._timeout())
+            t0 = time.perf_counter()
+            self.wakeups += 1
+
+            readable = set()
+            for key, _ in ready:
+                if key.data is None:
+                    try:
+                        self._rsock.recv(4096)
+                    except OSError:
+                        pass
+                else:
+                    readable.add(key.data)
+
+            for lst in list(self._listeners):
+                self.steps += 1
+                try:
+                    alive = lst.step(lst in readable)
+                except Exception as e:
+                    print(f"[ListenerHub] {lst.host}: listener failed: {type(e).__name__}: {e}")
+                    alive = False
+                if not alive:
+                    self._retire(lst)
+            self.busy_s += time.perf_counter() - t0
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "listeners": len(self._listeners),
+            "peak_listeners": self.peak_listeners,
+            "wakeups": self.wakeups,
+            "steps": self.steps,
+            "busy_s": round(self.busy_s, 3),
+            "hosts": sorted(lst.host for lst in list(self._listeners)),
+        }
+
+
+LISTENER_HUB = ListenerHub()
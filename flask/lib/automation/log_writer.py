@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, TextIO
+
+
+class LogRecord(NamedTuple):
+    """One SharedState.log() call. Only turned into text when something reads or writes it."""
+    ts: float
+    source: str
+    level: str
+    message: str
+
+    def format(self) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.ts)) + f".{int(self.ts % 1 * 1000):03d}"
+        if self.source:
+            return f"[{stamp}] {self.source}: {self.message}"
+        return f"[{stamp}] {self.message}"
+
+    def __str__(self) -> str:
+        return self.format()
+
+
+class LogWriter:
+    """
+    The one thread that writes job log files. log() only appends (path, record)
+    to a bounded deque and returns; the writer formats the records, keeps one open
+    handle per log file and flushes once per batch. When the queue is full the
+    record is dropped from the file (and counted) rather than blocking the caller.
+    A deque + Event rather than queue.Queue: append/popleft need no lock, and the
+    producer only touches the Event when the writer has gone idle.
+
+    Writers that must not lose records (job log spool segments) pass `wait`: a
+    full queue then holds them up to that long while the writer drains it.
+    """
+    MAX_QUEUE = 20000
+    MAX_OPEN_FILES = 32
+    IDLE_FLUSH_S = 1.0
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize or self.MAX_QUEUE
+        self._items: Deque[tuple] = deque()
+        self._wake = threading.Event()
+        # set by the writer as it drains the queue, for producers waiting on a full one
+        self._drained = threading.Event()
+        self._idle = True
+        self._files: Dict[str, TextIO] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.waited = 0
+        self.errors = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _push(self, item: tuple) -> None:
+        self._items.append(item)
+        if self._idle:
+            self._wake.set()
+
+    def write(self, path: str, record: LogRecord, wait: float = 0.0) -> bool:
+        """Queue one record for `path`. With a full queue, waits up to `wait` seconds for room; False if dropped."""
+        if len(self._items) >= self.maxsize and not self._wait_for_room(wait):
+            self.dropped += 1
+            return False
+        if self._thread is None:
+            self._ensure_thread()
+        self._push((path, record))
+        return True
+
+    def _wait_for_room(self, wait: float) -> bool:
+        deadline = time.monotonic() + wait
+        while len(self._items) >= self.maxsize:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._ensure_thread()
+            self._drained.clear()
+            self._wake.set()
+            self._drained.wait(min(remaining, 0.05))
+        self.waited += 1
+        return True
+
+    def flush(self, path: Optional[str] = None, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is on disk (for `path`, or every file)."""
+        done = threading.Event()
+        self._ensure_thread()
+        self._push(("flush", path, done))
+        return done.wait(timeout)
+
+    def close(self, path: str) -> None:
+        """Flush and close `path`'s handle once the records queued before this call are written."""
+        self._ensure_thread()
+        self._push(("close", path, None))
+
+    def _file(self, path: str) -> Optional[TextIO]:
+        f = self._files.get(path)
+        if f is None:
+            if len(self._files) >= self.MAX_OPEN_FILES:
+                # oldest opened first; it is reopened in append mode if it logs again
+                self._files.pop(next(iter(self._files))).close()
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                f = self._files[path] = open(path, "a", encoding="utf-8")
+            except Exception as e:
+                self.errors += 1
+                print(f"Failed to open {path}: {e}")
+                return None
+        return f
+
+    def _control(self, item) -> None:
+        op, path, done = item
+        targets = [path] if path is not None else list(self._files)
+        for p in targets:
+            f = self._files.get(p)
+            if f is None:
+                continue
+            try:
+                f.flush()
+                if op == "close":
+                    f.close()
+                    del self._files[p]
+            except Exception as e:
+                self.errors += 1
+                print(f"Failed to write to {p}: {e}")
+        if done is not None:
+            done.set()
+
+    def _run(self) -> None:
+        while True:
+            self._idle = True
+            if not self._items:
+                self._wake.wait(self.IDLE_FLUSH_S)
+            self._wake.clear()
+            self._idle = False
+            dirty = set()
+            n = 0
+            while self._items:
+                item = self._items.popleft()
+                n += 1
+                if n % 1024 == 0:
+                    self._drained.set()
+                if len(item) == 3:
+                    for p in dirty:
+                        self._control(("flush", p, None))
+                    dirty.clear()
+                    self._control(item)
+                else:
+                    path, record = item
+                    f = self._file(path)
+                    if f is not None:
+                        try:
+                            f.write(record.format() + "\n")
+                            self.written += 1
+                            dirty.add(path)
+                        except Exception as e:
+                            self.errors += 1
+                            print(f"Failed to write to {path}: {e}")
+            # one flush per file per batch
+            for p in dirty:
+                self._control(("flush", p, None))
+            self._drained.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._items),
+            "written": self.written,
+            "dropped": self.dropped,
+            "waited": self.waited,
+            "errors": self.errors,
+            "open_files": len(self._files),
+        }
+
+
+LOG_WRITER = LogWriter()
@@ -21,6 +21,7 @@ KEY_LAYOUTS: Dict[str, List[str]] = {
 
 class KeypadMonitor:
     id = "keypad"
+    patterns = ("key_pressed:",)
 
     @staticmethod
     def _layouts_for_meter(meter_type: str, firmwares: Dict[str, str]) -> List[str]:
@@ -82,7 +83,8 @@ class KeypadMonitor:
         return (s or "").strip().upper()
 
     def interested(self, msg: str) -> bool:
-        return "key_pressed:" in msg.lower()
+        m = msg.lower()
+        return any(p in m for p in self.patterns)
 
     def _cancel_gap(self) -> Iterable[Action]:
         if self._gap_key:
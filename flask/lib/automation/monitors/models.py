@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Protocol, Iterable, Optional, List, Dict, Any
+from typing import Protocol, Iterable, Optional, List, Dict, Any, Callable
 import heapq, time
 
 
@@ -15,6 +15,10 @@ class LogEvent:
     msg: str
     raw: str
     hostname: str = ""
+    unit: str = ""
+    epoch: float = 0.0     # meter wall clock (journal __REALTIME_TIMESTAMP), seconds
+    cursor: str = ""
+    replayed: bool = False   # recovered after a stream drop, delivered late
 
 @dataclass
 class Fault:
@@ -64,12 +68,14 @@ class _Deadline:
     severity: str = field(compare=False)
 
 class WatchdogManager:
-    def __init__(self):
+    def __init__(self, clock: Callable[[], float] = time.time):
+        # wall clock in seconds; a replay passes its virtual clock instead
+        self.clock = clock
         self.heap: List[_Deadline] = []
         self.active: Dict[str, _Deadline] = {}
 
     def start(self, a: StartWatch):
-        d = _Deadline(time.time() + a.timeout_s, a.key, a.device, a.on_timeout_msg, a.severity)
+        d = _Deadline(self.clock() + a.timeout_s, a.key, a.device, a.on_timeout_msg, a.severity)
         self.active[a.key] = d
         heapq.heappush(self.heap, d)
 
@@ -87,11 +93,20 @@ class WatchdogManager:
             self.active.pop(key, None)
         return len(keys)
 
+    def next_deadline(self) -> Optional[float]:
+        """Earliest live deadline (on self.clock), or None when nothing is armed."""
+        # cancelled, cleared or re-armed watches stay in the heap; drop them as they surface
+        while self.heap and self.active.get(self.heap[0].key) is not self.heap[0]:
+            heapq.heappop(self.heap)
+        return self.heap[0].when if self.heap else None
+
     def poll_timeouts(self) -> List[Fault]:
         faults: List[Fault] = []
-        now = time.time()
+        now = self.clock()
         while self.heap and self.heap[0].when <= now:
             d = heapq.heappop(self.heap)
-            if self.active.pop(d.key, None) is not None:
+            # only the latest start() of a key may fire; an older deadline of a re-armed key is stale
+            if self.active.get(d.key) is d:
+                del self.active[d.key]
                 faults.append(Fault(device=d.device, severity=d.severity, message=d.msg))
         return faults
@@ -7,6 +7,7 @@ from lib.automation.shared_state import SharedState
 
 class ModemMonitor:
     id = "modem"
+    patterns = ("modem",)
     re_req_cmd = re.compile(r'\bMODEM:\s*SendRemote:\s*CMD\.(?P<cmd>CONNECT|DISCONNECT)\b', re.IGNORECASE)
     re_connected    = re.compile(r'\bstate=S4_CONNECTED\b', re.IGNORECASE)
     re_disconnected = re.compile(r'\bstate=S1_IDLE\b', re.IGNORECASE)
@@ -31,7 +32,7 @@ class ModemMonitor:
 
     def interested(self, msg: str) -> bool:
         m = msg.lower()
-        return ("modem" in m)
+        return any(p in m for p in self.patterns)
 
     def _clear_connect_watch(self, reason: str):
         if self._connect_key:
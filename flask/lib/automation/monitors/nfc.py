@@ -7,6 +7,7 @@ from lib.automation.shared_state import SharedState
 
 class NFCMonitor:
     id = "nfc"
+    patterns = ("kiosk_nfc", "kiosk_neo", "emv_power", "card_read_inst", "emv_power_reply")
     re_req_any = re.compile(
         r'GENERIC_TERMINAL\.\S*->KIOSK_(?:NFC|NEO)\.\S*\s+(?:APPLICATION_MSG\s+)?'
         r'(?P<verb>EMV_POWER|CARD_READ_INST)\b.*?\bD=(?P<payload>[0-9A-Fa-f ]+)',
@@ -31,13 +32,7 @@ class NFCMonitor:
 
     def interested(self, msg: str) -> bool:
         m = msg.lower()
-        return (
-            ("kiosk_nfc" in m)
-            or ("kiosk_neo" in m)
-            or ("emv_power" in m)
-            or ("card_read_inst" in m)
-            or ("emv_power_reply" in m)
-        )
+        return any(p in m for p in self.patterns)
 
     @staticmethod
     def _tokens(hex_blob: str) -> List[str]:
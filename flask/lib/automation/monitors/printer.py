@@ -7,6 +7,7 @@ from lib.automation.shared_state import SharedState
 
 class PrinterMonitor:
     id = "printer"
+    patterns = ("print",)
     re_start  = re.compile(r'IPSBusDevSendPrintMessageVA', re.IGNORECASE)
     re_result = re.compile(r'PRINT_TICKET_REPLY:.*result=([A-Z]+)', re.IGNORECASE)
     re_status = re.compile(r'PRINTER_STATUS_REPLY:', re.IGNORECASE)
@@ -24,7 +25,7 @@ class PrinterMonitor:
 
     def interested(self, msg: str) -> bool:
         m = msg.lower()
-        return ("print" in m)
+        return any(p in m for p in self.patterns)
 
     def handle(self, ev: LogEvent) -> Optional[Iterable[Action]]:
         msg = ev.msg
@@ -1,5 +1,4 @@
 import re
-import threading
 import time
 from typing import Iterable, List, Optional, Dict
 
@@ -18,6 +17,8 @@ class RobotKeypadMonitor:
     - Uses robot events ("button_press") to arm/disarm per-button failure timers
     """
     id = "robot_keypad"
+    patterns = ("key_pressed:",)
+    poll_interval = 0.3     # robot events are polled from the Listener loop
 
     def __init__(
         self,
@@ -57,35 +58,20 @@ class RobotKeypadMonitor:
 
         self.robot = RobotClient()
 
-        # Background thread: watches robot events
-        self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._thread.start()
-
     # ------------------------------------------------------------------ #
-    # Background thread — polls robot events
+    # Robot events — polled by the Listener every poll_interval
     # ------------------------------------------------------------------ #
-    def _run(self):
-        self.shared.log("robot event polling background thread for RobotKeypadMonitor: STARTED", color=GREEN)
-
+    def poll(self) -> List[Action]:
         # All past events get cleared when calling jobs.py.start_physical_job so there shouldnt be any old 'button_press' events
-        while not self._stop_event.is_set():
-            end_requested = (getattr(self.shared, "end_listener", None) and self.shared.end_listener.is_set())
-            if self.shared.stop_event.is_set() or end_requested:
-                break
-
-            self._check_robot_events()
-            if self._stop_event.wait(0.3):
-                break
+        return self._check_robot_events()
 
-        self.shared.log("robot event polling background thread for RobotKeypadMonitor: STOPPED", color=YELLOW)
-
-    def _check_robot_events(self) -> None:
-        """Poll robot events and queue actions according to strict rules."""
+    def _check_robot_events(self) -> List[Action]:
+        """Poll robot events and return actions according to strict rules."""
+        actions: List[Action] = []
         while True:
             found, data = self.robot.try_get_event("button_press", consume=True)
             if not found:
-                break
+                return actions
 
             button_name_raw = data.get("button_name", "")
             button_name = self._norm(button_name_raw)
@@ -100,8 +86,7 @@ class RobotKeypadMonitor:
                 self.shared.log(f"robot STARTED pressing '{button_name_raw}' → arming timeout", color=YELLOW)
 
                 # Cancel any previous dangling watch (shouldn't happen, but be safe)
-                for cancel in self._cancel_button_watch(button_name):
-                    self.shared.queue_action(cancel)
+                actions.extend(self._cancel_button_watch(button_name))
 
                 # ARM NEW TIMER
                 watch_key = f"{self.id}:button:{button_name}:{int(time.time() * 1000)}"
@@ -114,15 +99,14 @@ class RobotKeypadMonitor:
                     on_timeout_msg=f"Robot pressing '{button_name_raw}' but the meter did not see this button pressed in the logs within {self.per_button_timeout_s}s",
                     severity="critical"
                 )
-                self.shared.queue_action(timer)
+                actions.append(timer)
 
             elif action_type == "pressed":
                 if pressed is False:
                     # ROBOT TRIED BUT FAILED → cancel timer (prevents false timeout if meter never logs it)
                     self.shared.log(f"robot reports FAILED press on '{button_name_raw}' → cancelling timer", color=RED)
 
-                    for cancel in self._cancel_button_watch(button_name):
-                        self.shared.queue_action(cancel)
+                    actions.extend(self._cancel_button_watch(button_name))
 
                 elif pressed is True:
                     # We expect the meter to log KEY_PRESSED → handle() will cancel the timer
@@ -143,7 +127,8 @@ class RobotKeypadMonitor:
         return (s or "").strip().upper()
 
     def interested(self, msg: str) -> bool:
-        return "key_pressed:" in msg.lower()
+        m = msg.lower()
+        return any(p in m for p in self.patterns)
 
     def _cancel_gap(self) -> Iterable[Action]:
         if self._gap_key:
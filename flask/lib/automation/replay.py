@@ -0,0 +1,250 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lib.automation.actions import ClearWatches
+from lib.automation.journal import JournalRecorder, parse_journal_lines
+from lib.automation.listener import Listener
+from lib.automation.monitors import create_monitor
+from lib.automation.monitors.models import (
+    CancelWatch, LogEvent, MarkSuccess, MetaUpdate, ProgressUpdate, StartWatch
+)
+from lib.automation.shared_state import SharedState
+
+
+# action types a recording's "action" records may name
+_ACTIONS = {cls.__name__: cls for cls in (StartWatch, CancelWatch, ClearWatches, MarkSuccess, MetaUpdate, ProgressUpdate)}
+
+
+class ReplayClock:
+    """Virtual wall clock: the WatchdogManager of a replayed Listener reads this instead of time.time()."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = float(start)
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance_to(self, t: float) -> None:
+        # fallback-parsed lines carry no journal time; never run the clock backwards
+        if t > self.now:
+            self.now = t
+
+
+class _ReplaySource:
+    """Listener source fed by the replay loop instead of a journal stream."""
+
+    def __init__(self):
+        self.pending: List[LogEvent] = []
+
+    def drain(self) -> Optional[List[LogEvent]]:
+        events, self.pending = self.pending, []
+        return events
+
+    def down_for(self) -> float:
+        return 0.0
+
+    def close(self) -> None:
+        pass
+
+
+class _FaultTally:
+    """Takes the Listener's recorder slot during a replay to collect the faults it raises."""
+
+    def __init__(self):
+        self.faults: List[Dict[str, Any]] = []
+
+    def write(self, ev: LogEvent, at: Optional[float] = None) -> None:
+        pass
+
+    def control(self, kind: str, at: float, **data) -> None:
+        pass
+
+    def fault(self, f, at: float) -> None:
+        self.faults.append({"device": f.device, "severity": f.severity, "message": f.message, "at": at})
+
+    def close(self, result=None) -> None:
+        pass
+
+
+def load_recording(path: str) -> Tuple[List[LogEvent], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Events of a `.journal.jsonl` recording, its `.result.json` outcome if one was
+    written, and its control records, each with `index`: the number of events
+    handled before it.
+    """
+    events: List[LogEvent] = []
+    controls: List[Dict[str, Any]] = []
+    lines: List[str] = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith(JournalRecorder.CONTROL):
+                # parse what came before, so `index` counts events, not lines
+                events.extend(parse_journal_lines(lines))
+                lines = []
+                try:
+                    controls.append({**json.loads(line), "index": len(events)})
+                except ValueError:
+                    pass
+            elif line.strip():
+                lines.append(line.rstrip("\n"))
+    events.extend(parse_journal_lines(lines))
+
+    result = None
+    base = path[:-len(".journal.jsonl")] if path.endswith(".journal.jsonl") else os.path.splitext(path)[0]
+    try:
+        with open(base + ".result.json", encoding="utf-8") as f:
+            result = json.load(f)
+    except FileNotFoundError:
+        pass
+    return events, result, controls
+
+
+def _fault_signature(f: Dict[str, Any]) -> Tuple[str, str, str]:
+    return f.get("device", ""), f.get("severity", ""), f.get("message", "")
+
+
+@dataclass
+class ReplayReport:
+    path: str
+    lines: int
+    handled: int
+    elapsed_s: float
+    virtual_s: float
+    faults: List[Dict[str, Any]] = field(default_factory=list)
+    device_results: Dict[str, str] = field(default_factory=dict)
+    expected: Optional[Dict[str, Any]] = None
+
+    @property
+    def lines_per_s(self) -> float:
+        return self.handled / self.elapsed_s if self.elapsed_s else 0.0
+
+    def mismatches(self) -> List[str]:
+        """Differences from the recorded outcome (faults and device results). Empty when it matches."""
+        # a truncated recording lacks the lines behind the later part of the verdict
+        if self.expected is None or self.expected.get("truncated"):
+            return []
+        out = []
+        want = sorted(_fault_signature(f) for f in self.expected.get("faults", []))
+        got = sorted(_fault_signature(f) for f in self.faults)
+        for sig in want:
+            if sig in got:
+                got.remove(sig)
+            else:
+                out.append(f"missing fault {sig[0]}/{sig[1]}: {sig[2]}")
+        out.extend(f"unexpected fault {sig[0]}/{sig[1]}: {sig[2]}" for sig in got)
+
+        for dev, want_result in (self.expected.get("device_results") or {}).items():
+            got_result = self.device_results.get(dev)
+            # "running" in a recording means the job ended before the monitor decided
+            if want_result != "running" and got_result != want_result:
+                out.append(f"{dev}: recorded {want_result!r}, replayed {got_result!r}")
+        return out
+
+
+def replay(path: str, *,
+           speed: Optional[float] = None,
+           devices: Optional[Sequence[Tuple[str, Dict[str, Any]]]] = None,
+           allowed: Optional[Sequence[str]] = None,
+           tail_s: float = 0.0,
+           verbose: bool = False) -> ReplayReport:
+    """
+    Run a recording through a Listener with the monitors it was recorded with
+    (or `devices`). Time is the journal's: a ReplayClock moves from one entry's
+    __REALTIME_TIMESTAMP to the next, and every watchdog deadline that falls in
+    between is fired before the next line is handled, just like the live loop.
+
+    speed=None or 0 replays as fast as possible, 1.0 in real time, 10.0 ten times
+    faster. tail_s keeps the clock running past the last line so watches armed
+    near the end of a cut-off recording can still expire.
+
+    Control records are applied between the lines they were recorded between, at
+    their journal time: the allowed set (unless `allowed` overrides it) and current
+    device change as they did live, and queued actions are queued again.
+
+    Robot events are not part of the journal, so RobotKeypadMonitor only sees key
+    presses on replay.
+    """
+    events, expected, controls = load_recording(path)
+    expected = expected or {}
+    if devices is None:
+        devices = [tuple(d) for d in expected.get("devices") or []]
+
+    shared = SharedState()
+    shared.current_program = expected.get("program")
+    shared.current_device = expected.get("current_device")
+    shared.allowed_monitors = set(allowed if allowed is not None else
+                                  (expected.get("allowed") or [dev_id for dev_id, _ in devices]))
+
+    clock = ReplayClock(events[0].epoch if events else 0.0)
+    lst = Listener(shared, host=expected.get("host") or "replay", save_logs=False, verbose=verbose,
+                   clock=clock, logfile_name="replay")
+    for dev_id, cfg in devices:
+        lst.register(create_monitor(dev_id, shared=shared, verbose=verbose, **dict(cfg or {})))
+    source = lst.source = _ReplaySource()
+    tally = lst.recorder = _FaultTally()
+
+    virtual0, wall0, t0 = clock(), time.monotonic(), time.perf_counter()
+
+    def pace(t: float) -> None:
+        if speed:
+            delay = (t - virtual0) / speed - (time.monotonic() - wall0)
+            if delay > 0:
+                time.sleep(delay)
+
+    def advance(t: float) -> bool:
+        # deadlines due before t fire first, then the clock lands on t
+        while (deadline := lst.wd.next_deadline()) is not None and deadline <= t:
+            pace(deadline)
+            clock.advance_to(deadline)
+            if not lst.step(False):
+                return False
+        pace(t)
+        clock.advance_to(t)
+        return True
+
+    def apply(rec: Dict[str, Any]) -> bool:
+        epoch = rec.get("epoch")
+        if epoch is not None:
+            # an estimate; never let it run ahead of the line recorded after it
+            if rec["index"] < len(events):
+                epoch = min(epoch, events[rec["index"]].epoch)
+            if not advance(epoch):
+                return False
+        if rec.get("_replay") == "allowed":
+            if allowed is None:
+                shared.allowed_monitors = set(rec.get("allowed") or ())
+            shared.current_device = rec.get("current_device")
+        elif rec.get("_replay") == "action" and rec.get("type") in _ACTIONS:
+            shared.queue_action(_ACTIONS[rec["type"]](**(rec.get("data") or {})))
+        return lst.step(False)
+
+    handled = 0
+    running = True
+    pending = iter(controls)
+    rec = next(pending, None)
+    for i, ev in enumerate(events):
+        while running and rec is not None and rec["index"] <= i:
+            running = apply(rec)
+            rec = next(pending, None)
+        if not running or not advance(ev.epoch):
+            running = False
+            break
+        source.pending.append(ev)
+        handled += 1
+        if not lst.step(True):
+            running = False
+            break
+    while running and rec is not None:
+        running = apply(rec)
+        rec = next(pending, None)
+    if running and tail_s > 0:
+        advance(clock() + tail_s)
+
+    elapsed = time.perf_counter() - t0
+    lst.close()
+    return ReplayReport(path=path, lines=len(events), handled=handled, elapsed_s=elapsed,
+                        virtual_s=clock() - virtual0, faults=tally.faults,
+                        device_results=dict(shared.device_results), expected=expected or None)
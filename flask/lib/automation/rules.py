@@ -0,0 +1,61 @@
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Pattern, Sequence, Tuple
+
+
+class RuleSet:
+    """
+    Every per-line rule of a Listener compiled up front: the anchored "useless
+    line" filters become one alternation matched once at the start of the line,
+    and the keywords each monitor declares in `patterns` (case-insensitive
+    substrings, same meaning as the old `interested()` checks) become one literal
+    alternation scanned over the lowercased line. The result tells whether the
+    line is worth logging and which monitors have to see it.
+    """
+
+    def __init__(self, useless: Sequence[Pattern[str]] = (), keywords: Optional[Dict[str, Iterable[str]]] = None):
+        owners: Dict[str, set] = {}
+        for dev_id, patterns in (keywords or {}).items():
+            for p in patterns:
+                owners.setdefault(p.lower(), set()).add(dev_id)
+
+        # The alternation reports one keyword per position (longest first), so a
+        # keyword that is a prefix of a longer one would be shadowed there: the
+        # longer keyword inherits the owners of all its prefixes.
+        self._owners: Dict[str, FrozenSet[str]] = {
+            kw: frozenset().union(*(ids for other, ids in owners.items() if kw.startswith(other)))
+            for kw in owners
+        }
+        self.monitors: FrozenSet[str] = frozenset().union(*owners.values()) if owners else frozenset()
+
+        # No re.IGNORECASE and no lookaheads: both defeat the literal prefix
+        # scan in CPython's re and made the combined matcher slower than the
+        # loops it replaces. Lowercasing the line once is cheaper.
+        self._keywords: Optional[Pattern[str]] = None
+        if owners:
+            self._keywords = re.compile("|".join(re.escape(kw) for kw in sorted(owners, key=len, reverse=True)))
+
+        self._useless: Optional[Pattern[str]] = None
+        if useless:
+            self._useless = re.compile(r"\s*(?:" + "|".join(f"(?:{self._unanchor(rx.pattern)})" for rx in useless) + ")")
+
+    @staticmethod
+    def _unanchor(pattern: str) -> str:
+        return pattern[1:] if pattern.startswith("^") else pattern
+
+    def scan(self, msg: str) -> Tuple[bool, FrozenSet[str]]:
+        """Return (is_useless, ids of the monitors whose keywords occur in msg)."""
+        if not msg:
+            return False, frozenset()
+
+        useless = self._useless is not None and self._useless.match(msg) is not None
+        hits: FrozenSet[str] = frozenset()
+        if self._keywords is not None:
+            low = msg.lower()
+            m = self._keywords.search(low)
+            while m is not None:
+                hits = hits | self._owners[m.group()]
+                if len(hits) == len(self.monitors):
+                    break
+                # restart one character later so overlapping keywords are not skipped
+                m = self._keywords.search(low, m.start() + 1)
+        return useless, hits
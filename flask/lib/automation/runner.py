@@ -2,8 +2,10 @@ import threading
 import traceback
 from lib.meter.ssh_meter import SSHMeter
 from lib.automation.listener import start_listener_thread
+from lib.automation.listener_hub import LISTENER_HUB
 from lib.automation.tests import PROGRAM_REGISTRY, get_monitors
 from lib.automation.shared_state import SharedState
+from lib.utils import secrets
 from datetime import datetime
 
 _SENTINEL = object()
@@ -30,10 +32,14 @@ def run_test_job(
     shared: SharedState,
     log: bool = True,
     verbose: bool = False,
+    journal=None,
+    record=None,
 ):
     """
     Runs a test job: optionally spins up modular listener with selected devices,
     runs the selected test, and manages shared state.
+    `journal` is the meter's shared JournalFollower; without it the listener opens its own stream.
+    `record` keeps a replayable journal recording next to the log (default: secrets.RECORD_JOURNALS).
     """
     devices = _resolve_devices(program_name, automation_kwargs, shared)
 
@@ -64,6 +70,9 @@ def run_test_job(
             save_logs=log,
             verbose=verbose,
             trace_lines=False,
+            journal=journal,
+            hub=LISTENER_HUB,
+            record=log and (secrets.RECORD_JOURNALS if record is None else record),
             # kwargs
             logfile_name=logfile_name
         )
@@ -1,14 +1,30 @@
 # shared_state.py
 import threading
-from typing import Any, Optional
-from datetime import datetime
-from collections import deque
+from typing import Any, Dict, Optional
+from types import CodeType
 import time
 import os
-import inspect
+import sys
 
 from lib.sse.sse_queue_manager import SSEQM
 from lib.automation.actions import ClearWatches
+from lib.automation.log_writer import LOG_WRITER, LogRecord
+from lib.automation.job_log import JobLog
+
+
+# "file.func" tag per call site, computed once per code object
+_CALLER_TAGS: Dict[CodeType, str] = {}
+
+
+def _caller_tag(depth: int) -> str:
+    try:
+        code = sys._getframe(depth + 1).f_code
+    except ValueError:
+        return "unknown"
+    tag = _CALLER_TAGS.get(code)
+    if tag is None:
+        tag = _CALLER_TAGS[code] = f"{os.path.basename(code.co_filename)}.{code.co_name}"
+    return tag
 
 
 class SharedState:
@@ -25,13 +41,11 @@ class SharedState:
         self.allowed_monitors: set[str] = set()
         self.extras = {}
 
-        self.logs: list[str] = []
-        self._log_lock = threading.Lock()       # protects buffer + flush
-        self._log_buffer = deque()              # buffered lines before write
+        # bounded tail in memory; JobState gives it a spool dir so the full log spills to disk
+        self.logs = JobLog()
         self._logfile_path: Optional[str] = None
-        self._last_flush = time.time()
-        self._flush_interval = 2.0              # seconds
-        self._flush_threshold = 50              # msg lines
+        # tag lines with the caller's "file.func"; cheap (cached per call site) but can be switched off
+        self.tag_callers = True
 
     def set_allowed(self, devices: set[str], reason: str = "", clear_watchdogs: bool = True):
         if clear_watchdogs:
@@ -62,6 +76,8 @@ class SharedState:
     #----- Logging methods -----#
     def set_logfile(self, path: Optional[str]):
         """Set the logfile path at job start. Creates parent directory if needed."""
+        if self._logfile_path and self._logfile_path != path:
+            LOG_WRITER.close(self._logfile_path)
         self._logfile_path = path
         if not path:
             return
@@ -69,61 +85,35 @@ class SharedState:
         os.makedirs(os.path.dirname(path), exist_ok=True)
         self.log("=== LOG STARTED ===", console=False)
 
-    def log(self, message: str, *, console: bool = False, color: str = ''):
+    def log(self, message: str, *, console: bool = False, color: str = '',
+            source: Optional[str] = None, level: str = "info"):
         """
         Thread-safe logging.
-        - Always appends to in-memory self.logs
-        - Buffers for efficient disk writes
+        - Always appends a LogRecord to self.logs (ring + spilled segments)
+        - Queues it for the background LOG_WRITER; never waits on the disk
         - Optional console echo
+        `source` overrides the caller tag (the "file.func" of log()'s caller's caller).
         """
-        frame = inspect.currentframe()
-        try:
-            caller = frame.f_back.f_back  # Direct caller of log()
-            if caller:
-                filename = os.path.basename(caller.f_code.co_filename)
-                funcname = caller.f_code.co_name
-                caller_tag = f"{filename}.{funcname}"
-            else:
-                caller_tag = "unknown"
-        finally:
-            del frame
-
-        timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-        line = f"[{timestamp}] {caller_tag}: {message}"
-
-        self.logs.append(line)
-
-        # Buffer for disk
-        with self._log_lock:
-            self._log_buffer.append(line)
-
-            # Conditional flush
-            should_flush = (
-                len(self._log_buffer) >= self._flush_threshold or
-                time.time() - self._last_flush >= self._flush_interval
-            )
-            if should_flush:
-                self._flush_buffer()
+        if source is None:
+            source = _caller_tag(2) if self.tag_callers else ""
+        record = LogRecord(time.time(), source, level, message)
+
+        self.logs.append(record)
+
+        if self._logfile_path:
+            LOG_WRITER.write(self._logfile_path, record)
 
         if console:
+            line = record.format()
             s = f"{color}{line}\033[0m" if color else line
             print(s)
 
-    def _flush_buffer(self):
-        """Internal: write buffered lines to disk"""
-        if not self._log_buffer or not self._logfile_path:
-            return
-
-        try:
-            with open(self._logfile_path, 'a', encoding='utf-8') as f:
-                while self._log_buffer:
-                    f.write(self._log_buffer.popleft() + '\n')
-                f.flush()  # Ensure OS writes to disk
-            self._last_flush = time.time()
-        except Exception as e:
-            print(f"Failed to write to {self._logfile_path}: {e}")
+    def log_text(self) -> str:
+        """The in-memory tail of the log as text, one formatted line per record."""
+        return self.logs.text()
 
     def flush_logs(self):
-        """Force flush remaining buffer — call at job end or cleanup"""
-        with self._log_lock:
-            self._flush_buffer()
+        """Wait until everything logged so far is in the logfile and spool — call at job end or cleanup"""
+        if self._logfile_path:
+            LOG_WRITER.flush(self._logfile_path)
+        self.logs.flush()
@@ -161,7 +161,7 @@ def _journal_since_now(meter: SSHMeter) -> str:
 
 
 def _get_meter_now(meter: SSHMeter) -> datetime:
-    value = meter.cli("date '+%Y-%m-%d %H:%M:%S'")
+    value = meter.meter_time("%Y-%m-%d %H:%M:%S")
     return datetime.strptime(value.strip(), "%Y-%m-%d %H:%M:%S")
 
 
@@ -630,6 +630,13 @@ def _get_service_journal(
     if max_lines <= 0:
         return ""
 
+    # the ring is time-ordered across boots, so only the current-boot read can come from it
+    journal = getattr(meter, "journal", None)
+    if journal is not None and not include_previous_boot:
+        text = journal.text(since=since, unit=service, tail=max_lines, output="cat")
+        if text is not None:
+            return text.strip()
+
     chunks = []
     boots = (-1, 0) if include_previous_boot else (0,)
     for boot in boots:
@@ -638,7 +645,7 @@ def _get_service_journal(
             f"-n {max_lines} --no-pager -o cat -b {boot}"
         )
         try:
-            text = meter.cli(cmd)
+            text = meter.cli(cmd, priority="bulk")
         except Exception:
             text = ""
         if text:
@@ -656,9 +663,16 @@ def _get_raw_service_journal(
     if max_lines <= 0:
         return ""
 
+    # answered from the shared journal ring when it covers the window
+    journal = getattr(meter, "journal", None)
+    if journal is not None:
+        text = journal.text(since=since, unit=service, tail=max_lines, header=True)
+        if text is not None:
+            return text
+
     cmd = f'journalctl -u {service} --since "{since}" -n {max_lines} --no-pager'
     try:
-        return meter.cli(cmd)
+        return meter.cli(cmd, priority="bulk")
     except Exception:
         return ""
 
@@ -54,6 +54,7 @@ LAST4_RE = re.compile(r"\blast4=([Xx*\d ]{4,})", re.I)
 HEX_BYTE_RE = re.compile(r"\b[0-9A-Fa-f]{2}\b")
 PAN_FROM_TRACK_RE = re.compile(r"(\d{12,19})(?=[=^D])")
 LONG_CARD_RE = re.compile(r"(?<!\d)(\d{12,19})(?!\d)")
+CARD_JOURNAL_RE = re.compile(r"CARD_READ_DATA|refStr=|Card read:|receiptText=|PAN [Xx*0-9 ]+|EMV_TRANS_RESULT|last4=")
 PRE_CARD_SEND_DELAY_S = 4.0
 
 
@@ -246,7 +247,7 @@ def _parse_payment_type(value) -> PaymentType:
 
 
 def _journal_since_now(meter: SSHMeter) -> str:
-    return meter.cli("date '+%Y-%m-%d %H:%M:%S'")
+    return meter.meter_time("%Y-%m-%d %H:%M:%S")
 
 
 def _decode_card_payload(line: str) -> str:
@@ -293,17 +294,27 @@ def _get_latest_card_last4(meter: SSHMeter, since: str) -> Optional[str]:
     The search intentionally uses a bounded `--since` timestamp and a capped
     line count so we do not accidentally pull card data from an older cycle or
     overload the SSH session by reading too much journal output at once.
+    When the meter's shared journal ring covers the window it is searched locally.
     """
 
-    cmd = (
-        f"journalctl -u MS3_Platform.service --since \"{since}\" -n 800 --no-pager | "
-        "grep -E 'CARD_READ_DATA|refStr=|Card read:|receiptText=|PAN [Xx*0-9 ]+|EMV_TRANS_RESULT|last4=' | tail -n 80"
-    )
-    res = meter.cli(cmd)
-    if not res:
-        return None
+    lines = None
+    journal = getattr(meter, "journal", None)
+    if journal is not None:
+        events = journal.query(since=since, unit="MS3_Platform.service", regex=CARD_JOURNAL_RE, limit=80)
+        if events is not None:
+            lines = [ev.msg for ev in events]
+
+    if lines is None:
+        cmd = (
+            f"journalctl -u MS3_Platform.service --since \"{since}\" -n 800 --no-pager | "
+            "grep -E 'CARD_READ_DATA|refStr=|Card read:|receiptText=|PAN [Xx*0-9 ]+|EMV_TRANS_RESULT|last4=' | tail -n 80"
+        )
+        res = meter.cli(cmd, priority="bulk")
+        if not res:
+            return None
+        lines = res.splitlines()
 
-    for line in reversed(res.splitlines()):
+    for line in reversed(lines):
         last4 = _extract_last4_from_card_line(line)
         if last4:
             return last4
@@ -545,6 +556,7 @@ def get_parking_ui_state(
     timeout: float = 3.0,
     shared: SharedState = None,
     debug_ui: bool = False,
+    page_html: Optional[str] = None,
 ) -> ParkingUIState:
     """
     Classify the current pay-to-park page into a simplified UI state.
@@ -555,7 +567,7 @@ def get_parking_ui_state(
     title codes and stable phrases instead of exact page templates.
     """
 
-    html = meter.get_ui_page_html(timeout=timeout)
+    html = page_html if page_html is not None else meter.get_ui_page_html(timeout=timeout)
     meter_region = _normalize_meter_region(getattr(meter, "meter_region", ""))
     log = None
     if shared or debug_ui:
@@ -1035,6 +1047,25 @@ def plan_pay_ui_action(
     return PayUIAction("wait", "waiting for unknown page to resolve", delay=0.8)
 
 
+def wait_for_parking_ui_change(meter: SSHMeter, state: ParkingUIState, timeout: float) -> None:
+    """
+    Wait up to `timeout` seconds, returning early once the classified page
+    differs from `state`. Clock ticks and other cosmetic redraws do not count,
+    so iteration-based counters in `plan_pay_ui_action` keep their meaning.
+    Without a UI watcher this is a plain sleep, same as before.
+    """
+
+    if not meter.start_ui_watcher():
+        time.sleep(timeout)
+        return
+
+    meter_region = _normalize_meter_region(getattr(meter, "meter_region", ""))
+    meter.wait_for_ui_page(
+        lambda html: classify_parking_ui_html(html, meter_region=meter_region).summary != state.summary,
+        timeout=timeout,
+    )
+
+
 def execute_pay_ui_action(
     meter: SSHMeter,
     shared: SharedState,
@@ -1042,6 +1073,7 @@ def execute_pay_ui_action(
     context: PaySessionContext,
     debug_ui: bool = False,
     robot_ready_timeout: float = 20.0,
+    state: Optional[ParkingUIState] = None,
 ) -> None:
     """
     Execute a single planned action against the meter or robot.
@@ -1079,8 +1111,12 @@ def execute_pay_ui_action(
             raise RuntimeError(f"Robot did not accept program '{action.robot_program}'")
         context.robot_payment_job_id = job_id
     elif action.kind == "wait":
-        _debug_log(shared, meter, debug_ui, f">> time.sleep({action.delay})")
-        time.sleep(action.delay)
+        if state is None:
+            _debug_log(shared, meter, debug_ui, f">> time.sleep({action.delay})")
+            time.sleep(action.delay)
+        else:
+            _debug_log(shared, meter, debug_ui, f">> wait_for_parking_ui_change(timeout={action.delay})")
+            wait_for_parking_ui_change(meter, state, action.delay)
     elif action.kind in {"done", "fail"}:
         return
     else:
@@ -1111,6 +1147,8 @@ def run_pay_to_park_session(
     """
 
     meter.set_ui_mode("banner")
+    # page reads below come from the watcher's in-memory copy while it is running
+    meter.start_ui_watcher()
     reset_to_parking_home(meter, shared=shared, debug_ui=debug_ui)
     cycle_journal_since = _journal_since_now(meter)
 
@@ -1187,6 +1225,7 @@ def run_pay_to_park_session(
             context,
             debug_ui=debug_ui,
             robot_ready_timeout=robot_ready_timeout,
+            state=state,
         )
 
     else:
@@ -1241,7 +1280,7 @@ def run_pay_to_park_session(
             last_post_success_signature = post_success_signature
         if state.kind == "home":
             return session_result
-        time.sleep(0.5)
+        wait_for_parking_ui_change(meter, state, 0.5)
 
     return session_result
 
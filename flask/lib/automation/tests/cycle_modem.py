@@ -58,7 +58,7 @@ def _journal_since_now(meter: SSHMeter) -> str:
 
 
 def _get_meter_now(meter: SSHMeter) -> datetime:
-    value = meter.cli("date '+%Y-%m-%d %H:%M:%S'")
+    value = meter.meter_time("%Y-%m-%d %H:%M:%S")
     return datetime.strptime(value.strip(), "%Y-%m-%d %H:%M:%S")
 
 
@@ -142,11 +142,18 @@ def _get_latest_modem_signal_info(meter: SSHMeter, since: str) -> tuple[Optional
     # journalctl -u MS3_Platform.service --since "<since>" --no-pager -r | grep -m 1 -F 'csq:'
     #   -r = newest first
     #   grep -m 1 = stop after first match
+    journal = getattr(meter, "journal", None)
+    if journal is not None:
+        result = journal.text(since=since, unit="MS3_Platform.service", contains="csq:", limit=1)
+        if result is not None:
+            line = result.strip()
+            return _parse_modem_signal_line(line), line
+
     cmd = (
         f"journalctl -u MS3_Platform.service --since \"{since}\" -n 800 --no-pager | "
         "grep -F 'csq:' | tail -n 1"
     )
-    result = meter.cli(cmd)
+    result = meter.cli(cmd, priority="bulk")
     if not result:
         return None, ""
 
@@ -167,9 +174,16 @@ def _get_raw_service_journal(
     if max_lines <= 0:
         return ""
 
+    # answered from the shared journal ring when it covers the window
+    journal = getattr(meter, "journal", None)
+    if journal is not None:
+        text = journal.text(since=since, unit=service, tail=max_lines, header=True)
+        if text is not None:
+            return text
+
     cmd = f'journalctl -u {service} --since "{since}" -n {max_lines} --no-pager'
     try:
-        return meter.cli(cmd)
+        return meter.cli(cmd, priority="bulk")
     except Exception:
         return ""
 
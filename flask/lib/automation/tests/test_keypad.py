@@ -19,19 +19,13 @@ def test_keypad(meter: SSHMeter, shared: SharedState, **kwargs):
     if not subtest:
         shared.broadcast_progress(meter.host, 'keypad', 1, 1)
 
-    if meter.in_diagnostics():
-        meter.press('diagnostics'); meter.press('diagnostics')
-    else:
-        meter.press('diagnostics')
-
-    meter.press('minus'); meter.press('ok')
-    meter.press('minus'); meter.press('minus'); meter.press('minus'); meter.press('minus'); meter.press('minus'); meter.press('minus'); meter.press('ok')
+    keys = ['diagnostics', 'diagnostics'] if meter.in_diagnostics() else ['diagnostics']
+    keys += ['minus', 'ok'] + ['minus'] * 6 + ['ok']
     if meter.meter_type == 'msx':
-        meter.press('minus'); meter.press('minus'); meter.press('ok')
+        keys += ['minus', 'minus', 'ok']
     else:
-        for i in range(8):
-            meter.press('plus')
-        meter.press('ok')
+        keys += ['plus'] * 8 + ['ok']
+    meter.press_sequence(keys, inter_key_delay=0.1)
     time.sleep(0.5)
 
     #! double check that we made it to the right page
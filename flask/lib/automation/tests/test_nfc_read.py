@@ -83,18 +83,9 @@ def test_nfc_read(meter: SSHMeter, shared: SharedState, **kwargs):
     if not subtest:
         shared.broadcast_progress(meter.host, func_name, 1, 1)
 
-    if meter.in_diagnostics():
-        meter.press('diagnostics'); meter.press('diagnostics')
-    else:
-        meter.press('diagnostics')
-
-    meter.press('minus')
-    meter.press('ok')
-    for i in range(8):
-        meter.press('plus')
-    meter.press('ok')
-    meter.press('plus'); meter.press('plus'); meter.press('plus')
-    meter.press('ok')
+    keys = ['diagnostics', 'diagnostics'] if meter.in_diagnostics() else ['diagnostics']
+    keys += ['minus', 'ok'] + ['plus'] * 8 + ['ok'] + ['plus'] * 3 + ['ok']
+    meter.press_sequence(keys, inter_key_delay=0.1)
     time.sleep(1)
 
     #! double check that we made it to the right page
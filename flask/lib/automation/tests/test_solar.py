@@ -96,13 +96,24 @@ def get_latest_power_status(
     if count < 1:
         raise ValueError(f"count must be >= 1, got {count}")
 
-    cmd = (
-        f"journalctl -u MS3_Platform.service -n {window_size} --no-pager | "
-        "grep 'Meter:sProcessIPSBusMessage:' | "
-        "grep 'Power status:' | "
-        f"tail -n {count}"
-    )
-    res = meter.cli(cmd)
+    res = None
+    journal = getattr(meter, "journal", None)
+    if journal is not None:
+        res = journal.text(
+            unit="MS3_Platform.service",
+            tail=window_size,
+            contains="Power status:",
+            regex="Meter:sProcessIPSBusMessage:",
+            limit=count,
+        )
+    if res is None:
+        cmd = (
+            f"journalctl -u MS3_Platform.service -n {window_size} --no-pager | "
+            "grep 'Meter:sProcessIPSBusMessage:' | "
+            "grep 'Power status:' | "
+            f"tail -n {count}"
+        )
+        res = meter.cli(cmd, priority="bulk")
     parsed_statuses = _parse_power_status_lines(res, shared)
     if not parsed_statuses:
         if log_missing:
@@ -1,9 +1,12 @@
 import psycopg
 from lib.meter.ssh_meter import SSHMeter
 from lib.utils import secrets
-from typing import Optional
+from typing import Optional, Sequence
 from datetime import date
 import json
+import gzip
+import os
+import zlib
 
 dbcs = secrets.DBCS
 VERBOSE = secrets.VERBOSE
@@ -92,42 +95,125 @@ def insert_sshmeter(meter: SSHMeter):
 # ==============================================================================
 # Job Insertion
 # ==============================================================================
+# job logs up to this size go into meter_job.jctl as text; bigger ones are
+# gzipped into meter_job.jctl_gz and jctl only keeps the tail
+JCTL_INLINE_MAX = 4 * 1024 * 1024
+_jctl_gz_ready = False
+
+
+def _ensure_jctl_gz(cur) -> None:
+    global _jctl_gz_ready
+    if not _jctl_gz_ready:
+        cur.execute("ALTER TABLE meter_job ADD COLUMN IF NOT EXISTS jctl_gz BYTEA;")
+        _jctl_gz_ready = True
+
+
+def _jctl_from_segments(segments: Sequence[str], tail: str) -> tuple[str, Optional[bytes]]:
+    """
+    Job log text from on-disk segments, read in blocks: inline text when small,
+    otherwise (tail text, gzip blob). Only the compressed form is ever held whole.
+    """
+    segments = [p for p in segments if os.path.exists(p)]
+    total = sum(os.path.getsize(p) for p in segments)
+    if total <= JCTL_INLINE_MAX:
+        parts = []
+        for p in segments:
+            with open(p, encoding="utf-8", errors="replace") as f:
+                parts.append(f.read())
+        return "".join(parts).rstrip("\n"), None
+
+    comp = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    blob = bytearray()
+    for p in segments:
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                blob += comp.compress(block)
+    blob += comp.flush()
+    header = f"-- {total} bytes in {len(segments)} segment(s), full log in jctl_gz; last lines: --"
+    return f"{header}\n{tail}", bytes(blob)
+
+
+_job_list_columns: Optional[str] = None
+
+
+def _job_list_select(cur) -> str:
+    """
+    meter_job columns for the list queries: every column but the jctl_gz blob,
+    which only shows up as its size (jctl_gz_bytes); retrieve_job() inflates it.
+    """
+    global _job_list_columns
+    if _job_list_columns is None:
+        _ensure_jctl_gz(cur)
+        cur.execute(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = 'meter_job' AND table_schema = current_schema() "
+            "ORDER BY ordinal_position;"
+        )
+        names = [row["column_name"] if isinstance(row, dict) else row[0] for row in cur.fetchall()]
+        _job_list_columns = ", ".join(f"mj.{name}" for name in names if name != "jctl_gz")
+    return f"{_job_list_columns}, octet_length(mj.jctl_gz) AS jctl_gz_bytes"
+
+
+def _inflate_jctl(rows: list) -> list:
+    """Put gzipped job logs back into jctl so API rows look the same either way."""
+    for row in rows:
+        if isinstance(row, dict) and "jctl_gz" in row:
+            blob = row.pop("jctl_gz")
+            if blob:
+                row["jctl"] = gzip.decompress(blob).decode("utf-8", errors="replace").rstrip("\n")
+    return rows
+
+
 def insert_meter_jobs(
     meter_id: int,
     jobs: list[dict],
     jctl: str = "",
     conn: None | psycopg.Connection = None,
+    jctl_segments: Optional[Sequence[str]] = None,
 ):
     """
     Bulk insert meter jobs (no upsert).
     Each job dict must contain: name, status, data.
-    Returns list of inserted rows.
+    With `jctl_segments` (a JobLog's spilled segment files) the log is built from
+    those instead, and `jctl` is only the tail kept if it has to be compressed.
+    Returns the ids of the inserted rows (not the rows: they would carry the log back).
     """
     if not jobs:
         return []
 
+    jctl_gz = None
+    if jctl_segments:
+        jctl, jctl_gz = _jctl_from_segments(jctl_segments, jctl)
+
+    columns = ["meter_id", "name", "status", "data", "jctl"] + (["jctl_gz"] if jctl_gz is not None else [])
     values_sql = []
     params = []
 
     for job in jobs:
-        values_sql.append("(%s, %s, %s, %s, %s)")
+        values_sql.append("(" + ", ".join(["%s"] * len(columns)) + ")")
         params.extend(
             [meter_id, job["name"], job["status"], json.dumps(job.get("data", {})), jctl]
         )
+        if jctl_gz is not None:
+            params.append(jctl_gz)
 
     sql = f"""
-        INSERT INTO meter_job (meter_id, name, status, data, jctl)
+        INSERT INTO meter_job ({", ".join(columns)})
         VALUES {", ".join(values_sql)}
-        RETURNING *;
+        RETURNING id;
     """
 
     if conn:
         with conn.cursor() as cur:
+            if jctl_gz is not None:
+                _ensure_jctl_gz(cur)
             cur.execute(sql, params)
             return cur.fetchall()
 
     with psycopg.connect(dbcs) as conn:
         with conn.cursor() as cur:
+            if jctl_gz is not None:
+                _ensure_jctl_gz(cur)
             cur.execute(sql, params)
             return cur.fetchall()
 
@@ -135,10 +221,37 @@ def insert_meter_jobs(
 # ==============================================================================
 # Job Retrieval 
 # ==============================================================================
+def retrieve_job(job_id: int, conn: None | psycopg.Connection = None):
+    """
+    Retrieve one meter job with its full log (a gzipped jctl_gz is inflated back
+    into jctl). Returns the row, or None if there is no such job.
+    """
+    sql = """
+        SELECT
+            mj.*,
+            m.hostname
+            FROM meter_job mj
+            JOIN meter m ON mj.meter_id = m.id
+            WHERE mj.id = %s;
+        """
+    if conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, (job_id,))
+            row = cur.fetchone()
+            return _inflate_jctl([row])[0] if row else None
+
+    with psycopg.connect(dbcs, row_factory=psycopg.rows.dict_row) as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, (job_id,))
+            row = cur.fetchone()
+            return _inflate_jctl([row])[0] if row else None
+
+
 def retrieve_jobs(limit=10, offset=0, conn: None | psycopg.Connection = None,):
     """
     Retrieve meter jobs with pagination.
-    Returns list of job rows.
+    Returns list of job rows. A log too big for jctl is not fetched: jctl holds
+    its tail and jctl_gz_bytes its compressed size (see retrieve_job()).
     """
     # sql = """
     #     SELECT *
@@ -148,7 +261,7 @@ def retrieve_jobs(limit=10, offset=0, conn: None | psycopg.Connection = None,):
     # """
     sql = """
         SELECT
-            mj.*,
+            {columns},
             m.hostname
             FROM meter_job mj
             JOIN meter m ON mj.meter_id = m.id
@@ -157,12 +270,12 @@ def retrieve_jobs(limit=10, offset=0, conn: None | psycopg.Connection = None,):
         """
     if conn:
         with conn.cursor() as cur:
-            cur.execute(sql, (limit, offset))
+            cur.execute(sql.format(columns=_job_list_select(cur)), (limit, offset))
             return cur.fetchall()
 
     with psycopg.connect(dbcs, row_factory=psycopg.rows.dict_row) as conn:
         with conn.cursor() as cur:
-            cur.execute(sql, (limit, offset))
+            cur.execute(sql.format(columns=_job_list_select(cur)), (limit, offset))
             return cur.fetchall()
 
 
@@ -188,7 +301,7 @@ def retrieve_jobs_filtered(
         conn: optional existing psycopg connection
 
     Returns:
-        List of rows.
+        List of rows, without big logs' jctl_gz (as retrieve_jobs()).
     """
 
     if date_start and not date_end:
@@ -196,7 +309,7 @@ def retrieve_jobs_filtered(
 
     query = """
         SELECT
-            mj.*,
+            {columns},
             m.hostname
         FROM meter_job mj
         JOIN meter m ON mj.meter_id = m.id
@@ -235,12 +348,12 @@ def retrieve_jobs_filtered(
 
     if conn:
         with conn.cursor() as cur:
-            cur.execute(query, params)
+            cur.execute(query.format(columns=_job_list_select(cur)), params)
             return cur.fetchall()
 
     with psycopg.connect(dbcs, row_factory=psycopg.rows.dict_row) as conn:
         with conn.cursor() as cur:
-            cur.execute(query, params)
+            cur.execute(query.format(columns=_job_list_select(cur)), params)
             return cur.fetchall()
 
 
@@ -0,0 +1,121 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Literal, Tuple
+
+
+ChannelPriority = Literal["interactive", "normal", "bulk"]
+PRIORITIES: Tuple[ChannelPriority, ...] = ("interactive", "normal", "bulk")
+
+
+class ChannelPool:
+    """
+    Admission control for concurrent SSH exec channels on one shared transport.
+
+    - at most `max_channels` commands run at once
+    - `reserved_interactive` of those slots are only handed to interactive work,
+      so key presses and UI reads never queue behind journal greps or uploads
+    - waiters are admitted strictly by priority (interactive > normal > bulk)
+    - a thread that already holds a slot may nest commands without a second slot
+    """
+
+    def __init__(self, max_channels: int = 3, reserved_interactive: int = 1):
+        self.max_channels = max(1, int(max_channels))
+        self.reserved_interactive = min(max(0, int(reserved_interactive)), self.max_channels - 1)
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._in_use = 0
+        self._exclusive = False
+        self._waiting: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self._stats: Dict[str, Dict[str, float]] = {
+            p: {"acquired": 0, "wait_total_s": 0.0, "wait_max_s": 0.0} for p in PRIORITIES
+        }
+
+    def _limit(self, priority: ChannelPriority) -> int:
+        if priority == "interactive":
+            return self.max_channels
+        return self.max_channels - self.reserved_interactive
+
+    def _can_enter(self, priority: ChannelPriority) -> bool:
+        if self._exclusive or self._in_use >= self._limit(priority):
+            return False
+        for higher in PRIORITIES[:PRIORITIES.index(priority)]:
+            if self._waiting[higher]:
+                return False
+        return True
+
+    @contextmanager
+    def slot(self, priority: ChannelPriority = "normal"):
+        """Hold one channel slot for the duration of the block."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Invalid channel priority: {priority}. Must be one of {PRIORITIES}.")
+
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        t0 = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while not self._can_enter(priority):
+                    self._cond.wait()
+            finally:
+                self._waiting[priority] -= 1
+            self._in_use += 1
+
+            waited = time.monotonic() - t0
+            stats = self._stats[priority]
+            stats["acquired"] += 1
+            stats["wait_total_s"] += waited
+            stats["wait_max_s"] = max(stats["wait_max_s"], waited)
+
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        """Wait for every slot to drain and keep new commands out (used to close the transport)."""
+        with self._cond:
+            while self._exclusive:
+                self._cond.wait()
+            self._exclusive = True
+            while self._in_use:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            per_priority = {}
+            for p in PRIORITIES:
+                s = self._stats[p]
+                acquired = int(s["acquired"])
+                per_priority[p] = {
+                    "acquired": acquired,
+                    "waiting": self._waiting[p],
+                    "wait_total_s": round(s["wait_total_s"], 4),
+                    "wait_avg_s": round(s["wait_total_s"] / acquired, 4) if acquired else 0.0,
+                    "wait_max_s": round(s["wait_max_s"], 4),
+                }
+            return {
+                "max_channels": self.max_channels,
+                "reserved_interactive": self.reserved_interactive,
+                "in_use": self._in_use,
+                "priorities": per_priority,
+            }
@@ -100,17 +100,26 @@ def _wait_for_coin_collection_flow_to_finish(
 ) -> bool:
     startup_deadline = time.time() + max(0.0, float(startup_timeout))
     flow_deadline: Optional[float] = None
+    poll_interval = max(0.0, float(poll_interval))
+    version: Optional[int] = None
 
     while True:
         if flow_deadline is not None and time.time() >= flow_deadline:
             return False
 
         try:
-            page_html = meter.get_ui_page_html(timeout=page_timeout)
+            # returns as soon as the page changes, or after poll_interval with the current page
+            version, page_html = meter.wait_for_ui_change(
+                version,
+                poll_interval,
+                poll_interval=poll_interval,
+                page_timeout=page_timeout,
+            )
         except Exception as e:
             if getattr(meter, "verbose", False):
                 print(f"[wait_for_coin_collection_flow_to_finish] {e}")
-            time.sleep(max(0.0, float(poll_interval)))
+            version = None
+            time.sleep(poll_interval)
             continue
 
         if _is_coin_collection_flow_page_html(page_html):
@@ -121,8 +130,6 @@ def _wait_for_coin_collection_flow_to_finish(
         elif time.time() >= startup_deadline:
             return False
 
-        time.sleep(max(0.0, float(poll_interval)))
-
 
 def clear_coin_tallies(
     meter: "SSHMeter",
@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class CommandCache:
+    """
+    TTL memo for read-only meter commands. Every entry belongs to a `family`
+    (fbset, registry, sha256sum, ...) for hit/miss accounting and may list the
+    remote paths it reads, so a write to one of them busts it. The whole cache is
+    tied to the meter's boot id: after a reconnect it must be re-validated and is
+    dropped if the meter rebooted in between.
+    """
+
+    def __init__(self, default_ttl: float = 60.0):
+        self.default_ttl = float(default_ttl)
+        self.boot_id: Optional[str] = None
+        self.needs_validation = True
+        self._entries: Dict[str, Tuple[str, float, str, Tuple[str, ...]]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _family_stats(self, family: str) -> Dict[str, int]:
+        return self._stats.setdefault(family, {"hits": 0, "misses": 0, "busts": 0})
+
+    def validate(self, boot_id: str) -> bool:
+        """Record the current boot id; returns False (and clears) if it changed."""
+        with self._lock:
+            self.needs_validation = False
+            if self.boot_id is not None and boot_id != self.boot_id:
+                self._entries.clear()
+                self.boot_id = boot_id
+                return False
+            self.boot_id = boot_id
+            return True
+
+    def get(self, key: str, family: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._family_stats(family)["hits"] += 1
+                return True, entry[0]
+            self._entries.pop(key, None)
+            self._family_stats(family)["misses"] += 1
+            return False, None
+
+    def put(self, key: str, value: str, *, family: str, ttl: Optional[float] = None,
+            paths: Iterable[str] = ()) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._entries[key] = (value, expires_at, family, tuple(paths))
+
+    def bust(self, path: str) -> int:
+        """Drop every entry that reads `path`. Returns the number removed."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if path in entry[3]]
+            for key in stale:
+                self._family_stats(self._entries.pop(key)[2])["busts"] += 1
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            families = {}
+            for family, s in self._stats.items():
+                total = s["hits"] + s["misses"]
+                families[family] = {
+                    **s,
+                    "entries": sum(1 for e in self._entries.values() if e[2] == family),
+                    "hit_rate": round(s["hits"] / total, 3) if total else 0.0,
+                }
+            return {"boot_id": self.boot_id, "families": families}
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, TypedDict
+
+
+class DiagMenuPage(TypedDict):
+    items: List[str]                # menu item texts in display order
+    entry_index: int                # item selected when the page is opened
+    children: Dict[str, str]        # item text -> title of the page it opens
+
+
+def get_graph_path() -> Path:
+    return Path(__file__).resolve().parent / "diag_menus.json"
+
+
+class DiagMenuGraph:
+    """
+    Diagnostics menu layout learned from earlier walks, persisted as JSON and
+    keyed by "meter_type|system_version|system_sub_version" since the menus only
+    change with firmware. Layout per key:
+        {"home": "<title of the service page>", "pages": {title: DiagMenuPage}}
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else get_graph_path()
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    @staticmethod
+    def make_key(meter_type: str, system_version: str, system_sub_version: str) -> Optional[str]:
+        if not (meter_type and system_version):
+            return None
+        return f"{meter_type}|{system_version}|{system_sub_version}"
+
+    def _load(self) -> Dict[str, dict]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self._data = {}
+        return self._data
+
+    def _entry(self, key: str) -> dict:
+        return self._load().setdefault(key, {"home": "", "pages": {}})
+
+    def home(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._load().get(key, {}).get("home") or None
+
+    def page(self, key: str, title: str) -> Optional[DiagMenuPage]:
+        with self._lock:
+            page = self._load().get(key, {}).get("pages", {}).get(title)
+            return None if page is None else {**page, "children": dict(page["children"])}
+
+    def learn_home(self, key: str, title: str) -> None:
+        with self._lock:
+            entry = self._entry(key)
+            if entry["home"] != title:
+                entry["home"] = title
+                self._dirty = True
+
+    def learn_page(self, key: str, title: str, items: List[str], entry_index: int) -> None:
+        with self._lock:
+            pages = self._entry(key)["pages"]
+            page = pages.get(title)
+            if page is not None and page["items"] == items and page["entry_index"] == entry_index:
+                return
+            children = page["children"] if page is not None and page["items"] == items else {}
+            pages[title] = {"items": list(items), "entry_index": entry_index, "children": children}
+            self._dirty = True
+
+    def learn_edge(self, key: str, title: str, item: str, child_title: str) -> None:
+        with self._lock:
+            page = self._entry(key)["pages"].get(title)
+            if page is None or page["children"].get(item) == child_title:
+                return
+            page["children"][item] = child_title
+            self._dirty = True
+
+    def forget(self, key: str, titles: Optional[List[str]] = None) -> None:
+        """Drop learned pages (all of them when `titles` is None) so the next walk relearns them."""
+        with self._lock:
+            data = self._load()
+            if key not in data:
+                return
+            if titles is None:
+                del data[key]
+            else:
+                for title in titles:
+                    data[key]["pages"].pop(title, None)
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._data is None:
+                return
+            tmp = self.path.with_suffix(".json.tmp")
+            try:
+                tmp.write_text(json.dumps(self._data, indent=4), encoding="utf-8")
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except Exception as e:
+                print(f"[DiagMenuGraph] unable to save {self.path}: {e}")
+
+
+diag_graph = DiagMenuGraph()
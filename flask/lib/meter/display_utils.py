@@ -1,19 +1,125 @@
 import os
-import base64
+import io
+import time
+import shlex
+import tarfile
 import hashlib
-from typing import Optional
+from typing import Dict, List, Optional
 import json
 
 BASE_DIR = os.path.join(os.path.dirname(__file__), "assets")
 UI_PAGE_PATH = os.path.join(BASE_DIR, "UIPage.php")
 UI_OVERLAY_PATH = os.path.join(BASE_DIR, "ui_overlay.json")
 
+REMOTE_HTML_DIR = "/var/volatile/html"
+REMOTE_IMAGES_DIR = f"{REMOTE_HTML_DIR}/content/Images"
+REMOTE_UI_PAGE_PATH = f"{REMOTE_HTML_DIR}/UIPage.php"
+REMOTE_UI_OVERLAY_PATH = f"{REMOTE_HTML_DIR}/ui_overlay.json"
+REMOTE_RESULTS_PATH = f"{REMOTE_HTML_DIR}/results.json"
+
 CHARUCO_PATHS = {
     "ms2.5": os.path.join(BASE_DIR, "ms25_charuco.png"),
     "ms3": os.path.join(BASE_DIR, "ms3_charuco.png"),
     "msx": os.path.join(BASE_DIR, "msx_charuco.png"),
 }
 
+# ------------------------------------------------------------------
+# Asset sync
+# ------------------------------------------------------------------
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _read_local(path: str) -> bytes:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Local file not found: {path}")
+    with open(path, "rb") as f:
+        return f.read()
+
+def remote_manifest(meter: "SSHMeter", remote_paths: List[str]) -> Dict[str, str]:  # type: ignore [name-defined]
+    """
+    Hash every remote path with a single sha256sum command.
+    Returns {remote_path: sha256}; missing files are simply absent.
+    """
+    if not remote_paths:
+        return {}
+    quoted = " ".join(shlex.quote(p) for p in remote_paths)
+    out = meter.cached_cli(
+        f"sha256sum {quoted} 2>/dev/null; true", family="sha256sum", ttl=300.0, paths=remote_paths, priority="bulk"
+    )
+    manifest: Dict[str, str] = {}
+    for line in out.splitlines():
+        parts = line.split(None, 1)
+        if len(parts) == 2:
+            manifest[parts[1].strip()] = parts[0]
+    return manifest
+
+def _build_tar(files: Dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    now = time.time()
+    with tarfile.open(fileobj=buf, mode="w", format=tarfile.USTAR_FORMAT) as tar:
+        for remote_path, data in files.items():
+            info = tarfile.TarInfo(remote_path.lstrip("/"))
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = now
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+def push_files(meter: "SSHMeter", files: Dict[str, bytes]) -> None:  # type: ignore [name-defined]
+    """
+    Write every file in one binary transfer: a tar stream piped into `tar -x` on a
+    single channel. Falls back to one `cat >` channel per file if tar fails.
+    """
+    if not files:
+        return
+    for remote_path in files:
+        meter.bust_cache(remote_path)
+    dirs = " ".join(sorted({shlex.quote(os.path.dirname(p)) for p in files}))
+    code, _, err = meter.exec_with_input(
+        f"mkdir -p {dirs} && tar -xf - -C /", _build_tar(files), priority="bulk"
+    )
+    if code == 0:
+        return
+
+    print(f"[push_files] tar extract failed on {meter.host} ({err}), falling back to cat")
+    for remote_path, data in files.items():
+        code, _, err = meter.exec_with_input(
+            f"mkdir -p {shlex.quote(os.path.dirname(remote_path))} && cat > {shlex.quote(remote_path)}",
+            data,
+            priority="bulk",
+        )
+        if code != 0:
+            raise RuntimeError(f"Unable to write {remote_path} on {meter.host}: {err}")
+
+def stale_assets(meter: "SSHMeter", assets: Dict[str, bytes]) -> Dict[str, bytes]:  # type: ignore [name-defined]
+    """Return the subset of {remote_path: content} whose remote hash differs."""
+    manifest = remote_manifest(meter, list(assets))
+    return {p: data for p, data in assets.items() if manifest.get(p) != _sha256(data)}
+
+def sync_assets(meter: "SSHMeter", assets: Dict[str, bytes]) -> List[str]:  # type: ignore [name-defined]
+    """
+    Content-addressed sync: one manifest command, then one transfer carrying only
+    the changed files. Returns the remote paths that were written.
+    """
+    changed = stale_assets(meter, assets)
+    push_files(meter, changed)
+    return sorted(changed)
+
+def custom_display_assets(meter: "SSHMeter", include_apriltag: bool = False) -> Dict[str, bytes]:  # type: ignore [name-defined]
+    """{remote_path: content} for everything setup_custom_display puts on a meter."""
+    local_charuco = CHARUCO_PATHS.get(meter.meter_type)
+    if not local_charuco:
+        raise ValueError(f"No Charuco path defined for meter_type: {meter.meter_type}")
+
+    assets = {
+        REMOTE_UI_PAGE_PATH: _read_local(UI_PAGE_PATH),
+        REMOTE_UI_OVERLAY_PATH: _read_local(UI_OVERLAY_PATH),
+        f"{REMOTE_IMAGES_DIR}/charuco.png": _read_local(local_charuco),
+    }
+    if include_apriltag:
+        assets[f"{REMOTE_IMAGES_DIR}/apriltag.png"] = _read_local(get_apriltag_path(meter))
+    return assets
+
 # ------------------------------------------------------------------
 # Upload helpers
 # ------------------------------------------------------------------
@@ -27,74 +133,29 @@ def ensure_remote_dir(meter: "SSHMeter", remote_dir: str) -> None:  # type: igno
     meter.cli(cmd)
 
 def write_ui_page(meter: "SSHMeter") -> None:  # type: ignore [name-defined]
-    """Write the local UIPage.php to the remote meter via SSH command."""
+    """Sync the local UIPage.php to the remote meter."""
     if not os.path.exists(UI_PAGE_PATH):
         raise FileNotFoundError(f"Local UIPage.php not found at {UI_PAGE_PATH}")
-    
-    with open(UI_PAGE_PATH, "r", encoding="utf-8", newline="") as f:
-        php_content = f.read()
-    
-    remote_path = "/var/volatile/html/UIPage.php"
-    ensure_remote_dir(meter, "/var/volatile/html")
-    
-    # Use heredoc for multi-line text upload
-    cmd = f"cat <<'EOF' > {remote_path}\n{php_content}EOF"
-    meter.cli(cmd)
+    sync_assets(meter, {REMOTE_UI_PAGE_PATH: _read_local(UI_PAGE_PATH)})
 
 def write_ui_overlay(meter: "SSHMeter") -> None:  # type: ignore [name-defined]
-    """Write the local ui_overlay.json to the remote meter via SSH command (optional)."""
+    """Sync the local ui_overlay.json to the remote meter."""
     if not os.path.exists(UI_OVERLAY_PATH):
         raise FileNotFoundError(f"Local ui_overlay.json not found at {UI_OVERLAY_PATH}")
-    
-    with open(UI_OVERLAY_PATH, "r", encoding="utf-8", newline="") as f:
-        json_content = f.read()
-    
-    remote_path = "/var/volatile/html/ui_overlay.json"
-    ensure_remote_dir(meter, "/var/volatile/html")
-    
-    # Use heredoc for multi-line text upload
-    cmd = f"cat <<'EOF' > {remote_path}\n{json_content}EOF"
-    meter.cli(cmd)
+    sync_assets(meter, {REMOTE_UI_OVERLAY_PATH: _read_local(UI_OVERLAY_PATH)})
 
 def write_results_json(meter: "SSHMeter", results_data: dict) -> None:  # type: ignore [name-defined]
     """
-    Write the provided results data as JSON to the remote meter via SSH command.
+    Write the provided results data as JSON to the remote meter (skipped if unchanged).
     Expected dict struct setup with SSHMeter.update_display_results
     """
-    json_content = json.dumps(results_data, indent=2)
-    
-    remote_path = "/var/volatile/html/results.json"
-    ensure_remote_dir(meter, "/var/volatile/html")
-    
-    # Use heredoc for multi-line text upload
-    cmd = f"cat <<'EOF' > {remote_path}\n{json_content}\nEOF\n" # EOF needs to be on its own line for it to be recognized by the shell
-    meter.cli(cmd)
+    json_content = json.dumps(results_data, indent=2) + "\n"
+    sync_assets(meter, {REMOTE_RESULTS_PATH: json_content.encode("utf-8")})
 
 def upload_image(meter: "SSHMeter", local_path: str, remote_name: str) -> None:  # type: ignore [name-defined]
-    """Upload the local image PNG to the remote meter via chunked binary SSH, renaming to remote_name."""
+    """Sync the local image PNG to the remote meter in one binary transfer, renaming to remote_name."""
     print(f"uploading asset to {meter.host} (local_path: {local_path} | remote_name: {remote_name} | connected: {meter.connected})")
-    if not os.path.exists(local_path):
-        raise FileNotFoundError(f"Local file not found: {local_path}")
-    
-    with open(local_path, "rb") as f:
-        binary_content = f.read()
-    
-    remote_dir = "/var/volatile/html/content/Images"
-    remote_path = f"{remote_dir}/{remote_name}.png"
-    ensure_remote_dir(meter, remote_dir)
-    
-    meter.cli(f"> {remote_path}")  # Truncate or create empty file
-    
-    # Upload in chunks to avoid command length limits
-    chunk_size = 500  # Smaller chunks for safety in minimal shells
-    for i in range(0, len(binary_content), chunk_size):
-        chunk = binary_content[i:i + chunk_size]
-        # Convert to hex pairs and format as \\xHH\\xHH...
-        hex_pairs = [chunk.hex()[j:j+2] for j in range(0, len(chunk.hex()), 2)]
-        printf_arg = ''.join(f'\\x{x}' for x in hex_pairs)
-        cmd = f"printf '{printf_arg}' >> {remote_path}"
-        meter.cli(cmd)
-        # print(f"Uploaded chunk {i // chunk_size + 1} (bytes {i}-{min(i + chunk_size, len(binary_content))}) to {meter.host}")
+    sync_assets(meter, {f"{REMOTE_IMAGES_DIR}/{remote_name}.png": _read_local(local_path)})
 
 # ------------------------------------------------------------------
 # Detection helpers
@@ -108,55 +169,22 @@ def _remote_sha256(meter: "SSHMeter", remote_path: str) -> Optional[str]:  # typ
     Return SHA256 hexdigest of a remote file using the meter's built-in sha256sum.
     Returns None if file missing or command fails.
     """
-    out = meter.cli(f"sha256sum '{remote_path}' 2>/dev/null || echo ''").strip()
-    if not out:
-        return None
-    return out.split()[0]  # first column is the hash
+    return remote_manifest(meter, [remote_path]).get(remote_path)
 
 def is_custom_display_current(meter: "SSHMeter") -> bool:  # type: ignore [name-defined]
     """
     Return True only if:
       • UIPage.php is present and byte-identical to local version
       • charuco.png is present and byte-identical to the correct version for this meter_type
+    Both are checked with one manifest command.
     """
-    # UIPage.php
-    expected_ui_hash = _local_text_file_hash(UI_PAGE_PATH)
-    remote_ui_hash = _remote_sha256(meter, "/var/volatile/html/UIPage.php")
-
-    if remote_ui_hash != expected_ui_hash:
-        # print(f"expected_ui_hash: {expected_ui_hash}")
-        # print(f"remote_ui_hash: {remote_ui_hash}")
-        return False
-
-    # charuco.png
     local_charuco = CHARUCO_PATHS.get(meter.meter_type)
     print(f"checking if {meter.host} has custom display assets (meter_type: {meter.meter_type} | local_charuco: {local_charuco})")
     if not local_charuco or not os.path.exists(local_charuco):
         raise FileNotFoundError(f"No local Charuco PNG for meter_type='{meter.meter_type}'")
 
-    with open(local_charuco, "rb") as f:
-        expected_charuco_hash = hashlib.sha256(f.read()).hexdigest()
-
-    remote_charuco_hash = _remote_sha256(meter, "/var/volatile/html/content/Images/charuco.png")
-    if remote_charuco_hash != expected_charuco_hash:
-        # print(f"expected_charuco_hash: {expected_charuco_hash}")
-        # print(f"remote_charuco_hash: {remote_charuco_hash}")
-        return False
-
-    ## Apriltag isn't currently used in the system so we can skip it for now, but leaving the code here in case we want to add it back in later
-    # # apriltag.png
-    # local_apriltag = get_apriltag_path(meter)
-    # if not local_apriltag or not os.path.exists(local_apriltag):
-    #     raise FileNotFoundError(f"No local Apriltag PNG for meter.host='{meter.host}'")
-
-    # with open(local_apriltag, "rb") as f:
-    #     expected_apriltag_hash = hashlib.sha256(f.read()).hexdigest()
-
-    # remote_apriltag_hash = _remote_sha256(meter, "/var/volatile/html/content/Images/apriltag.png")
-    # if remote_apriltag_hash != expected_apriltag_hash:
-    #     # print(f"expected_apriltag_hash: {expected_apriltag_hash}")
-    #     # print(f"remote_apriltag_hash: {remote_apriltag_hash}")
-    #     return False
-
-    return True
-
+    ## Apriltag isn't currently used in the system so it is left out of the check
+    return not stale_assets(meter, {
+        REMOTE_UI_PAGE_PATH: _read_local(UI_PAGE_PATH),
+        f"{REMOTE_IMAGES_DIR}/charuco.png": _read_local(local_charuco),
+    })
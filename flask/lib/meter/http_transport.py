@@ -0,0 +1,168 @@
+import threading
+import time
+from typing import Dict, Literal, Optional, TypedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+BreakerState = Literal["closed", "open", "half_open"]
+Transport = Literal["http", "cli"]
+
+
+class TransportInfo(TypedDict):
+    http_state: BreakerState
+    http_failures: int
+    http_retry_in_s: Optional[float]
+    latency_ms: Dict[str, Dict[str, float]]
+    preferred: Dict[str, Transport]
+    agent: bool
+
+
+class CircuitBreaker:
+    """
+    closed    -> requests flow; `failure_threshold` consecutive failures open it
+    open      -> requests are refused until `reset_timeout` has passed
+    half_open -> exactly one probe request is let through; success closes the
+                 breaker, failure re-opens it with a doubled timeout (capped)
+    """
+
+    def __init__(self, failure_threshold: int = 2, reset_timeout: float = 15.0, max_reset_timeout: float = 300.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_reset_timeout = float(reset_timeout)
+        self.max_reset_timeout = float(max_reset_timeout)
+        self.reset_timeout = self.base_reset_timeout
+        self.state: BreakerState = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def retry_in(self) -> Optional[float]:
+        with self._lock:
+            if self.state != "open":
+                return None
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class MeterHttpClient:
+    """
+    Keep-alive HTTP client for one meter's web endpoints (UIPage.php, busdev.php, ...)
+    plus per-operation latency tracking used to pick HTTP or the SSH CLI path.
+    """
+    EWMA_ALPHA = 0.3
+    PROBE_EVERY = 20        # re-measure the slower transport every N calls
+    PREFER_MARGIN = 0.8     # cli must be clearly faster before it wins
+
+    def __init__(self, host: str, *, pool_size: int = 4, breaker: Optional[CircuitBreaker] = None):
+        self.host = host
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self._latency: Dict[str, Dict[str, float]] = {}
+        self._calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, *, op: str = "http", raise_for_status: bool = False,
+                **kwargs) -> Optional[requests.Response]:
+        """Return a response, or None when the breaker is open or the request failed."""
+        if not self.breaker.allow():
+            return None
+
+        t0 = time.monotonic()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            if raise_for_status:
+                response.raise_for_status()
+        except Exception:
+            self.breaker.record_failure()
+            return None
+
+        self.breaker.record_success()
+        self.record(op, "http", time.monotonic() - t0)
+        return response
+
+    def record(self, op: str, transport: Transport, elapsed: float) -> None:
+        with self._lock:
+            per_op = self._latency.setdefault(op, {})
+            prev = per_op.get(transport)
+            per_op[transport] = elapsed if prev is None else prev + self.EWMA_ALPHA * (elapsed - prev)
+
+    def prefer(self, op: str) -> Transport:
+        """Pick the transport for this operation type from measured latency."""
+        if self.breaker.state == "open" and self.breaker.retry_in():
+            return "cli"
+
+        with self._lock:
+            count = self._calls[op] = self._calls.get(op, 0) + 1
+            per_op = self._latency.get(op, {})
+            http_s, cli_s = per_op.get("http"), per_op.get("cli")
+
+        preferred: Transport = "http"
+        if http_s is not None and cli_s is not None and cli_s < http_s * self.PREFER_MARGIN:
+            preferred = "cli"
+        if count % self.PROBE_EVERY == 0:
+            return "http" if preferred == "cli" else "cli"
+        return preferred
+
+    def info(self) -> Dict[str, object]:
+        with self._lock:
+            latency = {
+                op: {t: round(v * 1000, 1) for t, v in per_op.items()}
+                for op, per_op in self._latency.items()
+            }
+            preferred = {}
+            for op, per_op in self._latency.items():
+                http_s, cli_s = per_op.get("http"), per_op.get("cli")
+                preferred[op] = "cli" if (http_s is not None and cli_s is not None and cli_s < http_s * self.PREFER_MARGIN) else "http"
+
+        retry_in = self.breaker.retry_in()
+        return {
+            "http_state": self.breaker.state,
+            "http_failures": self.breaker.failures,
+            "http_retry_in_s": None if retry_in is None else round(retry_in, 1),
+            "latency_ms": latency,
+            "preferred": preferred,
+        }
+
+    def close(self) -> None:
+        try:
+            self.session.close()
+        except Exception:
+            pass
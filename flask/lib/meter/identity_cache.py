@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, TypedDict
+
+
+class MeterIdentity(TypedDict, total=False):
+    boot_id: str
+    system_versions: Dict[str, str]
+    resolution: str
+    meter_region: str
+    firmwares: Dict[str, str]
+    module_details: Dict[str, Dict[str, str]]
+    module_info: Dict[str, Dict[str, int]]
+    saved_at: float
+
+
+def get_cache_path() -> Path:
+    return Path(__file__).resolve().parent / "meter_identity.json"
+
+
+class MeterIdentityCache:
+    """
+    Scraped meter facts (firmwares, modules, versions, resolution, region) kept on
+    disk by hostname, so a meter that drops and reconnects does not need another
+    diagnostics walk. Entries are only trusted while the meter's boot_id and system
+    version still match what was saved.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else get_cache_path()
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, MeterIdentity]] = None
+
+    def _load(self) -> Dict[str, MeterIdentity]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self._data = {}
+        return self._data
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(".json.tmp")
+        try:
+            tmp.write_text(json.dumps(self._data, indent=4), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[MeterIdentityCache] unable to save {self.path}: {e}")
+
+    def get(self, hostname: str) -> Optional[MeterIdentity]:
+        with self._lock:
+            entry = self._load().get(hostname)
+            return None if entry is None else json.loads(json.dumps(entry))
+
+    def put(self, hostname: str, identity: MeterIdentity) -> None:
+        with self._lock:
+            self._load()[hostname] = {**identity, "saved_at": time.time()}
+            self._save()
+
+    def invalidate(self, hostname: str) -> None:
+        """Forget one meter, e.g. after a firmware update or a forced get_info()."""
+        with self._lock:
+            if self._load().pop(hostname, None) is not None:
+                self._save()
+
+
+identity_cache = MeterIdentityCache()
@@ -0,0 +1,294 @@
+import base64
+import itertools
+import json
+import shlex
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+# Long-lived helper run on the meter with `php -r`. One JSON request per line on
+# stdin, one JSON reply per line on stdout. Binary payloads travel as base64.
+AGENT_PHP = r'''
+$udp = socket_create(AF_INET, SOCK_DGRAM, 0);
+function agent_reply($id, $ok, $data = null, $err = null, $extra = array()) {
+    $msg = array("id" => $id, "ok" => $ok, "data" => $data, "err" => $err);
+    foreach ($extra as $k => $v) { $msg[$k] = $v; }
+    echo json_encode($msg), "\n";
+    flush();
+}
+function agent_udp($sock, $req) {
+    $bufs = array();
+    foreach ((is_array($req["hex"]) ? $req["hex"] : array($req["hex"])) as $hex) {
+        $buf = hex2bin($hex);
+        if ($buf === false) { return array(false, null, "bad hex payload"); }
+        $bufs[] = $buf;
+    }
+    $last = count($bufs) - 1;
+    $port = intval($req["port"]);
+    $count = isset($req["count"]) ? max(1, intval($req["count"])) : 1;
+    $interval = isset($req["interval"]) ? floatval($req["interval"]) : 0.0;
+    $wait = isset($req["reply_timeout"]) ? floatval($req["reply_timeout"]) : 0.0;
+    if ($wait > 0) { $sock = socket_create(AF_INET, SOCK_DGRAM, 0); }
+    for ($i = 0; $i < $count; $i++) {
+        foreach ($bufs as $j => $buf) {
+            if (!socket_sendto($sock, $buf, strlen($buf), 0, "127.0.0.1", $port)) {
+                return array(false, null, "sendto failed");
+            }
+            if ($interval > 0 && ($i < $count - 1 || $j < $last)) { usleep(intval($interval * 1000000)); }
+        }
+    }
+    $out = "";
+    if ($wait > 0) {
+        $sec = intval($wait);
+        socket_set_option($sock, SOL_SOCKET, SO_RCVTIMEO, array("sec" => $sec, "usec" => intval(($wait - $sec) * 1000000)));
+        while (($n = @socket_recvfrom($sock, $r, 65535, 0, $from, $fport)) !== false && $n > 0) { $out .= $r; }
+        socket_close($sock);
+    }
+    return array(true, base64_encode($out), null);
+}
+function agent_sh($cmd) {
+    $proc = proc_open($cmd, array(0 => array("file", "/dev/null", "r"), 1 => array("pipe", "w"), 2 => array("pipe", "w")), $pipes);
+    if (!is_resource($proc)) { return array(false, null, "proc_open failed", array()); }
+    $out = ""; $err = "";
+    $open = array($pipes[1], $pipes[2]);
+    while ($open) {
+        $r = $open; $w = null; $e = null;
+        if (stream_select($r, $w, $e, 1) === false) { break; }
+        foreach ($r as $p) {
+            $chunk = fread($p, 65536);
+            if ($chunk === false || $chunk === "") {
+                if (feof($p)) { $open = array_values(array_filter($open, function ($x) use ($p) { return $x !== $p; })); }
+                continue;
+            }
+            if ($p === $pipes[1]) { $out .= $chunk; } else { $err .= $chunk; }
+        }
+    }
+    fclose($pipes[1]); fclose($pipes[2]);
+    $code = proc_close($proc);
+    return array(true, base64_encode($out), null, array("stderr" => base64_encode($err), "code" => $code));
+}
+agent_reply(0, true, "ready");
+while (($line = fgets(STDIN)) !== false) {
+    $req = json_decode($line, true);
+    if (!is_array($req)) { agent_reply(null, false, null, "bad frame"); continue; }
+    $id = isset($req["id"]) ? $req["id"] : null;
+    $op = isset($req["op"]) ? $req["op"] : "";
+    if ($op === "ping") {
+        agent_reply($id, true, "pong");
+    } elseif ($op === "udp") {
+        list($ok, $data, $err) = agent_udp($udp, $req);
+        agent_reply($id, $ok, $data, $err);
+    } elseif ($op === "read") {
+        $data = @file_get_contents($req["path"]);
+        if ($data === false) { agent_reply($id, false, null, "No such file: " . $req["path"]); }
+        else { agent_reply($id, true, base64_encode($data)); }
+    } elseif ($op === "write") {
+        $dir = dirname($req["path"]);
+        if (!is_dir($dir)) { @mkdir($dir, 0777, true); }
+        $flags = !empty($req["append"]) ? FILE_APPEND : 0;
+        $n = @file_put_contents($req["path"], base64_decode($req["data"]), $flags);
+        if ($n === false) { agent_reply($id, false, null, "Unable to write " . $req["path"]); }
+        else { agent_reply($id, true, $n); }
+    } elseif ($op === "sh") {
+        list($ok, $data, $err, $extra) = agent_sh($req["cmd"]);
+        agent_reply($id, $ok, $data, $err, $extra);
+    } elseif ($op === "quit") {
+        agent_reply($id, true, "bye");
+        break;
+    } else {
+        agent_reply($id, false, null, "unknown op " . $op);
+    }
+}
+'''
+
+
+class MeterAgentError(RuntimeError):
+    """Raised when the agent channel cannot carry a request."""
+
+
+class MeterAgentUnavailable(MeterAgentError):
+    """Raised when a request was never delivered, so the caller may safely fall back."""
+
+
+class MeterAgentBusy(MeterAgentUnavailable):
+    """Raised by a non-blocking request while another request holds the channel."""
+
+
+class MeterAgent:
+    """
+    One php-cli process on the meter, driven over a single SSH exec channel.
+    Requests are serialized; each call is one write plus one line read on an
+    already-open channel instead of a fresh exec channel and process spawn.
+    """
+    START_TIMEOUT = 5.0
+    DEFAULT_TIMEOUT = 10.0
+
+    def __init__(self, transport, host: str = ""):
+        self.transport = transport
+        self.host = host
+        self.channel = None
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._alive = False
+        self.requests = 0
+        self.started_at: Optional[float] = None
+
+    @property
+    def alive(self) -> bool:
+        channel = self.channel
+        return bool(
+            self._alive
+            and channel is not None
+            and not channel.closed
+            and not channel.exit_status_ready()
+        )
+
+    def start(self) -> None:
+        """Open the channel, launch the agent and wait for its ready line."""
+        if self.transport is None or not self.transport.is_active():
+            raise MeterAgentUnavailable(f"{self.host} has no active SSH transport")
+
+        channel = self.transport.open_session()
+        channel.exec_command(f"php -r {shlex.quote(AGENT_PHP)}")
+        self.channel = channel
+        try:
+            hello = self._read_reply(time.monotonic() + self.START_TIMEOUT)
+        except Exception as exc:
+            self.close()
+            raise MeterAgentUnavailable(f"{self.host} agent failed to start: {exc}") from exc
+        if not hello.get("ok") or hello.get("data") != "ready":
+            self.close()
+            raise MeterAgentUnavailable(f"{self.host} agent sent unexpected hello: {hello}")
+
+        self._alive = True
+        self.started_at = time.monotonic()
+
+    def close(self) -> None:
+        self._alive = False
+        channel, self.channel = self.channel, None
+        if channel is None:
+            return
+        try:
+            channel.sendall(b'{"id":-1,"op":"quit"}\n')
+        except Exception:
+            pass
+        try:
+            channel.close()
+        except Exception:
+            pass
+
+    def _read_reply(self, deadline: float) -> Dict[str, Any]:
+        channel = self.channel
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline >= 0:
+                line = bytes(self._buffer[:newline])
+                del self._buffer[:newline + 1]
+                if line.strip():
+                    return json.loads(line)
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{self.host} agent reply timed out")
+            channel.settimeout(remaining)
+            chunk = channel.recv(65536)
+            if not chunk:
+                raise MeterAgentError(f"{self.host} agent channel closed")
+            self._buffer.extend(chunk)
+
+    def request(self, op: str, *, timeout: Optional[float] = None, blocking: bool = True,
+                **params) -> Dict[str, Any]:
+        """
+        Send one request and return the decoded reply dict. With blocking=False it
+        raises MeterAgentBusy instead of queueing behind a request in flight.
+        Raises MeterAgentUnavailable if nothing was sent, MeterAgentError otherwise.
+        """
+        if not self._lock.acquire(blocking):
+            raise MeterAgentBusy(f"{self.host} agent is busy")
+        try:
+            if not self.alive:
+                raise MeterAgentUnavailable(f"{self.host} agent is not running")
+
+            req_id = next(self._ids)
+            frame = json.dumps({"id": req_id, "op": op, **params}, separators=(",", ":")) + "\n"
+            try:
+                self.channel.sendall(frame.encode("utf-8"))
+            except Exception as exc:
+                self._alive = False
+                raise MeterAgentUnavailable(f"{self.host} agent send failed: {exc}") from exc
+
+            deadline = time.monotonic() + (self.DEFAULT_TIMEOUT if timeout is None else timeout)
+            try:
+                while True:
+                    reply = self._read_reply(deadline)
+                    if reply.get("id") == req_id:
+                        self.requests += 1
+                        return reply
+            except Exception as exc:
+                # The stream position is unknown now; drop the agent rather than desync.
+                self._alive = False
+                raise MeterAgentError(f"{self.host} agent request '{op}' failed: {exc}") from exc
+        finally:
+            self._lock.release()
+
+    # ---- typed helpers ----
+    @staticmethod
+    def decode(data: Optional[str]) -> bytes:
+        return base64.b64decode(data or "")
+
+    def send_udp(self, packet_hex: str, *, port: int, count: int = 1, interval: float = 0.0,
+                 reply_timeout: float = 0.0) -> bytes:
+        reply = self.request(
+            "udp",
+            hex=packet_hex,
+            port=port,
+            count=count,
+            interval=interval,
+            reply_timeout=reply_timeout,
+            timeout=self.DEFAULT_TIMEOUT + count * interval + reply_timeout,
+        )
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("err") or "udp send failed")
+        return self.decode(reply.get("data"))
+
+    def send_udp_sequence(self, packets_hex: List[str], *, port: int, interval: float = 0.0) -> None:
+        """Send several packets in order, paced `interval` seconds apart on the meter."""
+        reply = self.request(
+            "udp",
+            hex=list(packets_hex),
+            port=port,
+            interval=interval,
+            timeout=self.DEFAULT_TIMEOUT + len(packets_hex) * interval,
+        )
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("err") or "udp send failed")
+
+    def read_file(self, path: str) -> Optional[bytes]:
+        """Return file bytes, or None when the file is missing/unreadable."""
+        reply = self.request("read", path=path)
+        if not reply.get("ok"):
+            return None
+        return self.decode(reply.get("data"))
+
+    def write_file(self, path: str, data: bytes, *, append: bool = False) -> int:
+        reply = self.request(
+            "write",
+            path=path,
+            data=base64.b64encode(data).decode("ascii"),
+            append=append,
+        )
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("err") or f"unable to write {path}")
+        return int(reply.get("data") or 0)
+
+    def run(self, cmd: str, *, timeout: float = 60.0, blocking: bool = True):
+        """Run a shell command through the agent. Returns (code, stdout, stderr) strings."""
+        reply = self.request("sh", cmd=cmd, timeout=timeout, blocking=blocking)
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("err") or "agent command failed")
+        out = self.decode(reply.get("data")).decode(errors="replace")
+        err = self.decode(reply.get("stderr")).decode(errors="replace")
+        return int(reply.get("code") or 0), out, err
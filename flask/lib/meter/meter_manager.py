@@ -1,7 +1,9 @@
 from typing import Dict, Set, TypedDict
+import threading
 import ip_scanner
 from lib.sse.sse_queue_manager import SSEQM, key_payload
 from lib.meter.fun import send_fun_meter
+from lib.automation.journal import JournalFollower
 from lib.meter.ssh_meter import SSHMeter
 from lib.utils import secrets
 from lib.database import insert_sshmeter
@@ -33,6 +35,9 @@ class METERMANAGER:
     __STALE_THRESHOLD = 2
 
     meters: Dict[str, MeterClass] = {}
+    # one journalctl follower per meter, shared by every job / collector / tail reading its log
+    journals: Dict[str, JournalFollower] = {}
+    __journal_lock = threading.Lock()
 
     class __FINALLY(Exception):
         pass
@@ -66,6 +71,9 @@ class METERMANAGER:
                     },
                 )
 
+            journal = cls.journals.pop(ip, None)
+            if journal is not None:
+                journal.stop()
             cls.meters[ip].close()
             cls.meters.pop(ip, None)
             cls.__meters.discard(ip)
@@ -97,7 +105,7 @@ class METERMANAGER:
         if cls.__attempts.get(ip, 0) >= cls.__limit:
             return False
 
-        meter = METERMANAGER.MeterClass(ip)
+        meter = METERMANAGER.MeterClass(ip, use_agent=secrets.METER_AGENT)
         try:
             meter.connect()
 
@@ -126,6 +134,10 @@ class METERMANAGER:
                     else:
                         raise cls.__FINALLY
 
+                # reconnect of a known meter: reuse firmwares/modules/versions from disk
+                if meter.restore_identity():
+                    print(f"[{hn}-{ip}] Restored cached identity (boot id unchanged)", fg="#888888")
+
                 # here, has booted + X seconds or was booted already
                 print(f"[{hn}-{ip}] Attempting to enter diagnostics ...", fg="#888800")
                 meter.force_diagnostics()
@@ -142,6 +154,7 @@ class METERMANAGER:
                         fg="#00aa00",
                     )
                     meter.db_id = meter_id
+                    meter.save_identity()
 
                 except Exception as e:
                     print(f"⚠️ [{hn}] database insert failed: {e}", fg="#880000")
@@ -250,6 +263,17 @@ class METERMANAGER:
     def get_meter(cls, ip: str):
         return cls.meters[ip]
 
+    @classmethod
+    def get_journal(cls, ip: str) -> JournalFollower:
+        """Shared journal follower of a known meter, started on first use."""
+        with cls.__journal_lock:
+            journal = cls.journals.get(ip)
+            if journal is None:
+                meter = cls.meters[ip]
+                journal = cls.journals[ip] = meter.journal = JournalFollower(meter)
+        journal.start()
+        return journal
+
     @classmethod
     def stale_meter(cls, ip: str):
         cls.__on_stale(ip)
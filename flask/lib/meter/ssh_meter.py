@@ -1,5 +1,5 @@
 # class to hold ssh-meter. for states or what not
-from typing import Optional, Literal, TypedDict, Dict, Tuple, List, Sequence
+from typing import Callable, Optional, Literal, TypedDict, Dict, Tuple, List, Sequence
 # from lib.ssh.client import SSHClient
 from paramiko import SSHException
 import sshkit
@@ -12,16 +12,21 @@ import json
 import shlex
 import threading
 from html import unescape
-from datetime import datetime
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
 from lib.utils import secrets
 from lib.automation.shared_state import SharedState
 from lib.meter.coin_utils import clear_coin_tallies as clear_coin_tallies_impl
+from lib.meter.meter_agent import MeterAgent, MeterAgentBusy, MeterAgentError, MeterAgentUnavailable
+from lib.meter.channel_pool import ChannelPool, ChannelPriority
+from lib.meter.http_transport import MeterHttpClient, TransportInfo
+from lib.meter.ui_watcher import UIWatcher
+from lib.meter.diag_graph import diag_graph
+from lib.meter.identity_cache import MeterIdentity, identity_cache
+from lib.meter.command_cache import CommandCache
 from lib.meter.display_utils import (
-    CHARUCO_PATHS, write_ui_page, write_ui_overlay,
-    upload_image, is_custom_display_current,
-    get_apriltag_path, write_results_json
+    custom_display_assets, stale_assets, push_files, write_results_json
 )
 
 
@@ -87,8 +92,51 @@ BUSDEV_KEY_HEX = {
     "diagnostics": "7200",
 }
 BUSDEV_KEY_PACKET_PREFIX = "00010200000000003e0800000000"
+BEEP_PACKET_HEX = "00010200005400003e08000000000000"
 DIAG_SELECTED_PREFIX_RE = re.compile(r"^\s*(?:->|=>)\s*")
 
+# Pages through the IPSBus Modules screen on the meter itself: sends the '2' key
+# packet, waits for the module name under the divider to change, and prints a JSON
+# list of the <pre> blocks seen. Expects $path, $key (packet hex), $max and $wait.
+MODULE_INVENTORY_PHP = r'''
+function inv_pre($path) {
+    $html = @file_get_contents($path);
+    if ($html === false) { return null; }
+    return preg_match('/<pre[^>]*>(.*?)<\/pre>/is', $html, $m) ? $m[1] : $html;
+}
+function inv_module($pre) {
+    $pre = str_replace("\r", "", $pre);
+    if (!preg_match_all('/^\s*-{5,}\s*$/m', $pre, $m, PREG_OFFSET_CAPTURE)) { return null; }
+    $div = end($m[0]);
+    foreach (explode("\n", strip_tags(substr($pre, $div[1] + strlen($div[0])))) as $line) {
+        $line = trim($line);
+        if ($line !== "") { return $line; }
+    }
+    return null;
+}
+$sock = socket_create(AF_INET, SOCK_DGRAM, 0);
+$buf = hex2bin($key);
+$pages = array();
+$seen = array();
+$pre = inv_pre($path);
+while ($pre !== null && count($pages) < $max) {
+    $mod = inv_module($pre);
+    if ($mod === null || isset($seen[$mod])) { break; }
+    $seen[$mod] = true;
+    $pages[] = $pre;
+    socket_sendto($sock, $buf, strlen($buf), 0, "127.0.0.1", 8002);
+    $next = null;
+    $deadline = microtime(true) + $wait;
+    while (microtime(true) < $deadline) {
+        usleep(50000);
+        $p = inv_pre($path);
+        if ($p !== null && inv_module($p) !== $mod) { $next = $p; break; }
+    }
+    $pre = $next;
+}
+echo json_encode($pages);
+'''
+
 COIN_VALUE_TO_INDEX_BY_REGION: Dict[str, Dict[int, int]] = {
     "us": {
         5: 2,   # nickel
@@ -156,6 +204,7 @@ class InfoDict(TypedDict):
     meter_region: MeterRegion
     module_info: Dict[str, ModuleInfo]
     system_versions: SystemVersions
+    transport: TransportInfo
 
 
 class DiagMenuItem(TypedDict):
@@ -171,15 +220,30 @@ class DiagPageState(TypedDict):
     is_menu: bool
     page_html: str
 
+def _utc_naive(epoch: float) -> datetime:
+    """Naive datetime for a UTC epoch; stands in for the deprecated datetime.utcfromtimestamp()."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
 def_user = bytes(a ^ b for a, b in zip(bytes([238,149,49,210]), [156,250,94,166])).decode()
 def_pswd = bytes(a ^ b for a, b in zip(bytes([236,108,173,77,97,238,131,254,65,42,46]), [156,44,223,6,8,128,228,201,118,25,25])).decode()
 class SSHMeter(sshkit.Client):
     DEFAULT_SSH_IDLE_TIMEOUT = 180.0
+    DEFAULT_MAX_CHANNELS = 3
+    AGENT_RETRY_DELAY = 30.0
+    AGENT_RUN_TIMEOUT = 10.0    # cli() through the agent; past this the agent is dropped
+    UI_WATCH_RETRY_DELAY = 30.0
+    # meter clock offset cache: short until consecutive reads agree, then longer
+    CLOCK_SETTLE_TTL = 10.0
+    CLOCK_STABLE_TTL = 60.0
+    CLOCK_STEP_S = 2.0
 
     def __init__(self, host, **kwargs):
+        use_agent = bool(kwargs.pop("use_agent", False))
+        max_channels = int(kwargs.pop("max_channels", self.DEFAULT_MAX_CHANNELS))
         super().__init__(host, user=def_user, pswd=def_pswd, **kwargs)
         self._lock = threading.RLock()
-        self._command_lock = threading.RLock()
+        # concurrent exec channels on the shared transport, admitted by priority
+        self._channel_pool = ChannelPool(max_channels=max_channels)
         self._ssh_state_lock = threading.RLock()
         self._connected_hint = False
         self._ssh_active_ops = 0
@@ -195,11 +259,31 @@ class SSHMeter(sshkit.Client):
         self._module_info_cache: Optional[Dict[str, ModuleInfo]] = None
         self._system_versions_cache: Optional[SystemVersions] = None
         self._meter_region_cache: Optional[MeterRegion] = None
-        self._http_available: Optional[bool] = None
+        self._boot_id: Optional[str] = None
+        self._clock_sample: Optional[Tuple[float, float]] = None
+        # memo for declared-idempotent reads; dropped when the boot id changes
+        self._cmd_cache = CommandCache()
+        # pooled keep-alive session + circuit breaker for the meter web endpoints
+        self._http = MeterHttpClient(host)
         self._blink_until_stop: Optional[threading.Event] = None
         self._blink_until_thread: Optional[threading.Thread] = None
         self._blink_until_status: Optional[Literal["ready", "idle", "busy"]] = None
 
+        # optional long-lived meter-side helper (see lib/meter/meter_agent.py)
+        self.use_agent = use_agent
+        self._agent: Optional[MeterAgent] = None
+        self._agent_retry_at = 0.0
+
+        # push-based UI page changes (see lib/meter/ui_watcher.py); polled fallback keeps its own version
+        self._ui_watcher: Optional[UIWatcher] = None
+        self._ui_watch_retry_at = 0.0
+        self._ui_version = 0
+        self._ui_html: Optional[str] = None
+        self._ui_state_lock = threading.Lock()
+
+        # shared journal follower + ring (lib/automation/journal.py), attached by METERMANAGER.get_journal
+        self.journal = None
+
     def _transport_is_active(self) -> bool:
         """Return True only when Paramiko has a live active transport."""
         try:
@@ -208,6 +292,18 @@ class SSHMeter(sshkit.Client):
         except Exception:
             return False
 
+    @property
+    def hostname(self) -> str:
+        """The meter's hostname; one known from restore_identity() (or the mock) wins over asking sshkit."""
+        known = self.__dict__.get("_known_hostname")
+        if known:
+            return known
+        return super().hostname
+
+    @hostname.setter
+    def hostname(self, value: str) -> None:
+        self._known_hostname = value
+
     @property
     def connected(self) -> bool:
         """Report current SSH health from Paramiko instead of a cached flag."""
@@ -260,12 +356,18 @@ class SSHMeter(sshkit.Client):
             transport = self.get_transport()
             if transport:
                 transport.set_keepalive(30)
+            # the meter may have rebooted while we were away
+            self._cmd_cache.needs_validation = True
             self.connected = True
             self._touch_ssh_use()
 
     def close(self):
-        """Close the local Paramiko client and mark the cached hint disconnected."""
+        """Close the local Paramiko client and the pooled HTTP session, and mark the cached hint disconnected."""
         with self._lock:
+            self.stop_agent()
+            self.stop_ui_watcher()
+            # requests rebuilds the pool on the next call, so a reconnect can keep using it
+            self._http.close()
             try:
                 super(sshkit.Client, self).close()
             except:
@@ -288,7 +390,7 @@ class SSHMeter(sshkit.Client):
             if not should_close:
                 return False
 
-        with self._command_lock:
+        with self._channel_pool.exclusive():
             with self._ssh_state_lock:
                 if self._ssh_active_ops > 0:
                     return False
@@ -301,6 +403,31 @@ class SSHMeter(sshkit.Client):
             self.close()
             return True
 
+    def open_stream(self, command: str):
+        """
+        Start a long-running command (journal follow, watchers) on its own channel
+        of the shared transport. The connection is held against idle cleanup until
+        close_stream() is called with the returned channel.
+        """
+        self._begin_ssh_operation()
+        try:
+            # the previous stream may have died with the transport; reconnect first
+            self.connect()
+            channel = self.get_transport().open_session()
+            channel.exec_command(command)
+        except Exception:
+            self._end_ssh_operation()
+            raise
+        return channel
+
+    def close_stream(self, channel) -> None:
+        try:
+            channel.close()
+        except Exception:
+            pass
+        finally:
+            self._end_ssh_operation()
+
     def _exec_command_with_retry(self, command: str, *args, **kwargs):
         """Open an SSH command channel, reconnecting once if the transport is stale."""
         last_exc = None
@@ -310,29 +437,31 @@ class SSHMeter(sshkit.Client):
                 return super(sshkit.Client, self).exec_command(command, *args, **kwargs)
             except Exception as exc:
                 last_exc = exc
-                try:
-                    self.close()
-                except:
-                    pass
+                # other channels may still be running on a healthy transport
+                if not self._transport_is_active():
+                    try:
+                        self.close()
+                    except:
+                        pass
                 if attempt == 1:
                     raise last_exc
         raise last_exc
 
-    def exec_command(self, command, *args, **kwargs):
+    def exec_command(self, command, *args, priority: ChannelPriority = "normal", **kwargs):
         """Run a raw SSH command while protecting connection state."""
-        with self._command_lock:
+        with self._channel_pool.slot(priority):
             self._begin_ssh_operation()
             try:
                 return self._exec_command_with_retry(command, *args, **kwargs)
             finally:
                 self._end_ssh_operation()
 
-    def safe_exec_command(self, command: str):
+    def safe_exec_command(self, command: str, priority: ChannelPriority = "normal"):
         """Run a command and return raw Paramiko streams for legacy callers."""
         # Raw stream callers must consume/close returned stdout/stderr promptly.
         # Prefer cli() or exec_parse() when the caller needs command output.
         was_connected = self.connected
-        with self._command_lock:
+        with self._channel_pool.slot(priority):
             self._begin_ssh_operation()
             try:
                 res = self._exec_command_with_retry(command)
@@ -342,9 +471,9 @@ class SSHMeter(sshkit.Client):
             finally:
                 self._end_ssh_operation()
 
-    def exec_parse(self, command: str) -> tuple[int, str, str]:
+    def exec_parse(self, command: str, priority: ChannelPriority = "normal") -> tuple[int, str, str]:
         """Run a command and return exit code, stdout, and stderr as strings."""
-        with self._command_lock:
+        with self._channel_pool.slot(priority):
             self._begin_ssh_operation()
             try:
                 _, stdout, stderr = self._exec_command_with_retry(command)
@@ -355,13 +484,246 @@ class SSHMeter(sshkit.Client):
             finally:
                 self._end_ssh_operation()
 
+    def exec_with_input(self, command: str, data: bytes,
+                        priority: ChannelPriority = "normal") -> tuple[int, str, str]:
+        """Run a command with `data` streamed to its stdin over the same channel."""
+        with self._channel_pool.slot(priority):
+            self._begin_ssh_operation()
+            try:
+                stdin, stdout, stderr = self._exec_command_with_retry(command)
+                stdin.write(data)
+                stdin.flush()
+                stdin.channel.shutdown_write()
+                out = stdout.read().decode(errors="replace").strip()
+                err = stderr.read().decode(errors="replace").strip()
+                code = stdout.channel.recv_exit_status()
+                return code, out, err
+            finally:
+                self._end_ssh_operation()
+
+    @property
+    def agent_active(self) -> bool:
+        agent = self._agent
+        return bool(agent and agent.alive)
+
+    def start_agent(self) -> bool:
+        """Start the meter-side helper on one channel. Returns False if it could not start."""
+        with self._lock:
+            if self.agent_active:
+                return True
+            self.stop_agent()
+            self._begin_ssh_operation()
+            try:
+                agent = MeterAgent(self.get_transport(), host=self.host)
+                agent.start()
+            except Exception:
+                self._agent_retry_at = time.monotonic() + self.AGENT_RETRY_DELAY
+                return False
+            finally:
+                self._end_ssh_operation()
+            self._agent = agent
+            return True
+
+    def stop_agent(self) -> None:
+        agent, self._agent = self._agent, None
+        if agent is not None:
+            agent.close()
+
+    def _get_agent(self) -> Optional[MeterAgent]:
+        """Return a running agent, starting it lazily when agent mode is enabled."""
+        if self.agent_active:
+            return self._agent
+        if not self.use_agent or time.monotonic() < self._agent_retry_at:
+            return None
+        return self._agent if self.start_agent() else None
+
+    def _agent_call(self, method: str, *args, **kwargs):
+        """
+        Run a MeterAgent helper. Returns (True, result) on success and (False, None)
+        when the request never reached the agent, so callers use the per-command path.
+        """
+        agent = self._get_agent()
+        if agent is None:
+            return False, None
+        try:
+            result = getattr(agent, method)(*args, **kwargs)
+        except MeterAgentBusy:
+            return False, None
+        except MeterAgentUnavailable:
+            self.stop_agent()
+            return False, None
+        except MeterAgentError:
+            # delivered but unanswered; retrying per-command could repeat a side effect
+            self.stop_agent()
+            self._agent_retry_at = time.monotonic() + self.AGENT_RETRY_DELAY
+            raise
+        self._touch_ssh_use()
+        return True, result
+
+    @property
+    def ui_watcher_active(self) -> bool:
+        watcher = self._ui_watcher
+        return bool(watcher and watcher.alive)
+
+    def start_ui_watcher(self) -> bool:
+        """Stream UI page changes over one channel. Returns False if the watcher could not start."""
+        if self.ui_watcher_active:
+            return True
+        with self._lock:
+            if self.ui_watcher_active:
+                return True
+            if time.monotonic() < self._ui_watch_retry_at:
+                return False
+            self.stop_ui_watcher()
+            self._begin_ssh_operation()
+            try:
+                watcher = UIWatcher(
+                    self.get_transport(), REMOTE_UI_HTML_PATH, host=self.host, version=self._ui_version
+                )
+                watcher.start()
+            except Exception:
+                self._ui_watch_retry_at = time.monotonic() + self.UI_WATCH_RETRY_DELAY
+                return False
+            finally:
+                self._end_ssh_operation()
+            self._ui_watcher = watcher
+            return True
+
+    def stop_ui_watcher(self) -> None:
+        watcher, self._ui_watcher = self._ui_watcher, None
+        if watcher is not None:
+            self._ui_version = max(self._ui_version, watcher.version)
+            watcher.close()
+
+    def _poll_ui_page(self, timeout: float) -> Tuple[int, str]:
+        """Fetch the page once and bump the polled version if it changed."""
+        page_html = self._get_uipage_html(timeout=timeout)
+        with self._ui_state_lock:
+            if page_html != self._ui_html:
+                self._ui_html = page_html
+                self._ui_version += 1
+            return self._ui_version, page_html
+
+    def wait_for_ui_change(
+        self,
+        since_version: Optional[int] = None,
+        timeout: float = 5.0,
+        *,
+        poll_interval: float = 0.25,
+        page_timeout: float = 2.0,
+    ) -> Tuple[int, str]:
+        """
+        Block until the UI page differs from `since_version` or `timeout` expires,
+        then return (version, page_html). `since_version=None` returns the current page.
+        Uses the UI watcher when it can run, otherwise polls every `poll_interval`.
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        if self.start_ui_watcher():
+            self._touch_ssh_use()
+            version, page_html = self._ui_watcher.wait_for_change(since_version, timeout)
+            if page_html is not None:
+                self._ui_version = max(self._ui_version, version)
+                return version, page_html
+
+        while True:
+            if since_version is not None:
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    time.sleep(min(max(0.0, poll_interval), remaining))
+            version, page_html = self._poll_ui_page(page_timeout)
+            if since_version is None or version > since_version or time.monotonic() >= deadline:
+                return version, page_html
+
+    def wait_for_ui_page(
+        self,
+        predicate: Callable[[str], bool],
+        *,
+        timeout: float = 5.0,
+        poll_interval: float = 0.25,
+        page_timeout: float = 2.0,
+    ) -> Optional[str]:
+        """Return the first UI page matching `predicate` within `timeout`, else None."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        version = None
+        while True:
+            version, page_html = self.wait_for_ui_change(
+                version,
+                max(0.0, deadline - time.monotonic()),
+                poll_interval=poll_interval,
+                page_timeout=page_timeout,
+            )
+            if predicate(page_html):
+                return page_html
+            if time.monotonic() >= deadline:
+                return None
+
+    def restore_identity(self) -> bool:
+        """
+        Fill the get_info() caches from the on-disk identity cache. Costs one command
+        (boot_id + hostname) and one config_main read; returns False, leaving the
+        caches untouched, when there is no entry or the boot id / system version moved.
+        """
+        try:
+            boot_id, hostname = self.cli(
+                "cat /proc/sys/kernel/random/boot_id; hostname"
+            ).split()[:2]
+        except Exception:
+            return False
+        self._boot_id = boot_id
+        self.hostname = hostname
+        self._cmd_cache.validate(boot_id)
+
+        entry = identity_cache.get(hostname)
+        if not entry or entry.get("boot_id") != boot_id:
+            return False
+        versions = self.get_system_versions(force_refresh=True)
+        if not versions["system_version"] or versions != entry.get("system_versions"):
+            identity_cache.invalidate(hostname)
+            return False
+
+        self.__resolution = entry.get("resolution", "")
+        self._meter_region_cache = entry.get("meter_region") or None
+        self._firmwares = entry.get("firmwares")
+        self._module_details_cache = entry.get("module_details")
+        self._module_info_cache = entry.get("module_info")
+        return True
+
+    def save_identity(self) -> bool:
+        """Persist the current get_info() caches once every part of them is known."""
+        versions = self._system_versions_cache
+        if not (self._boot_id and self.__resolution and self._module_details_cache
+                and self._module_info_cache and versions and versions["system_version"]):
+            return False
+        identity: MeterIdentity = {
+            "boot_id": self._boot_id,
+            "system_versions": dict(versions),
+            "resolution": self.__resolution,
+            "meter_region": self._meter_region_cache or "",
+            "firmwares": dict(self._firmwares or {}),
+            "module_details": self._module_details_cache,
+            "module_info": self._module_info_cache,
+        }
+        identity_cache.put(self.hostname, identity)
+        return True
+
+    def invalidate_identity(self) -> None:
+        """Drop cached identity in memory and on disk. Call after flashing firmware."""
+        self._firmwares = None
+        self._module_details_cache = None
+        self._module_info_cache = None
+        self._system_versions_cache = None
+        self._meter_region_cache = None
+        try:
+            identity_cache.invalidate(self.hostname)
+        except Exception:
+            pass
+
     def get_info(self, force=False)->InfoDict:
         if force:
-            self._firmwares = None
-            self._module_details_cache = None
-            self._module_info_cache = None
-            self._system_versions_cache = None
-            self._meter_region_cache = None
+            self.invalidate_identity()
+            info = self.get_info()
+            self.save_identity()
+            return info
         return {
             'ip': self.host,
             'status': self.status,
@@ -370,11 +732,32 @@ class SSHMeter(sshkit.Client):
             'meter_type': self.meter_type,
             'meter_region': self.meter_region,
             'module_info': self.module_info,
-            'system_versions': self.system_versions
+            'system_versions': self.system_versions,
+            'transport': self.transport_info(),
         }
 
-    def _cli_full(self, cmd: str) -> Tuple[str, str]:
-        with self._command_lock:
+    def transport_info(self) -> TransportInfo:
+        """Current HTTP breaker state, measured latency per operation and agent state."""
+        info = self._http.info()
+        info["agent"] = self.agent_active
+        return info
+
+    def _cli_full(self, cmd: str, priority: ChannelPriority = "normal") -> Tuple[str, str]:
+        # The agent serializes requests on one channel: only interactive commands use
+        # it, and only while it is free, so nothing waits behind a slow command.
+        if priority == "interactive":
+            try:
+                ok, res = self._agent_call("run", cmd, timeout=self.AGENT_RUN_TIMEOUT, blocking=False)
+            except MeterAgentError as e:
+                # delivered but unanswered: it may have run, so it is not run again
+                return "", str(e)
+            except RuntimeError:
+                ok = False  # the agent could not launch it; nothing ran
+            if ok:
+                _, out, err = res
+                return out.strip(), err.strip()
+
+        with self._channel_pool.slot(priority):
             self._begin_ssh_operation()
             try:
                 stdin, stdout, stderr = self._exec_command_with_retry(cmd)
@@ -385,10 +768,97 @@ class SSHMeter(sshkit.Client):
             finally:
                 self._end_ssh_operation()
 
-    def cli(self, cmd:str):
-        out, _ = self._cli_full(cmd)
+    def cli(self, cmd:str, priority: ChannelPriority = "normal"):
+        out, _ = self._cli_full(cmd, priority=priority)
+        return out
+
+    def cached_cli(self, cmd: str, *, family: str, ttl: Optional[float] = None,
+                   paths: Sequence[str] = (), priority: ChannelPriority = "normal") -> str:
+        """
+        cli() for read-only commands. Output is reused for `ttl` seconds while the
+        meter's boot id is unchanged; writes through bust_cache(path) drop entries
+        that read `path`.
+        """
+        self._validate_cmd_cache()
+        hit, out = self._cmd_cache.get(cmd, family)
+        if hit:
+            return out
+        out = self.cli(cmd, priority=priority)
+        if not self._cmd_cache.needs_validation:
+            self._cmd_cache.put(cmd, out, family=family, ttl=ttl, paths=paths)
         return out
 
+    def _validate_cmd_cache(self) -> None:
+        """After a (re)connect, check the boot id once before trusting cached reads."""
+        if not self._cmd_cache.needs_validation:
+            return
+        try:
+            boot_id = self.cli("cat /proc/sys/kernel/random/boot_id").strip()
+        except Exception:
+            boot_id = ""
+        if boot_id:
+            self._boot_id = boot_id
+            self._cmd_cache.validate(boot_id)
+        else:
+            self._cmd_cache.clear()
+
+    def bust_cache(self, path: str) -> int:
+        """Forget cached reads of `path`; call after writing it."""
+        return self._cmd_cache.bust(path)
+
+    def cache_stats(self) -> Dict[str, object]:
+        """Hit/miss/bust counters of the command cache per command family."""
+        return self._cmd_cache.stats()
+
+    def _meter_clock(self) -> Tuple[float, float]:
+        """
+        (meter clock - local clock, meter UTC offset) in seconds, from a cached `date`
+        read. NTP/RTC steps (right after boot) keep the boot id, so the offset is only
+        trusted for CLOCK_SETTLE_TTL until two reads in a row agree within CLOCK_STEP_S.
+        """
+        self._validate_cmd_cache()
+        hit, sample = self._cmd_cache.get("date", "date")
+        if not hit:
+            out = self.cli("date '+%s %Y-%m-%dT%H:%M:%S'")
+            read_at = time.time()
+            epoch_s, local_s = out.split()
+            epoch = int(epoch_s)
+            clock_offset = epoch - read_at
+            tz_offset = (datetime.strptime(local_s, "%Y-%m-%dT%H:%M:%S") - _utc_naive(epoch)).total_seconds()
+            sample = f"{clock_offset} {tz_offset}"
+            previous, self._clock_sample = self._clock_sample, (clock_offset, tz_offset)
+            settled = (previous is not None and abs(previous[0] - clock_offset) < self.CLOCK_STEP_S
+                       and previous[1] == tz_offset)
+            if not self._cmd_cache.needs_validation:
+                ttl = self.CLOCK_STABLE_TTL if settled else self.CLOCK_SETTLE_TTL
+                self._cmd_cache.put("date", sample, family="date", ttl=ttl)
+
+        clock_offset, tz_offset = (float(v) for v in sample.split())
+        return clock_offset, tz_offset
+
+    def meter_time(self, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+        """
+        Current meter wall-clock time formatted like `date '+fmt'`. Uses a cached
+        clock/timezone offset instead of running `date` every call; the estimate
+        never runs ahead of the meter's own clock, so it is safe as a journal --since.
+        """
+        clock_offset, tz_offset = self._meter_clock()
+        return _utc_naive(int(time.time() + clock_offset) + tz_offset).strftime(fmt)
+
+    def meter_epoch(self, value: str, fmt: str = "%Y-%m-%d %H:%M:%S") -> float:
+        """Meter-local wall-clock text (e.g. a journal --since value) -> Unix epoch seconds."""
+        _, tz_offset = self._meter_clock()
+        return (datetime.strptime(value.strip(), fmt) - datetime(1970, 1, 1)).total_seconds() - tz_offset
+
+    def meter_localtime(self, epoch: float) -> datetime:
+        """Unix epoch seconds -> naive datetime on the meter's wall clock."""
+        _, tz_offset = self._meter_clock()
+        return _utc_naive(epoch + tz_offset)
+
+    def channel_stats(self) -> Dict[str, object]:
+        """Channel pool occupancy and queue wait counters per priority."""
+        return self._channel_pool.stats()
+
     @staticmethod
     def _synthetic_response(url: str, status_code: int = 200, text: str = "") -> requests.Response:
         response = requests.Response()
@@ -403,21 +873,11 @@ class SSHMeter(sshkit.Client):
         method: str,
         url: str,
         *,
+        op: str = "http",
         raise_for_status: bool = False,
         **kwargs,
     ) -> Optional[requests.Response]:
-        if self._http_available is False:
-            return None
-
-        try:
-            response = requests.request(method, url, **kwargs)
-            if raise_for_status:
-                response.raise_for_status()
-            self._http_available = True
-            return response
-        except Exception:
-            self._http_available = False
-            return None
+        return self._http.request(method, url, op=op, raise_for_status=raise_for_status, **kwargs)
 
     def _run_remote_php_script(
         self,
@@ -425,6 +885,7 @@ class SSHMeter(sshkit.Client):
         *,
         post_data: Optional[Dict[str, str]] = None,
         capture_output: bool = True,
+        priority: ChannelPriority = "normal",
     ) -> str:
         script_dir = os.path.dirname(script_path)
         script_name = os.path.basename(script_path)
@@ -452,7 +913,7 @@ class SSHMeter(sshkit.Client):
             f"cd {shlex.quote(script_dir)} && "
             f"php -r {shlex.quote(''.join(php_parts))}"
         )
-        out, err = self._cli_full(command)
+        out, err = self._cli_full(command, priority=priority)
         if err:
             raise RuntimeError(err)
         return out
@@ -467,23 +928,35 @@ class SSHMeter(sshkit.Client):
             for i in range(0, len(packet_hex), 2)
         )
 
-    def _udp_packet_hex_command(self, packet_hex: str, *, port: int) -> str:
+    def _udp_packet_hex_command(self, packet_hex: str, *, port: int, send_only: bool = False) -> str:
         escaped_payload = self._hex_to_printf_payload(packet_hex)
+        # plain `socat -` lingers 0.5s for reply datagrams after stdin closes; -u/udp-send returns at once
+        target = f"-u - udp-send:127.0.0.1:{port}" if send_only else f"- UDP:127.0.0.1:{port}"
         return (
             f"printf '%b' {shlex.quote(escaped_payload)} | "
-            f"socat - UDP:127.0.0.1:{port}"
+            f"socat {target}"
         )
 
     def _send_udp_packet_hex(self, packet_hex: str, *, port: int) -> None:
+        ok, _ = self._agent_call("send_udp", packet_hex, port=port)
+        if ok:
+            return
         command = self._udp_packet_hex_command(packet_hex, port=port)
-        out, err = self._cli_full(command)
+        out, err = self._cli_full(command, priority="interactive")
         if err and not out:
             raise RuntimeError(err)
 
     def _send_udp_packet_hex_detached(self, packet_hex: str, *, port: int) -> None:
-        self._fire_and_forget(self._udp_packet_hex_command(packet_hex, port=port))
+        ok, _ = self._agent_call("send_udp", packet_hex, port=port)
+        if ok:
+            return
+        self._fire_and_forget(self._udp_packet_hex_command(packet_hex, port=port), priority="interactive")
 
     def _send_rtsc_command(self, command: str, port: int = 8008) -> str:
+        # socat waits 0.5s for reply datagrams after stdin closes; the agent does the same
+        ok, reply = self._agent_call("send_udp", command.encode().hex(), port=port, reply_timeout=0.5)
+        if ok:
+            return reply.decode(errors="replace").strip()
         out, err = self._cli_full(
             f"printf %s {shlex.quote(command)} | socat - UDP:127.0.0.1:{port}"
         )
@@ -492,6 +965,11 @@ class SSHMeter(sshkit.Client):
         return out
 
     def _write_remote_text(self, remote_path: str, content: str) -> None:
+        self.bust_cache(remote_path)
+        # heredoc path below appends a trailing newline; keep files identical either way
+        ok, _ = self._agent_call("write_file", remote_path, (content + "\n").encode("utf-8"))
+        if ok:
+            return
         remote_dir = os.path.dirname(remote_path)
         delimiter = "__BURNINGSTATION_EOF__"
         while delimiter in content:
@@ -508,7 +986,10 @@ class SSHMeter(sshkit.Client):
             raise RuntimeError(err)
 
     def _read_uipage_html_via_cli(self) -> str:
-        page_html, err = self._cli_full(f"cat {shlex.quote(REMOTE_UI_HTML_PATH)}")
+        ok, data = self._agent_call("read_file", REMOTE_UI_HTML_PATH)
+        if ok and data is not None:
+            return data.decode(errors="replace").strip()
+        page_html, err = self._cli_full(f"cat {shlex.quote(REMOTE_UI_HTML_PATH)}", priority="interactive")
         if err and not page_html:
             raise RuntimeError(err)
         return page_html
@@ -532,13 +1013,17 @@ class SSHMeter(sshkit.Client):
     ) -> requests.Response:
         url = f"http://{self.host}:8005/web/busdev.php"
 
-        if not prefer_cli:
-            resp = self._http_request("post", url, data=data, timeout=0.75)
+        if not prefer_cli and self._http.prefer("busdev") == "http":
+            resp = self._http_request("post", url, op="busdev", data=data, timeout=0.75)
             if resp is not None:
                 time.sleep(delay)
                 return resp
 
-        self._run_remote_php_script(REMOTE_BUSDEV_PATH, post_data=data, capture_output=False)
+        t0 = time.monotonic()
+        self._run_remote_php_script(
+            REMOTE_BUSDEV_PATH, post_data=data, capture_output=False, priority="interactive"
+        )
+        self._http.record("busdev", "cli", time.monotonic() - t0)
         time.sleep(delay)
         return self._synthetic_response(url, text="cli-fallback")
 
@@ -564,7 +1049,7 @@ class SSHMeter(sshkit.Client):
                 '}'
                 'socket_close($sock);'
             )
-            _, err = self._cli_full(f"php -r {shlex.quote(php_code)}")
+            _, err = self._cli_full(f"php -r {shlex.quote(php_code)}", priority="interactive")
             if err:
                 return self._post_busdev_form({key: "1"}, delay=delay, prefer_cli=True)
 
@@ -574,7 +1059,7 @@ class SSHMeter(sshkit.Client):
 
     def _get_config_main_html(self, timeout: float = 2.0) -> str:
         url = f"http://{self.host}:8005/web/config_main.php"
-        resp = self._http_request("get", url, timeout=timeout, raise_for_status=True)
+        resp = self._http_request("get", url, op="config", timeout=timeout, raise_for_status=True)
         if resp is not None:
             return resp.text
 
@@ -582,7 +1067,9 @@ class SSHMeter(sshkit.Client):
        
     def get_meter_type(self)-> MeterType:
         if (self.__resolution == ""):
-            self.__resolution = self.cli("""fbset -s | grep mode | awk -F'"' '{print $2}' | cut -d- -f1""")
+            self.__resolution = self.cached_cli(
+                """fbset -s | grep mode | awk -F'"' '{print $2}' | cut -d- -f1""", family="fbset", ttl=3600.0
+            )
 
         meter_type:MeterType = ""
         if self.__resolution == "1024x768":
@@ -605,6 +1092,9 @@ class SSHMeter(sshkit.Client):
     meter_type = property(lambda self: self.get_meter_type())
 
     def _read_remote_file_if_exists(self, path: str) -> str:
+        ok, data = self._agent_call("read_file", path)
+        if ok:
+            return "" if data is None else data.decode(errors="replace").strip()
         out, err = self._cli_full(f"cat {shlex.quote(path)}")
         if err and not out:
             err_lower = err.lower()
@@ -628,7 +1118,9 @@ class SSHMeter(sshkit.Client):
                 "printf '\\n';"
             )
 
-        out, _ = self._cli_full(" ".join(command_parts))
+        out = self.cached_cli(
+            " ".join(command_parts), family="registry", ttl=600.0, paths=list(registry_files.values())
+        )
         values = {key: "" for key in registry_files}
         current_key: Optional[str] = None
         current_lines: List[str] = []
@@ -695,19 +1187,27 @@ class SSHMeter(sshkit.Client):
 
     def force_diagnostics(self):
         if self.in_diagnostics():
-            self.press('diagnostics')
-            time.sleep(0.1)
-            self.press('diagnostics')
+            self.press_sequence(['diagnostics', 'diagnostics'], inter_key_delay=0.2, delay=0.1)
         else:
             self.press('diagnostics')
 
     def _get_uipage_html(self, timeout: float = 5.0) -> str:
+        watcher = self._ui_watcher
+        if watcher is not None and watcher.alive:
+            _, page_html = watcher.snapshot()
+            if page_html is not None:
+                return page_html
+
         url = f"http://{self.host}:8005/UIPage.php"
-        resp = self._http_request("get", url, timeout=timeout, raise_for_status=True)
-        if resp is not None:
-            return resp.text
+        if self._http.prefer("ui") == "http":
+            resp = self._http_request("get", url, op="ui", timeout=timeout, raise_for_status=True)
+            if resp is not None:
+                return resp.text
 
-        return self._read_uipage_html_via_cli()
+        t0 = time.monotonic()
+        page_html = self._read_uipage_html_via_cli()
+        self._http.record("ui", "cli", time.monotonic() - t0)
+        return page_html
 
     def get_ui_page_html(self, timeout: float = 5.0) -> str:
         return self._get_uipage_html(timeout=timeout)
@@ -789,14 +1289,16 @@ class SSHMeter(sshkit.Client):
         return "minus", up_steps
 
     def get_diagnostics_state(self, timeout: float = 5.0) -> DiagPageState:
-        page_html = self._get_uipage_html(timeout=timeout)
+        return self._parse_diagnostics_state(self._get_uipage_html(timeout=timeout))
 
+    @classmethod
+    def _parse_diagnostics_state(cls, page_html: str) -> DiagPageState:
         title_match = re.search(
             r"<div[^>]*class\s*=\s*[\"']?diagtitle[\"']?[^>]*>\s*<div[^>]*>(.*?)</div>",
             page_html,
             flags=re.I | re.S,
         )
-        title = self._strip_html(title_match.group(1)) if title_match else ""
+        title = cls._strip_html(title_match.group(1)) if title_match else ""
         title = re.sub(r"\s*\[[^\]]*\]\s*", "", title).strip()
         title_segments = [segment.strip() for segment in title.split(":") if segment.strip()]
 
@@ -845,13 +1347,33 @@ class SSHMeter(sshkit.Client):
         press_delay: float = 0.15,
         settle_delay: float = 0.4,
         page_timeout: float = 5.0,
+        learned: bool = True,
     ) -> DiagPageState:
+        """
+        Navigate the diagnostics menus along `path`. With `reset_to_service` and a
+        learned menu graph for this firmware, the whole key sequence is sent in one
+        burst and only the final title is checked; otherwise (or if that check fails)
+        every page is read and the graph is learned/repaired along the way.
+        """
         steps: List[set[str]] = []
         for step in path:
             aliases = self._diag_step_aliases(step)
             if aliases:
                 steps.append(aliases)
 
+        graph_key = self._diag_graph_key() if reset_to_service and learned else None
+        if graph_key is not None:
+            state = self._goto_diagnostics_path_learned(
+                graph_key,
+                steps,
+                fetch_timeout=fetch_timeout,
+                press_delay=press_delay,
+                settle_delay=settle_delay,
+                page_timeout=page_timeout,
+            )
+            if state is not None:
+                return state
+
         if reset_to_service:
             self.force_diagnostics()
             time.sleep(settle_delay)
@@ -868,6 +1390,8 @@ class SSHMeter(sshkit.Client):
             raise RuntimeError(
                 f"Expected diagnostics home page after reset, found '{state['title']}'"
             )
+        if graph_key is not None:
+            diag_graph.learn_home(graph_key, state["title"])
 
         for target_aliases in steps:
             state = self.get_diagnostics_state(timeout=fetch_timeout)
@@ -892,6 +1416,13 @@ class SSHMeter(sshkit.Client):
 
             if state["selected_index"] is None:
                 raise RuntimeError(f"Unable to determine the selected diagnostics item on '{state['title']}'")
+            if graph_key is not None:
+                diag_graph.learn_page(
+                    graph_key,
+                    state["title"],
+                    [item["text"] for item in state["menu_items"]],
+                    state["selected_index"],
+                )
 
             target_index = min(
                 matching_indexes,
@@ -906,42 +1437,132 @@ class SSHMeter(sshkit.Client):
                 target_index,
                 len(state["menu_items"]),
             )
-            for _ in range(count):
-                self.press(button, delay=press_delay)
-
             previous_title = state["title"]
-            previous_selected = state["selected_index"]
-            self.press("ok", delay=press_delay)
-
-            deadline = time.time() + page_timeout
-            while True:
-                if time.time() > deadline:
-                    raise RuntimeError(
-                        f"Timed out opening diagnostics item matching {sorted(target_aliases)} "
-                        f"from '{previous_title}'"
-                    )
-
-                state = self.get_diagnostics_state(timeout=fetch_timeout)
-                title_changed = state["title"] != previous_title
-                selection_changed = state["selected_index"] != previous_selected
-
-                if state["title_segments"] and self._diag_matches(target_aliases, state["title_segments"][-1]):
-                    break
-                if title_changed or selection_changed:
-                    time.sleep(settle_delay)
-                else:
-                    time.sleep(settle_delay)
+            self.press_sequence([button] * count + ["ok"], inter_key_delay=press_delay)
+
+            def _opened(page_html: str, aliases=target_aliases) -> bool:
+                segments = self._parse_diagnostics_state(page_html)["title_segments"]
+                return bool(segments) and self._diag_matches(aliases, segments[-1])
+
+            opened_html = self.wait_for_ui_page(
+                _opened,
+                timeout=page_timeout,
+                poll_interval=settle_delay,
+                page_timeout=fetch_timeout,
+            )
+            if opened_html is None:
+                raise RuntimeError(
+                    f"Timed out opening diagnostics item matching {sorted(target_aliases)} "
+                    f"from '{previous_title}'"
+                )
+            if graph_key is not None:
+                diag_graph.learn_edge(
+                    graph_key,
+                    previous_title,
+                    state["menu_items"][target_index]["text"],
+                    self._parse_diagnostics_state(opened_html)["title"],
+                )
 
+        if graph_key is not None:
+            diag_graph.save()
         return self.get_diagnostics_state(timeout=fetch_timeout)
 
+    def _diag_graph_key(self) -> Optional[str]:
+        """Graph key from the already cached identity only; None (no learned path) rather than asking the meter mid-navigation."""
+        versions = self._system_versions_cache
+        if not self.__resolution or not versions or not versions.get("system_version"):
+            return None
+        # ms3 vs msx is decided from the firmware map, which must be cached too
+        if self.__resolution == "1024x768" and self._firmwares is None:
+            return None
+        return diag_graph.make_key(
+            self.get_meter_type(), versions["system_version"], versions.get("system_sub_version", "")
+        )
 
-    def press(self, button: str, value: Optional[str] = "1", delay: float = 0.1):
+    def _plan_diagnostics_burst(self, graph_key: str, steps: List[set[str]]) -> Optional[Tuple[List[str], List[str]]]:
         """
-        Sends a button press using user-friendly string. 
-        ** UK meters need a persistent connection for comamnds to work quickly. Otherwise you will see very slow button presses, etc.
-        Examples:
-            press('plus'), press('cancel'), press('1'), press('A'), press('Enter')
+        Resolve `steps` against the learned graph, starting from the service page.
+        Returns (keys, page titles visited) or None if any page/edge is unknown.
         """
+        title = diag_graph.home(graph_key)
+        if not title:
+            return None
+
+        keys: List[str] = []
+        visited = [title]
+        for aliases in steps:
+            if self._diag_matches(aliases, title.split(":")[-1]):
+                continue
+
+            page = diag_graph.page(graph_key, title)
+            if page is None or not page["items"]:
+                return None
+
+            items = page["items"]
+            entry = page["entry_index"]
+            matching_indexes = [index for index, text in enumerate(items) if self._diag_matches(aliases, text)]
+            if not matching_indexes:
+                return None
+
+            target_index = min(
+                matching_indexes,
+                key=lambda index: min((index - entry) % len(items), (entry - index) % len(items)),
+            )
+            child = page["children"].get(items[target_index])
+            if not child:
+                return None
+
+            button, count = self._menu_move(entry, target_index, len(items))
+            keys.extend([button] * count)
+            keys.append("ok")
+            title = child
+            visited.append(title)
+
+        return keys, visited
+
+    def _goto_diagnostics_path_learned(
+        self,
+        graph_key: str,
+        steps: List[set[str]],
+        *,
+        fetch_timeout: float,
+        press_delay: float,
+        settle_delay: float,
+        page_timeout: float,
+    ) -> Optional[DiagPageState]:
+        """One-burst navigation from the learned graph. Returns None when the caller should walk instead."""
+        plan = self._plan_diagnostics_burst(graph_key, steps)
+        if plan is None:
+            return None
+        keys, visited = plan
+
+        self.force_diagnostics()
+        time.sleep(settle_delay)
+        self.press_sequence(keys, inter_key_delay=press_delay)
+
+        final_aliases = steps[-1] if steps else self._diag_step_aliases("service")
+
+        def _arrived(page_html: str) -> bool:
+            segments = self._parse_diagnostics_state(page_html)["title_segments"]
+            return bool(segments) and self._diag_matches(final_aliases, segments[-1])
+
+        page_html = self.wait_for_ui_page(
+            _arrived,
+            timeout=page_timeout,
+            poll_interval=settle_delay,
+            page_timeout=fetch_timeout,
+        )
+        if page_html is None:
+            # layout moved (or entry selection is remembered); relearn these pages on the walk
+            diag_graph.forget(graph_key, visited)
+            diag_graph.save()
+            return None
+        return self._parse_diagnostics_state(page_html)
+
+
+    @staticmethod
+    def _resolve_key(button: str) -> str:
+        """ Map a user-friendly button label to its busdev key name """
         label_map = {
             "+": "plus",
             "-": "minus",
@@ -987,19 +1608,66 @@ class SSHMeter(sshkit.Client):
             key = f"a{b.upper()}"
         else:
             key = b
+        return key
 
+    def press(self, button: str, value: Optional[str] = "1", delay: float = 0.1):
+        """
+        Sends a button press using user-friendly string. 
+        ** UK meters need a persistent connection for comamnds to work quickly. Otherwise you will see very slow button presses, etc.
+        Examples:
+            press('plus'), press('cancel'), press('1'), press('A'), press('Enter')
+        """
+        key = self._resolve_key(button)
         data = {key: "" if value is None else str(value)}
         url = f"http://{self.host}:8005/web/busdev.php"
 
-        resp = self._http_request("post", url, data=data, timeout=0.75)
+        resp = None
+        if self._http.prefer("press") == "http":
+            resp = self._http_request("post", url, op="press", data=data, timeout=0.75)
         if resp is not None:
             time.sleep(delay)
         else:
-            resp = self._send_key_press_cli(key, delay=delay)
+            t0 = time.monotonic()
+            resp = self._send_key_press_cli(key, delay=0)
+            self._http.record("press", "cli", time.monotonic() - t0)
+            time.sleep(delay)
 
         return resp
 
 
+    def press_sequence(self, buttons: Sequence[str], inter_key_delay: float = 0.15,
+                       delay: Optional[float] = None) -> None:
+        """
+        Press several buttons in one round trip; the meter paces them `inter_key_delay` apart.
+        Waits `delay` (default: inter_key_delay) after the last key, like press().
+        Examples:
+            press_sequence(['diagnostics', 'minus', 'minus', 'ok'], inter_key_delay=0.2)
+        """
+        keys = [self._resolve_key(button) for button in buttons]
+        settle = inter_key_delay if delay is None else delay
+        if not keys:
+            return
+
+        packets = [self._busdev_key_hex(key) for key in keys]
+        if len(keys) == 1 or None in packets:
+            # keys without a UDP packet only exist as busdev.php form fields
+            for i, button in enumerate(buttons):
+                self.press(button, delay=settle if i == len(buttons) - 1 else inter_key_delay)
+            return
+
+        packets = [BUSDEV_KEY_PACKET_PREFIX + key_hex for key_hex in packets]
+        ok, _ = self._agent_call("send_udp_sequence", packets, port=8002, interval=inter_key_delay)
+        if not ok:
+            pause_us = int(max(0.0, inter_key_delay) * 1_000_000)
+            pause = f"usleep {pause_us} 2>/dev/null || sleep {max(0.0, inter_key_delay):g}"
+            command = f"; {pause}; ".join(
+                self._udp_packet_hex_command(p, port=8002, send_only=True) for p in packets
+            )
+            out, err = self._cli_full(command, priority="interactive")
+            if err and not out:
+                raise RuntimeError(err)
+        time.sleep(settle)
+
     @staticmethod
     def _norm_key(s: str) -> str:
         """ Normalize keys like "Mod. Func" -> "mod_func", "PCB #" -> "pcb_number" """
@@ -1066,13 +1734,16 @@ class SSHMeter(sshkit.Client):
         Assumes we are on the IPSBus Modules page; iterates every module and
         returns { module_name: details_dict_with_all_fields }.
         """
-        def _fetch_html() -> str:
-            return self._get_uipage_html(timeout=timeout)
+        def _module_name(page_html: str) -> Optional[str]:
+            try:
+                return self._extract_detail_dict(page_html)[0]
+            except Exception:
+                return None
 
         results: Dict[str, Dict[str, str]] = {}
 
         try:
-            html = _fetch_html()
+            html = self._get_uipage_html(timeout=timeout)
             mod, d = self._extract_detail_dict(html)
             results[mod] = d
             if verbose: print(f"[details] {mod}: keys={sorted(d.keys())}")
@@ -1081,10 +1752,18 @@ class SSHMeter(sshkit.Client):
             return results
 
         for _ in range(max_modules - 1):
-            self.press('2')
-            time.sleep(delay)
+            previous = mod
+            self.press('2', delay=0)
             try:
-                html = _fetch_html()
+                # the clock line ticks too, so wait for the module itself to change
+                html = self.wait_for_ui_page(
+                    lambda page_html: _module_name(page_html) not in (None, previous),
+                    timeout=max(delay * 4, 1.0),
+                    poll_interval=delay,
+                    page_timeout=timeout,
+                )
+                if html is None:
+                    html = self._get_uipage_html(timeout=timeout)
                 mod, d = self._extract_detail_dict(html)
             except Exception as e:
                 if verbose: print(f"[details] parse after next failed: {e}")
@@ -1098,18 +1777,48 @@ class SSHMeter(sshkit.Client):
 
         return results
 
+    def _read_module_details_on_meter(self, *, delay: float = 0.3, max_modules: int = 32,
+                                      verbose: bool = False) -> Dict[str, Dict[str, str]]:
+        """
+        Same result as _iterate_module_details_on_page, but the paging runs on the
+        meter and every module page comes back in a single command.
+        """
+        prelude = (
+            f"$path = {json.dumps(REMOTE_UI_HTML_PATH)};"
+            f"$key = {json.dumps(BUSDEV_KEY_PACKET_PREFIX + self._busdev_key_hex('n2'))};"
+            f"$max = {int(max_modules)};"
+            f"$wait = {max(delay * 4, 1.0)};"
+        )
+        # takes seconds; keep the interactive slot free for key presses and UI reads
+        out, err = self._cli_full(f"php -r {shlex.quote(prelude + MODULE_INVENTORY_PHP)}", priority="bulk")
+        if not out:
+            raise RuntimeError(err or "module inventory returned nothing")
+
+        results: Dict[str, Dict[str, str]] = {}
+        for block in json.loads(out):
+            mod, d = self._extract_detail_dict(block)
+            if mod in results:
+                break
+            results[mod] = d
+            if verbose: print(f"[details] {mod}: keys={sorted(d.keys())}")
+        return results
+
+    def _collect_module_details(self, *, delay: float = 0.3, timeout: float = 5.0,
+                                verbose: bool = False) -> Dict[str, Dict[str, str]]:
+        """Read the IPSBus module list in one pass, paging from here only if that fails."""
+        try:
+            details = self._read_module_details_on_meter(delay=delay, verbose=verbose)
+            if details:
+                return details
+        except Exception as e:
+            if verbose: print(f"[details] on-meter inventory failed: {e}")
+        return self._iterate_module_details_on_page(delay=delay, timeout=timeout, verbose=verbose)
+
     def get_power_info(self):
         self.status = "busy"
         try:
-            if self.in_diagnostics():
-                self.press('diagnostics'); self.press('diagnostics')
-            else:
-                self.press('diagnostics')
-            
-            self.press('minus'); time.sleep(0.1)
-            self.press('minus'); time.sleep(0.1)
-            self.press('minus'); time.sleep(0.1)
-            self.press('ok'); time.sleep(0.1)
+            keys = ['diagnostics', 'diagnostics'] if self.in_diagnostics() else ['diagnostics']
+            self.press_sequence(keys + ['minus', 'minus', 'minus', 'ok'], inter_key_delay=0.2)
 
             time.sleep(0.5)
             page_html = self._get_uipage_html(timeout=0.5)
@@ -1141,31 +1850,21 @@ class SSHMeter(sshkit.Client):
 
         self.status = "busy"
         try:
-            if self.in_diagnostics():
-                self.press('diagnostics'); self.press('diagnostics')
-            else:
-                self.press('diagnostics')
-            self.press('minus'); time.sleep(0.1)
-            self.press('minus'); time.sleep(0.1)
-            self.press('ok'); time.sleep(0.1)
+            keys = ['diagnostics', 'diagnostics'] if self.in_diagnostics() else ['diagnostics']
+            self.press_sequence(keys + ['minus', 'minus', 'ok'], inter_key_delay=0.2)
             time.sleep(0.5)
 
-            details = self._iterate_module_details_on_page(delay=delay, timeout=timeout, verbose=verbose)
+            details = self._collect_module_details(delay=delay, timeout=timeout, verbose=verbose)
 
             if not details:
                 if verbose: print(f'details empty, retrying once')
                 time.sleep(0.5)
 
-                if self.in_diagnostics():
-                    self.press('diagnostics'); self.press('diagnostics')
-                else:
-                    self.press('diagnostics')
-                self.press('minus'); time.sleep(0.1)
-                self.press('minus'); time.sleep(0.1)
-                self.press('ok'); time.sleep(0.1)
+                keys = ['diagnostics', 'diagnostics'] if self.in_diagnostics() else ['diagnostics']
+                self.press_sequence(keys + ['minus', 'minus', 'ok'], inter_key_delay=0.2)
                 time.sleep(1)
 
-                details = self._iterate_module_details_on_page(delay=delay, timeout=timeout, verbose=verbose)
+                details = self._collect_module_details(delay=delay, timeout=timeout, verbose=verbose)
         finally:
             self.status = "ready"
 
@@ -1309,12 +2008,17 @@ class SSHMeter(sshkit.Client):
         # cmd = "; ".join(seq)
         # _, out, err = self.safe_exec_command(cmd)
         
+        if not interval or count <= 1:
+            ok, _ = self._agent_call("send_udp", BEEP_PACKET_HEX, port=8002, count=max(1, count))
+            if ok:
+                return
+
         cmd = 'printf "\\x00\\x01\\x02\\x00\\x00\\x54\\x00\\x00\\x3e\\x08\\x00\\x00\\x00\\x00\\x00\\x00" | socat - udp-send:127.0.0.1:8002 &'
         send = f"bash -c 'for i in {{1..{count}}}; do {cmd} done'"
         if interval: send = "&".join(f"(sleep {i*interval}; {cmd})" for i in range(count))+" & wait"
         _, out, err = self.safe_exec_command(send)
 
-    def _fire_and_forget(self, inner: str) -> None:
+    def _fire_and_forget(self, inner: str, priority: ChannelPriority = "normal") -> None:
         """
         Run a command on the meter fully detached so SSH can return immediately.
         Uses nohup if available; falls back to plain sh.
@@ -1325,7 +2029,7 @@ class SSHMeter(sshkit.Client):
             f"(nohup sh -c {quoted_inner} >/dev/null 2>&1 || "
             f"sh -c {quoted_inner} >/dev/null 2>&1) &"
         )
-        self.safe_exec_command(wrapped)
+        self.safe_exec_command(wrapped, priority=priority)
 
     def is_booting(self):
         try:
@@ -1435,7 +2139,7 @@ fclose($myfile);
         msg  = re.sub(r'\n[ \t]+', '\n', msg)
         url = f"http://{self.host}:8005/web/control_print_direct.php"
         files = {"fileToUpload": ("hello.txt", msg, "text/plain")}
-        resp = self._http_request("post", url, files=files, timeout=1)
+        resp = self._http_request("post", url, op="print", files=files, timeout=1)
         if resp is not None:
             return
 
@@ -1531,11 +2235,18 @@ fclose($myfile);
             except: pass
 
     def get_brightness(self):
+        ok, data = self._agent_call("read_file", "/sys/class/backlight/backlight/actual_brightness")
+        if ok and data is not None:
+            return int(data)
         res = self.cli("cat /sys/class/backlight/backlight/actual_brightness")
         return int(res)
     
     def set_brightness(self, val:int):
-        res = self.cli(f"echo {max(0,min(val,100))} > /sys/class/backlight/backlight/brightness")
+        level = max(0, min(val, 100))
+        ok, _ = self._agent_call("write_file", "/sys/class/backlight/backlight/brightness", f"{level}\n".encode())
+        if ok:
+            return ""
+        res = self.cli(f"echo {level} > /sys/class/backlight/backlight/brightness")
         return res
 
     def insert_coin(self, value: int, delay: float = 0.1):
@@ -1580,8 +2291,10 @@ fclose($myfile);
             f"\\x{compact[index:index + 2]}"
             for index in range(0, len(compact), 2)
         )
-        cmd = f"printf '%b' '{escaped}' | socat -u - udp-send:127.0.0.1:8002"
-        self.cli(cmd)
+        ok, _ = self._agent_call("send_udp", compact, port=8002)
+        if not ok:
+            cmd = f"printf '%b' '{escaped}' | socat -u - udp-send:127.0.0.1:8002"
+            self.cli(cmd)
         time.sleep(delay)
 
     @staticmethod
@@ -1671,37 +2384,24 @@ fclose($myfile);
         self.force_diagnostics()
 
     def setup_custom_display(self) -> None:
-        """Automate uploading/writing UIPage.php, ui_overlay.json, and type-specific Charuco PNG."""
+        """Sync UIPage.php, ui_overlay.json and the type-specific Charuco PNG; only changed files are sent."""
         if self.status != "ready":
             raise RuntimeError("Meter is not ready")
 
         meter_type = self.meter_type
         print(f"[setup_custom_display] host={self.host} status={self.status} connected={self.connected} meter_type={meter_type}")
 
-        if is_custom_display_current(self):
+        ## Apriltag isn't currently used in the system; pass include_apriltag=True to sync it too
+        changed = stale_assets(self, custom_display_assets(self))
+        if not changed:
             # print(f"[setup_custom_display] display already current, forcing diagnostics refresh then returning")
             self.force_diagnostics()
             return
 
         self.status = "busy"
         try:
-            # print(f"[setup_custom_display] uploading assets ({meter_type})")
-            write_ui_page(self)
-            write_ui_overlay(self)
-            
-            local_charuco = CHARUCO_PATHS.get(meter_type)
-            if not local_charuco:
-                raise ValueError(f"No Charuco path defined for meter_type: {meter_type}")
-            if not os.path.exists(local_charuco):
-                raise FileNotFoundError(f"Local Charuco file not found: {local_charuco}")
-            upload_image(self, local_charuco, "charuco")
-
-            ## Apriltag isn't currently used in the system so we can skip it for now, but leaving the code here in case we want to add it back in later
-            # local_apriltag = get_apriltag_path(self)
-            # if not os.path.exists(local_apriltag):
-            #     raise FileNotFoundError(f"Local Apriltag file not found: {local_apriltag}")
-            # upload_image(self, local_apriltag, "apriltag")
-
+            # print(f"[setup_custom_display] uploading assets ({meter_type}): {sorted(changed)}")
+            push_files(self, changed)
             print(f"[setup_custom_dsplay] done for {self.host}")
         finally:
             self.status = "ready"
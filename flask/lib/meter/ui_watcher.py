@@ -0,0 +1,189 @@
+import shlex
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+
+# Runs on the meter for the lifetime of the watch channel. Every time the UI file
+# is rewritten it emits "@@UI <nbytes>\n" followed by exactly <nbytes> of page.
+# A missing file is reported as "@@UI -1\n". inotifywait is used when present,
+# otherwise the file is re-hashed on a tight loop. Heartbeat lines make the loop
+# die on SIGPIPE once the channel is gone, since no signal reaches a non-pty session.
+# With inotifywait the heartbeats go through the reader loop (the only writer to
+# stdout, so they never land inside a page); once that loop is gone the feeder's
+# next heartbeat fails and it kills inotifywait.
+WATCH_SH = r'''
+f=%(path)s
+tmp=/tmp/.ui_watch.$$
+trap 'rm -f "$tmp"' EXIT
+emit() {
+    if cp "$f" "$tmp" 2>/dev/null; then
+        echo "@@UI $(wc -c < "$tmp")"; cat "$tmp"
+    else
+        echo "@@UI -1"
+    fi
+}
+emit
+if command -v inotifywait >/dev/null 2>&1; then
+    base=$(basename "$f")
+    {
+        # EPIPE instead of SIGPIPE, so the feeder lives to clean up inotifywait
+        trap '' PIPE
+        inotifywait -m -q -e close_write,moved_to,create --format '%%f' "$(dirname "$f")" &
+        while echo "@@HB" 2>/dev/null; do sleep 1; done
+        kill $! 2>/dev/null
+    } |
+    while read -r name; do
+        if [ "$name" = "@@HB" ]; then echo "@@HB"; elif [ "$name" = "$base" ]; then emit; fi
+    done
+else
+    last=$(md5sum "$f" 2>/dev/null)
+    n=0
+    while :; do
+        usleep %(poll_us)d 2>/dev/null || sleep 1
+        cur=$(md5sum "$f" 2>/dev/null)
+        [ "$cur" != "$last" ] && { last=$cur; emit; }
+        n=$((n + 1)); [ $((n %% 20)) -eq 0 ] && echo "@@HB"
+    done
+fi
+'''
+
+
+class UIWatcher:
+    """
+    Streams changes of one meter's UI page over a single SSH exec channel and
+    keeps the latest page in memory with a monotonically increasing version.
+    Versions only advance when the page content actually changes.
+    """
+    START_TIMEOUT = 5.0
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, transport, path: str, host: str = "", version: int = 0):
+        self.transport = transport
+        self.path = path
+        self.host = host
+        self.channel = None
+        # continue from the caller's last seen version so old `since` values stay valid
+        self.version = version
+        self.html: Optional[str] = None
+        self.events = 0
+        self.started_at: Optional[float] = None
+        self.changed_at: Optional[float] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._alive = False
+
+    @property
+    def alive(self) -> bool:
+        channel = self.channel
+        return bool(self._alive and channel is not None and not channel.closed)
+
+    def start(self) -> None:
+        """Open the watch channel and wait for the first page snapshot."""
+        if self.transport is None or not self.transport.is_active():
+            raise RuntimeError(f"{self.host} has no active SSH transport")
+
+        script = WATCH_SH % {
+            "path": shlex.quote(self.path),
+            "poll_us": int(self.POLL_INTERVAL * 1_000_000),
+        }
+        channel = self.transport.open_session()
+        channel.exec_command(f"sh -c {shlex.quote(script)}")
+        self.channel = channel
+        self._alive = True
+        self._thread = threading.Thread(target=self._run, name=f"ui-watch-{self.host}", daemon=True)
+        self._thread.start()
+
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.events or not self._alive, timeout=self.START_TIMEOUT):
+                self.close()
+                raise TimeoutError(f"{self.host} UI watcher sent no initial page")
+        if not self._alive:
+            raise RuntimeError(f"{self.host} UI watcher exited during startup")
+        self.started_at = time.monotonic()
+
+    def close(self) -> None:
+        channel, self.channel = self.channel, None
+        with self._cond:
+            self._alive = False
+            self._cond.notify_all()
+        if channel is not None:
+            try:
+                channel.close()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        channel = self.channel
+        buf = bytearray()
+        need: Optional[int] = None
+        try:
+            while True:
+                chunk = channel.recv(65536)
+                if not chunk:
+                    break
+                buf.extend(chunk)
+                while True:
+                    if need is None:
+                        newline = buf.find(b"\n")
+                        if newline < 0:
+                            break
+                        header = bytes(buf[:newline]).strip()
+                        del buf[:newline + 1]
+                        if not header.startswith(b"@@UI "):
+                            continue
+                        size = int(header[5:])
+                        if size < 0:
+                            self._publish(None)
+                            continue
+                        need = size
+                    if len(buf) < need:
+                        break
+                    body = bytes(buf[:need])
+                    del buf[:need]
+                    need = None
+                    self._publish(body.decode(errors="replace").strip())
+        except Exception:
+            pass
+        finally:
+            with self._cond:
+                self._alive = False
+                self._cond.notify_all()
+
+    def _publish(self, html: Optional[str]) -> None:
+        with self._cond:
+            self.events += 1
+            if html != self.html or self.events == 1:
+                self.html = html
+                self.version += 1
+                self.changed_at = time.monotonic()
+            self._cond.notify_all()
+
+    def snapshot(self) -> Tuple[int, Optional[str]]:
+        with self._cond:
+            return self.version, self.html
+
+    def wait_for_change(self, since_version: Optional[int], timeout: float) -> Tuple[int, Optional[str]]:
+        """
+        Block until the version moves past `since_version` (None returns at once),
+        the timeout expires or the watcher dies. Returns the current (version, html).
+        """
+        with self._cond:
+            if since_version is not None:
+                self._cond.wait_for(
+                    lambda: self.version > since_version or not self._alive,
+                    timeout=max(0.0, timeout),
+                )
+            return self.version, self.html
+
+    def wait_for(self, predicate: Callable[[str], bool], timeout: float) -> Optional[str]:
+        """Return the first page (current or future) matching `predicate`, or None on timeout."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        version, html = self.snapshot()
+        while True:
+            if html is not None and predicate(html):
+                return html
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.alive:
+                return None
+            version, html = self.wait_for_change(version, remaining)
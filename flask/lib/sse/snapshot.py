@@ -0,0 +1,66 @@
+import copy
+import threading
+from typing import Any, Dict, Tuple
+
+from lib.sse.sse_queue_manager import SSEQM, SSEPayload
+
+
+class SSESnapshot:
+    """
+    Current station state as the clients know it, kept up to date from the
+    broadcasts themselves (SSEQM observer): "state" keys, and per meter the last
+    "meter" payload (with the get_info() it was connected with) plus its latest
+    "status" and "devices". Reading it never talks to a meter.
+
+    `seq` is the id of the last broadcast applied, so a snapshot taken at seq N
+    plus an SSE stream resumed with Last-Event-ID N is the whole picture.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.states: Dict[str, Any] = {}
+        self.meters: Dict[str, Dict[str, Any]] = {}
+
+    def seed_states(self, states: Dict[str, Any]):
+        """States set before anything was broadcast; later broadcasts win."""
+        with self.lock:
+            for k, v in states.items():
+                self.states.setdefault(k, copy.deepcopy(v))
+
+    def _meter(self, ip: str) -> Dict[str, Any]:
+        meter = self.meters.get(ip)
+        if meter is None:
+            meter = self.meters[ip] = {"ip": ip, "alive": True, "info": None}
+        return meter
+
+    def apply(self, seq: int, payload: SSEPayload):
+        event = payload.get("event")
+        data = payload.get("payload")
+        if not isinstance(data, dict):
+            return
+        with self.lock:
+            self.seq = seq
+            if event == "state" and "key" in data:
+                # values are often the live (mutable) lists from `states`
+                self.states[data["key"]] = copy.deepcopy(data.get("value"))
+            elif "ip" not in data:
+                return
+            elif event == "meter":
+                meter = self._meter(data["ip"])
+                meter["alive"] = data.get("alive", True)
+                if data.get("info") is not None:
+                    meter["info"] = data["info"]
+            elif event == "status":
+                self._meter(data["ip"])["status"] = {k: v for k, v in data.items() if k != "ip"}
+            elif event == "devices":
+                self._meter(data["ip"])["devices"] = data.get("results")
+
+    def get(self) -> Tuple[int, Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """(seq, states, meters), copied so the caller can encode without the lock."""
+        with self.lock:
+            return self.seq, dict(self.states), {ip: dict(m) for ip, m in self.meters.items()}
+
+
+SNAPSHOT = SSESnapshot()
+SSEQM.observe(SNAPSHOT.apply)
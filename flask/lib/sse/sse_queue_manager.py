@@ -1,8 +1,9 @@
 from lib.utils import secrets
-from typing import Any, Optional, TypedDict, List
+from typing import Any, Dict, Literal, Optional, Tuple, TypedDict, List
 from collections import deque
 import json
 import threading
+import time
 
 
 # Typed payload
@@ -24,59 +25,407 @@ def sse_payload(event: str, payload: Any) -> SSEPayload:
     return {"event": event, "payload": payload}
 
 
-def dump_sse_payload(payload: SSEPayload):
+def dump_sse_payload(payload: SSEPayload, id: Optional[str] = None):
+    if id is not None:
+        return f"id: {id}\ndata: {json.dumps(payload)}\n\n"
     return f"data: {json.dumps(payload)}\n\n"
 
 
-# Thread-safe queue for a single client
+# event ids are "<boot>-<seq>": seq only grows within one server run, and an id
+# from a previous run is recognised as such (the client gets a full snapshot)
+BOOT_ID = format(int(time.time()), "x")
+
+
+def event_id(seq: int) -> str:
+    return f"{BOOT_ID}-{seq}"
+
+
+def parse_event_id(last_event_id: Optional[str]) -> Optional[int]:
+    """Sequence number of a Last-Event-ID from this server run, else None."""
+    boot, _, seq = (last_event_id or "").strip().partition("-")
+    if boot != BOOT_ID or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def coalesce_key(payload: SSEPayload) -> str:
+    """What a newer message replaces under the "coalesce" policy: same event, and same payload key if it has one."""
+    data = payload.get("payload")
+    if isinstance(data, dict):
+        for field in ("key", "ip"):
+            if field in data:
+                return f"{payload.get('event')}:{data[field]}"
+    return str(payload.get("event"))
+
+
+Overflow = Literal["drop_oldest", "coalesce", "disconnect"]
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+KEEP_ALIVE = ": keep-alive\n\n"
+
+
+# Thread-safe, bounded queue for a single client
 class SSEQueue:
-    def __init__(self):
-        self.queue = deque()
+    """
+    Holds already-encoded messages (the same str object for every client) as
+    (coalesce key, text). When `maxsize` is reached the overflow policy decides:
+      drop_oldest  the oldest queued message goes
+      coalesce     an older queued message with the same key goes, else the oldest
+      disconnect   the client is closed; its stream ends and it reconnects fresh
+    """
+    def __init__(self, maxsize: Optional[int] = None, overflow: Optional[Overflow] = None):
+        self.maxsize = maxsize or secrets.SSE_QUEUE_MAX
+        self.overflow = overflow or secrets.SSE_OVERFLOW
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(self.overflow)
+        self.queue: deque[Tuple[str, str]] = deque()
         self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.sent = 0
+        self.created = time.time()
+        self.last_pop = self.created
 
     def add_payload(self, payload: SSEPayload):
-        # msg = f"data: {json.dumps(payload)}\n\n"
+        self.add_message(dump_sse_payload(payload), coalesce_key(payload))
+
+    def add_message(self, msg: str, key: str = "") -> bool:
+        """Queue an encoded message. False once the client is closed."""
         with self.cond:
-            self.queue.append(dump_sse_payload(payload))
+            if self.closed:
+                return False
+            if len(self.queue) >= self.maxsize:
+                if self.overflow == "disconnect":
+                    self.dropped += 1 + len(self.queue)
+                    self._close()
+                    return False
+                self._make_room(key)
+            self.queue.append((key, msg))
             self.cond.notify()  # wake any waiting generator
+            return True
 
-    def pop_payload(self) -> str:
+    def _make_room(self, key: str):
+        self.dropped += 1
+        if self.overflow == "coalesce":
+            for i, (k, _) in enumerate(self.queue):
+                if k == key:
+                    del self.queue[i]
+                    return
+        self.queue.popleft()
+
+    def _close(self):
+        self.closed = True
+        self.queue.clear()
+        self.cond.notify_all()
+
+    def close(self):
+        with self.cond:
+            self._close()
+
+    def stalled(self, now: float, after: float) -> bool:
+        """Full and not read from for `after` seconds: the client is gone or not keeping up."""
+        return len(self.queue) >= self.maxsize and now - self.last_pop > after
+
+    def pop_payload(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Next message; KEEP_ALIVE if nothing came within `timeout` (the write is
+        what tells the server a client went away), None once closed.
+        """
+        with self.cond:
+            if not self.queue and not self.closed:
+                self.cond.wait(timeout)  # block until a message is available
+            self.last_pop = time.time()
+            if self.closed:
+                return None
+            if not self.queue:
+                return KEEP_ALIVE
+            self.sent += 1
+            return self.queue.popleft()[1]
+
+
+class StateCoalescer:
+    """
+    Sits in front of SSEQM for "state" key payloads. Within a frame window only
+    the last value per key is kept; the window is flushed by a timer thread, so
+    a belt move that flips mds/bayGuess/motors many times in a few ms reaches the
+    clients as one frame per key. Keys in `bypass` (emergency) and every other
+    event go through send_now(), which sends them at once but after whatever was
+    pending, so clients never see a state older than an event that followed it.
+    """
+    def __init__(self, send, window_s: float, bypass=()):
+        self.send = send
+        self.window_s = window_s
+        self.bypass = set(bypass)
+        self.pending: Dict[str, SSEPayload] = {}
+        self.since = 0.0
+        self.cond = threading.Condition()
+        self.send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.offered = 0
+        self.coalesced = 0
+        self.flushes = 0
+
+    def offer(self, payload: SSEPayload) -> bool:
+        """Take a state payload. False when it is not coalesced and must go through send_now()."""
+        data = payload.get("payload")
+        if self.window_s <= 0 or not isinstance(data, dict) or "key" not in data:
+            return False
+        key = data["key"]
+        if key in self.bypass:
+            return False
         with self.cond:
-            while not self.queue:
-                self.cond.wait()  # block until a message is available
-            return self.queue.popleft()
+            self.offered += 1
+            if key in self.pending:
+                self.coalesced += 1
+            elif not self.pending:
+                self.since = time.monotonic()
+                self._ensure_thread()
+                self.cond.notify()
+            self.pending[key] = payload
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="sse-state-coalescer", daemon=True)
+            self._thread.start()
+
+    def _take(self) -> List[SSEPayload]:
+        batch = list(self.pending.values())
+        self.pending.clear()
+        return batch
+
+    def flush(self):
+        """Send whatever is pending now."""
+        with self.send_lock:
+            with self.cond:
+                batch = self._take()
+            self._send(batch)
+
+    def send_now(self, payload: SSEPayload):
+        """Send a payload that is not coalesced, behind anything pending or being flushed."""
+        if self.window_s <= 0 and not self.pending:
+            self.send(payload)
+            return
+        with self.send_lock:
+            with self.cond:
+                batch = self._take()
+            self._send(batch)
+            self.send(payload)
+
+    def _send(self, batch: List[SSEPayload]):
+        if batch:
+            self.flushes += 1
+        for payload in batch:
+            try:
+                self.send(payload)
+            except Exception as e:
+                print(f"[StateCoalescer] send failed: {e}")
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                delay = self.since + self.window_s - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": round(self.window_s * 1000),
+            "bypass": sorted(self.bypass),
+            "offered": self.offered,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "pending": len(self.pending),
+        }
 
 
 class SSEQM:
     queues: list["SSEQueue"] = []
     verbose: bool = False
+    coalescer: "StateCoalescer"  # set below the class
+    lock = threading.Lock()
+    KEEP_ALIVE_S = 15.0
+    # a full queue nobody has read for this long belongs to a dead client
+    STALE_S = 60.0
+    # reconnect delay sent to EventSource clients
+    RETRY_MS = 3000
+    # set by a thread-pool server: each stream holds a worker, so streams beyond
+    # this are told to retry later instead of taking the threads the API needs
+    max_clients: Optional[int] = None
+    closing = False
+
+    # last REPLAY_MAX broadcasts as (seq, encoded message), for clients resuming with Last-Event-ID
+    ring: deque[Tuple[int, str]] = deque(maxlen=secrets.SSE_REPLAY_MAX)
+    last_seq = 0
+
+    # called as fn(seq, payload) for every broadcast, under the lock; keep them cheap
+    observers: list = []
+
+    broadcasts = 0
+    refused = 0
+    resumes = 0
+    snapshots = 0
+    reaped = 0
+    # dropped counts of clients that are gone
+    dropped_gone = 0
 
     @classmethod
     def append(cls, q: SSEQueue):
-        cls.queues.append(q)
+        with cls.lock:
+            cls.queues = cls.queues + [q]
 
     @classmethod
     def remove(cls, q: SSEQueue):
-        cls.queues.remove(q)
+        with cls.lock:
+            if q in cls.queues:
+                cls.queues = [x for x in cls.queues if x is not q]
+                cls.dropped_gone += q.dropped
+
+    @classmethod
+    def observe(cls, fn):
+        with cls.lock:
+            cls.observers = cls.observers + [fn]
+
+    @classmethod
+    def subscribe(cls, last_event_id: Optional[str] = None) -> Tuple[SSEQueue, Optional[List[str]], str]:
+        """
+        Register a new client queue. Returns the queue, the messages it missed
+        since `last_event_id` (None when that id is unknown or has fallen out of
+        the ring, i.e. the client needs a full snapshot) and the current event id.
+        Taken under the broadcast lock, so nothing is missed or sent twice.
+        """
+        q = SSEQueue()
+        seq = parse_event_id(last_event_id)
+        with cls.lock:
+            missed = None
+            if seq is not None and seq <= cls.last_seq:
+                oldest = cls.ring[0][0] if cls.ring else cls.last_seq + 1
+                if seq >= oldest - 1:
+                    missed = [msg for s, msg in cls.ring if s > seq]
+            cls.queues = cls.queues + [q]
+            current = event_id(cls.last_seq)
+        if missed is None:
+            cls.snapshots += 1
+        else:
+            cls.resumes += 1
+        return q, missed, current
 
     @classmethod
     def broadcast_payload(cls, payload: SSEPayload):
+        key = coalesce_key(payload)
+        now = time.time()
+        dead = []
+        with cls.lock:
+            # numbered, encoded once and queued in one step so every client sees the same order
+            cls.last_seq += 1
+            cls.broadcasts += 1
+            msg = dump_sse_payload(payload, event_id(cls.last_seq))
+            cls.ring.append((cls.last_seq, msg))
+            for fn in cls.observers:
+                try:
+                    fn(cls.last_seq, payload)
+                except Exception as e:
+                    print(f"[SSEQM] observer failed: {e}")
+            for q in cls.queues:
+                if not q.add_message(msg, key) or q.stalled(now, cls.STALE_S):
+                    dead.append(q)
+        for q in dead:
+            cls.reap(q)
+
+    @classmethod
+    def reap(cls, q: SSEQueue):
+        q.close()
+        cls.remove(q)
+        cls.reaped += 1
+        if cls.verbose:
+            print(f"[SSEQM] dropped client after {q.sent} sent / {q.dropped} dropped")
+
+    @classmethod
+    def accepting(cls) -> bool:
+        if cls.closing:
+            return False
+        return cls.max_clients is None or len(cls.queues) < cls.max_clients
+
+    @classmethod
+    def close_all(cls):
+        """Server shutdown: every blocked stream wakes up and ends, and no new ones start."""
+        cls.closing = True
         for q in cls.queues:
-            q.add_payload(payload)
+            q.close()
 
     @classmethod
     def broadcast(cls, event: str, payload: Any):
         # if event != "keep-alive" and cls.verbose:
         #     print(f"[DEBUG] broadcast(event={event}, payload={payload})")
-        cls.broadcast_payload(sse_payload(event, payload))
+        msg = sse_payload(event, payload)
+        if event == "state" and cls.coalescer.offer(msg):
+            return
+        cls.coalescer.send_now(msg)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        queues = cls.queues
+        now = time.time()
+        return {
+            "clients": len(queues),
+            "max_clients": cls.max_clients,
+            "refused": cls.refused,
+            "broadcasts": cls.broadcasts,
+            "last_id": event_id(cls.last_seq),
+            "ring": len(cls.ring),
+            "resumes": cls.resumes,
+            "snapshots": cls.snapshots,
+            "reaped": cls.reaped,
+            "dropped": cls.dropped_gone + sum(q.dropped for q in queues),
+            "maxsize": secrets.SSE_QUEUE_MAX,
+            "overflow": secrets.SSE_OVERFLOW,
+            "state": cls.coalescer.stats(),
+            "queues": [{
+                "depth": len(q.queue),
+                "sent": q.sent,
+                "dropped": q.dropped,
+                "age_s": round(now - q.created, 1),
+                "idle_s": round(now - q.last_pop, 1),
+            } for q in queues],
+        }
 
 
-def event_stream():
-    queue = SSEQueue()
-    SSEQM.append(queue)
+def event_stream(last_event_id: Optional[str] = None, snapshot=None):
+    """
+    A client's stream. A client resuming with a Last-Event-ID still in the ring
+    gets just what it missed; anyone else gets `snapshot(current_id)` (encoded
+    messages carrying the current id) first, if one is given.
+
+    It never blocks longer than KEEP_ALIVE_S, so the worker thread it runs on
+    notices a gone client or a shutdown (close_all) within that time.
+    """
+    retry = f"retry: {SSEQM.RETRY_MS}\n\n"
+    if not SSEQM.accepting():
+        SSEQM.refused += 1
+        yield retry
+        return
+    queue, missed, current = SSEQM.subscribe(last_event_id)
     try:
+        yield retry
+        if missed is not None:
+            yield from missed
+        elif snapshot is not None:
+            yield from snapshot(current)
         while True:
-            # block until a payload is available
-            yield queue.pop_payload()
+            # block until a payload is available (or send a keep-alive)
+            msg = queue.pop_payload(SSEQM.KEEP_ALIVE_S)
+            if msg is None:
+                return  # evicted
+            yield msg
     finally:
+        queue.close()
         SSEQM.remove(queue)
+
+
+# "state" broadcasts go through here; see StateCoalescer
+SSEQM.coalescer = StateCoalescer(SSEQM.broadcast_payload,
+                              secrets.SSE_STATE_WINDOW_MS / 1000.0,
+                              secrets.SSE_STATE_BYPASS)
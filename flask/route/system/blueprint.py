@@ -5,7 +5,7 @@
 import flask
 import os
 import signal
-from lib.automation.jobs import start_job
+from lib.automation.jobs import start_job, job_log_tail
 from lib.sse.question import setResponse
 from lib.utils import secrets
 from .manager import *
@@ -47,10 +47,58 @@ def __hardware():
 @bp.get("/sse")
 def __stream():
     if flask.request.headers.get("accept") == "text/event-stream":
-        return flask.Response(event_stream(), content_type="text/event-stream")
+        last_event_id = flask.request.headers.get("Last-Event-ID") or flask.request.args.get("lastEventId")
+        return flask.Response(event_stream(last_event_id), content_type="text/event-stream")
 
+@bp.get("/sse/stats")
+def __stream_stats():
+    return flask.jsonify(SSEQM.stats())
 
 
+# ================================================================
+# current station/meter/job state without opening the stream
+# ================================================================
+@bp.get("/snapshot")
+def __snapshot():
+    body, etag = snapshot()
+    resp = flask.Response(body, content_type="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    # 304 when If-None-Match has this tag
+    return resp.make_conditional(flask.request)
+
+
+
+
+
+# ================================================================
+# tail of a job's log (in-memory ring); poll with after=<seq>
+# or, with job=<meter_job id>, a stored job's full log as text
+# ================================================================
+@bp.get("/job/log")
+def __job_log():
+    args = flask.request.args.to_dict()
+    if args.get("job"):
+        # a finished job's whole log, from the database
+        try:
+            row = database.retrieve_job(int(args["job"]))
+        except ValueError:
+            return "invalid job", 400
+        if row is None:
+            return "unknown job", 404
+        return flask.Response(row.get("jctl") or "", mimetype="text/plain"), 200
+    ip = args.get("ip")
+    if not ip:
+        return "missing ip or job", 400
+    try:
+        after = int(args.get("after", 0))
+        limit = int(args.get("limit", 200))
+    except ValueError:
+        return "invalid after/limit", 400
+    res = job_log_tail(ip, after=after, limit=limit)
+    if res is None:
+        return "unknown meter", 404
+    return flask.jsonify(res), 200
 
 
 # ================================================================
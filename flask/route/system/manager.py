@@ -1,17 +1,25 @@
 # ================================================================
 # File: manager.py
 # ================================================================
+import json
+import zlib
+
 from lib.system import states
 from lib.meter.meter_manager import METERMANAGER as mm
+from lib.automation.jobs import _states as _jobs, job_status
 
 from lib.sse import (
     dump_sse_payload,
     SSEQM,
+    event_id,
     event_stream as _estream,
     sse_payload,
 )
+# importing it registers the snapshot as an SSEQM observer
+from lib.sse.snapshot import SNAPSHOT
 
 __test_count = 0
+SNAPSHOT.seed_states(states)
 
 
 def test_message():
@@ -20,26 +28,46 @@ def test_message():
     SSEQM.broadcast("test", __test_count)
 
 
-def initial_payloads():
+def initial_payloads(id=None):
     for k, v in states.items():
-        yield dump_sse_payload(sse_payload("state", {"key": k, "value": v}))
+        yield dump_sse_payload(sse_payload("state", {"key": k, "value": v}), id)
+    # meter info as last broadcast; a reconnecting browser must not cause SSH traffic
+    _, _, meters = SNAPSHOT.get()
     for ip in mm.list_meters():
-        try:
-            meter = mm.get_meter(ip)
-            yield dump_sse_payload(sse_payload("meter", {
-                "ip": ip,
-                "alive": True,
-                "info": meter.get_info(),
-            }))
-        except Exception:
-            pass
+        yield dump_sse_payload(sse_payload("meter", {
+            "ip": ip,
+            "alive": True,
+            "info": meters.get(ip, {}).get("info"),
+        }), id)
 
 
-def event_stream():
-    # send initial data
-    yield from initial_payloads()
+def event_stream(last_event_id=None):
+    # full state only when the client cannot resume from the replay ring
+    return _estream(last_event_id, snapshot=initial_payloads)
+
 
-    # registered!
-    yield from _estream()
+__snapshot = {"key": None, "body": "", "etag": ""}
 
 
+def snapshot():
+    """
+    (json body, unquoted ETag) of states + meters + job statuses, all from memory. Only
+    re-encoded when a broadcast or a job status changed it; the ETag carries the
+    SSE event id it is current to, usable as Last-Event-ID for /sse.
+    """
+    jobs = [job_status(ip) for ip in list(_jobs)]
+    key = (SNAPSHOT.seq, tuple(tuple(j.values()) for j in jobs))
+    if key != __snapshot["key"]:
+        seq, snap_states, meters = SNAPSHOT.get()
+        body = json.dumps({
+            "id": event_id(seq),
+            "states": snap_states,
+            "meters": meters,
+            "jobs": {j["meter_ip"]: j for j in jobs},
+        })
+        __snapshot.update(
+            key=(seq, key[1]),
+            body=body,
+            etag=f"{event_id(seq)}.{zlib.crc32(body.encode()):08x}",
+        )
+    return __snapshot["body"], __snapshot["etag"]
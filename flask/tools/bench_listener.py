@@ -0,0 +1,138 @@
+"""
+Listener filter/dispatch throughput on a recorded journal.
+
+    journalctl -u MS3_Platform.service -o json > journal.json      (on a meter)
+    python tools/bench_listener.py journal.json [--repeat 5]
+
+"before" is the old per-line path: every USELESS_RES regex, then each monitor's
+interested() on a freshly lowercased message. "after" is the compiled RuleSet the
+Listener now uses. handle() is not timed since it is identical in both.
+
+The decode table replays the same entries as the follow stream would deliver them
+(READ_SIZE chunks) in each wire format: "json" is the full record, "compact" keeps
+only what `--output-fields` asks for plus the fields journalctl always adds. Per
+format it reports bytes/line on the wire and CPU/line for the old decoder (split,
+decode and json.loads line by line) and the batched one JournalFollower uses.
+"""
+import argparse
+import json
+import time
+
+from lib.automation.journal import (
+    COMPACT_FIELDS, JournalFollower, parse_journal_line, parse_journal_lines, split_chunk,
+)
+from lib.automation.listener import Listener, USELESS_RES
+from lib.automation.monitors import REGISTRY
+from lib.automation.rules import RuleSet
+
+
+MONITORS = {cls.id: cls.patterns for kind, cls in REGISTRY.items() if kind != "robot_keypad"}
+
+
+def load_messages(path: str):
+    parse = Listener._parse_line
+    with open(path, encoding="utf-8", errors="replace") as f:
+        events = (parse(None, line) for line in f if line.strip())
+        return [ev.msg or "" for ev in events if ev is not None]
+
+
+def before(msgs):
+    routed = 0
+    for msg in msgs:
+        stripped = msg.strip()
+        for rx in USELESS_RES:
+            if rx.search(stripped):
+                break
+        for patterns in MONITORS.values():
+            m = msg.lower()
+            if any(p in m for p in patterns):
+                routed += 1
+    return routed
+
+
+def after(msgs):
+    scan = RuleSet(USELESS_RES, MONITORS).scan
+    routed = 0
+    for msg in msgs:
+        routed += len(scan(msg)[1])
+    return routed
+
+
+def bench(fn, msgs, repeat: int, clock=time.perf_counter):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = clock()
+        result = fn(msgs)
+        best = min(best, clock() - t0)
+    return best, result
+
+
+# ---- wire formats ----
+ALWAYS_FIELDS = ("__CURSOR", "__REALTIME_TIMESTAMP", "__MONOTONIC_TIMESTAMP", "_BOOT_ID")
+
+
+def load_wire(path: str):
+    """The recorded stream in each wire format, as the raw bytes journalctl would send."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        records = [json.loads(line) for line in f if line.startswith("{")]
+    keep = ALWAYS_FIELDS + COMPACT_FIELDS
+    compact = [{k: r[k] for k in keep if k in r} for r in records]
+    dump = lambda rs: "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in rs).encode()
+    return {"json": dump(records), "compact": dump(compact)}
+
+
+def chunks(data: bytes):
+    step = JournalFollower.READ_SIZE
+    return [data[i:i + step] for i in range(0, len(data), step)]
+
+
+def decode_per_line(stream):
+    n, buf = 0, b""
+    for chunk in stream:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for raw in lines:
+            if raw.strip() and parse_journal_line(raw.decode("utf-8", errors="replace")) is not None:
+                n += 1
+    return n
+
+
+def decode_batched(stream):
+    n, buf = 0, b""
+    for chunk in stream:
+        lines, buf = split_chunk(buf + chunk)
+        n += len(parse_journal_lines(lines))
+    return n
+
+
+def bench_wire(path: str, repeat: int) -> None:
+    print(f"\n{'format':>8} {'bytes/line':>11} {'per-line':>12} {'batched':>12}")
+    for wire, data in load_wire(path).items():
+        stream = chunks(data)
+        row = []
+        for fn in (decode_per_line, decode_batched):
+            cpu, lines = bench(fn, stream, repeat, clock=time.process_time)
+            row.append(cpu / lines * 1e6)
+        print(f"{wire:>8} {len(data) / lines:>11.0f} {row[0]:>9.2f} us {row[1]:>9.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("journal")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    msgs = load_messages(args.journal)
+    if not msgs:
+        raise SystemExit(f"no journal lines parsed from {args.journal}")
+
+    print(f"{len(msgs)} lines, monitors: {', '.join(sorted(MONITORS))}")
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        elapsed, routed = bench(fn, msgs, args.repeat)
+        results[name] = len(msgs) / elapsed
+        print(f"{name:>6}: {results[name]:>12,.0f} lines/s  ({routed} monitor deliveries)")
+    print(f"speedup: {results['after'] / results['before']:.2f}x")
+
+    bench_wire(args.journal, args.repeat)
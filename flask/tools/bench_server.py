@@ -0,0 +1,203 @@
+"""
+SSE fan-out + API latency under each server mode app.py can run.
+
+Serves a minimal app (the real lib.sse stream on /sse, SSEQM.stats() as the API
+call on /api) from werkzeug's threaded dev server and from waitress in turn,
+connects N EventSource-like clients, broadcasts at --rate for --seconds and
+meanwhile times sequential API requests on a keep-alive connection.
+
+    python tools/bench_server.py                        # 50 clients, both modes
+    python tools/bench_server.py --clients 200 --rate 50
+    python tools/bench_server.py --mode waitress --threads 32   # fewer threads than clients
+
+Per mode: streams accepted / refused (told to retry), events delivered vs
+expected, broadcast-to-client latency and API latency percentiles.
+"""
+import argparse
+import http.client
+import json
+import logging
+import socket
+import statistics
+import threading
+import time
+
+import flask
+
+from lib.sse import SSEQM, event_stream
+
+
+def make_app() -> flask.Flask:
+    app = flask.Flask("bench")
+
+    @app.get("/sse")
+    def sse():
+        return flask.Response(event_stream(), content_type="text/event-stream")
+
+    @app.get("/api")
+    def api():
+        return flask.jsonify(SSEQM.stats())
+
+    return app
+
+
+class DevServer:
+    def __init__(self, app, threads):
+        from werkzeug.serving import make_server
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.port = self.server.server_port
+
+    def run(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+
+
+class WaitressServer:
+    def __init__(self, app, threads):
+        from waitress import create_server
+        self.server = create_server(app, host="127.0.0.1", port=0, threads=threads, connection_limit=10000)
+        self.port = self.server.effective_port
+        SSEQM.max_clients = max(1, threads - 8)  # as app.py does
+
+    def run(self):
+        self.server.run()
+
+    def stop(self):
+        # the stream tasks must be done writing before the sockets go away
+        self.server.task_dispatcher.shutdown(timeout=5)
+        self.server.close()
+
+
+SERVERS = {"dev": DevServer, "waitress": WaitressServer}
+
+
+class Client(threading.Thread):
+    """One SSE stream over a raw socket; records each bench event's delivery latency."""
+
+    def __init__(self, port: int, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.port = port
+        self.stop = stop
+        self.latencies = []
+        self.connected = False
+        self.refused = False
+
+    def run(self):
+        try:
+            sock = socket.create_connection(("127.0.0.1", self.port), timeout=10)
+            sock.sendall(b"GET /sse HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n")
+            # blocking reads: the stream ends when the bench calls SSEQM.close_all()
+            sock.settimeout(None)
+            f = sock.makefile("rb")
+        except OSError:
+            self.refused = True
+            return
+        while True:
+            try:
+                line = f.readline()
+            except OSError:
+                break
+            if not line:
+                # ended before the bench was over: the server turned us away with a retry
+                self.refused = not self.stop.is_set()
+                break
+            if line.startswith(b"retry:"):
+                self.connected = True
+            elif line.startswith(b"data: "):
+                try:
+                    msg = json.loads(line[6:])
+                except ValueError:
+                    continue
+                if msg.get("event") == "bench":
+                    self.latencies.append(time.time() - msg["payload"]["t"])
+        sock.close()
+
+
+def pct(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def run_mode(mode: str, clients: int, rate: float, seconds: float, threads: int):
+    SSEQM.max_clients, SSEQM.closing = None, False
+    server = SERVERS[mode](make_app(), threads)
+    threading.Thread(target=server.run, daemon=True).start()
+
+    stop = threading.Event()
+    streams = [Client(server.port, stop) for _ in range(clients)]
+    for c in streams:
+        c.start()
+    deadline = time.time() + 10
+    while time.time() < deadline and sum(c.connected or c.refused or not c.is_alive() for c in streams) < clients:
+        time.sleep(0.05)
+    time.sleep(0.2)
+
+    api_lat, api_errors = [], 0
+    done = threading.Event()
+
+    def api_loop():
+        nonlocal api_errors
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        while not done.is_set():
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", "/api")
+                conn.getresponse().read()
+                api_lat.append(time.perf_counter() - t0)
+            except Exception:
+                api_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            time.sleep(0.01)
+        conn.close()
+
+    api = threading.Thread(target=api_loop, daemon=True)
+    api.start()
+
+    sent = 0
+    t_end = time.time() + seconds
+    while time.time() < t_end:
+        SSEQM.broadcast("bench", {"t": time.time(), "n": sent})
+        sent += 1
+        time.sleep(1.0 / rate)
+    time.sleep(0.5)
+    done.set()
+    api.join()
+    stop.set()
+    SSEQM.close_all()
+    for c in streams:
+        c.join(2)
+    server.stop()
+
+    connected = [c for c in streams if c.connected and not c.refused]
+    delivered = sum(len(c.latencies) for c in connected)
+    latencies = [x for c in connected for x in c.latencies]
+    print(f"{mode:>8}: {len(connected)}/{clients} streams ({sum(c.refused for c in streams)} refused), "
+          f"{delivered}/{sent * len(connected)} events, "
+          f"event p50 {pct(latencies, .5):.1f} ms p99 {pct(latencies, .99):.1f} ms | "
+          f"api {len(api_lat)} req p50 {pct(api_lat, .5):.1f} ms p99 {pct(api_lat, .99):.1f} ms "
+          f"max {max(api_lat, default=0) * 1000:.1f} ms, {api_errors} errors")
+    if latencies:
+        print(f"{'':>8}  event mean {statistics.mean(latencies) * 1000:.1f} ms, "
+              f"{threading.active_count()} threads alive after shutdown")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["dev", "waitress", "both"], default="both")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20.0, help="broadcasts per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=0, help="waitress threads (default: clients + 8)")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    logging.getLogger("waitress").setLevel(logging.ERROR)
+    # the bench counts every event; don't let the overflow policy hide a slow server
+    SSEQM.coalescer.window_s = 0
+    for mode in (["dev", "waitress"] if args.mode == "both" else [args.mode]):
+        run_mode(mode, args.clients, args.rate, args.seconds, args.threads or args.clients + 8)
@@ -93,7 +93,7 @@ def _mock_hostname(host: str):
 
 def _mock_meter_init(self, host, **kwargs):
     _original_meter_init(self, host, **kwargs)
-    self._Client__hostname = _mock_hostname(host)
+    self.hostname = _mock_hostname(host)
     self._module_info_cache = MOCK_MODULES
     self._firmwares = MOCK_FIRMWARES
     self._system_versions_cache = MOCK_SYSTEM_VERSIONS
@@ -117,6 +117,8 @@ def _apply_meter_runtime_mocks(meter: SSHMeter):
     meter.setup_custom_display = lambda: None
     meter.beep = lambda count=1, interval=0: None
     meter.get_meter_status_text = lambda: MOCK_STATUS_TEXT
+    meter.restore_identity = lambda: False
+    meter.save_identity = lambda: False
     meter.connected = True
     meter.status = "ready"
     meter.results = {}
@@ -407,6 +409,7 @@ def _install_patches():
     # mock regardless
     patch("lib.automation.jobs.insert_meter_jobs", _mock_insert_meter_jobs).start() # no more meter job insertion
     patch("lib.meter.ssh_meter.SSHMeter.__init__", _mock_meter_init).start()        # dont need to go thru the fw grabbing?
+    patch("lib.meter.meter_manager.METERMANAGER.get_journal", lambda ip: None).start()  # no shared journal follower for mock meters
     
 
     # unsorted
@@ -0,0 +1,45 @@
+"""
+Replay recorded jobs through the monitors, offline.
+
+With RECORD_JOURNALS=1, logged jobs leave `<log>.journal.jsonl` + `<log>.result.json` next to
+the listener log. Replaying them checks that the monitor stack still reaches the
+recorded verdict (faults, device results) and reports its throughput.
+
+    python tools/replay_journal.py logs/*.journal.jsonl               # as fast as possible
+    python tools/replay_journal.py rec.journal.jsonl --speed 1         # real time
+    python tools/replay_journal.py rec.journal.jsonl --speed 20 -v     # 20x, monitor output shown
+
+Exits 1 if any recording no longer matches its result file.
+"""
+import argparse
+
+from lib.automation.replay import replay
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recordings", nargs="+")
+    parser.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible, 1 = real time")
+    parser.add_argument("--tail", type=float, default=0.0, help="seconds to keep the clock running after the last line")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.recordings:
+        report = replay(path, speed=args.speed or None, tail_s=args.tail, verbose=args.verbose)
+        problems = report.mismatches()
+        if report.expected is None:
+            status = "no result file"
+        elif report.expected.get("truncated"):
+            status = "truncated, not compared"
+        else:
+            status = "FAIL" if problems else "ok"
+        print(f"{path}: {status}  {report.handled}/{report.lines} lines, "
+              f"{report.virtual_s:.1f}s of journal in {report.elapsed_s:.3f}s ({report.lines_per_s:,.0f} lines/s), "
+              f"{len(report.faults)} fault(s)")
+        for problem in problems:
+            print(f"    {problem}")
+        failed += bool(problems)
+
+    if failed:
+        raise SystemExit(1)
@@ -33,8 +33,10 @@ CREATE TABLE IF NOT EXISTS meter_job (
     status TEXT NOT NULL CHECK (status IN ('missing','n/a','pass','fail')),
     data JSONB NOT NULL DEFAULT '{}',
     jctl TEXT NOT NULL DEFAULT '',
+    jctl_gz BYTEA,  -- gzipped full log when it is too big for jctl (jctl then holds the tail)
     created_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
 );
+ALTER TABLE meter_job ADD COLUMN IF NOT EXISTS jctl_gz BYTEA;
 
 
 -- CREATE INDEX IF NOT EXISTS idx_meter_firmware_meter_id ON meter_firmware(meter_id);